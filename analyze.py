@@ -0,0 +1,379 @@
+"""
+Offline analytics over archived logs (`bluesentry analyze`).
+
+Reads session logs (.csv, .jsonl, .bsl) and device summaries (--summary
+CSVs, and the sentry_log_*.csv snapshots written by older versions), one
+file per worker process. Each file is streamed row by row into a partial
+Aggregate whose size depends on the number of devices, not on the length
+of the file, and the partials are merged as the workers finish.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import binlog
+import vendors
+
+SUFFIXES = (".csv", ".jsonl", ".bsl")
+APPLE = 76
+
+MARKUP = re.compile(r"\[/?[a-z ]+\]")  # Rich markup stored by older versions
+STAMP = re.compile(r"(\d{8}_\d{6})")    # sentry_log_YYYYmmdd_HHMMSS
+
+
+def vendor_of(company_id, manufacturer=None):
+    """Vendor name from the company ID, else from a logged manufacturer string."""
+    if company_id is not None and company_id >= 0:
+        return vendors.COMPANY_IDS.get(company_id, f"ID: {company_id}")
+    if not manufacturer or manufacturer == "Unknown":
+        return "Unknown"
+    if manufacturer.startswith("Apple"):  # Continuity labels, e.g. "Apple AirPods Pro"
+        return vendors.COMPANY_IDS.get(APPLE)
+    if manufacturer.startswith("ID: "):
+        try:
+            return vendors.COMPANY_IDS.get(int(manufacturer[4:]), manufacturer)
+        except ValueError:
+            pass
+    return manufacturer
+
+
+def privacy_of(text):
+    return "RAND" if "RAND" in text else "PUBLIC" if "PUBLIC" in text else "?"
+
+
+def tags_of(text):
+    return [tag.strip() for tag in MARKUP.sub("", text).split(",") if tag.strip()]
+
+
+def file_time(path):
+    """Time a summary snapshot was taken: from its name if it has a stamp, else its mtime."""
+    match = STAMP.search(os.path.basename(path))
+    if match:
+        try:
+            return datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").timestamp()
+        except ValueError:
+            pass
+    return os.path.getmtime(path)
+
+
+# Readers yield (time, address, rssi, vendor, privacy, tags, sightings)
+
+def read_csv(path):
+    with open(path, newline="") as f:
+        rows = csv.reader(f)
+        header = next(rows, None)
+        if not header:
+            return
+        if header[0] == "Time":  # Session log
+            for ts, address, _, rssi, manufacturer, company_id, services, privacy in rows:
+                yield (datetime.fromisoformat(ts).timestamp(), address, int(rssi),
+                       vendor_of(int(company_id) if company_id else None, manufacturer),
+                       privacy, tags_of(services), 1)
+        elif header[0] == "Address":  # Device summary, one row per device
+            taken = file_time(path)
+            packets = header.index("Packets") if "Packets" in header else None
+            for row in rows:
+                address, _, manufacturer, rssi, services, privacy = row[:6]
+                yield (taken, address, int(rssi), vendor_of(None, manufacturer), privacy_of(privacy),
+                       tags_of(services), int(row[packets]) if packets is not None else 1)
+        else:
+            raise ValueError(f"{path}: unknown CSV layout")
+
+
+def read_jsonl(path):
+    loads = json.loads
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            s = loads(line)
+            # company_id is null without manufacturer data (-1 in older logs)
+            yield (s["time"], s["address"], s["rssi"], vendor_of(s["company_id"], s["manufacturer"]),
+                   s["privacy"], s["services"], 1)
+
+
+def read_bin(path):
+    with binlog.BinLog(path) as log:
+        for s in log.query():
+            yield s.time, s.address, s.rssi, vendor_of(s.company_id), s.privacy, (), 1
+
+
+READERS = {".csv": read_csv, ".jsonl": read_jsonl, ".bsl": read_bin}
+
+
+class DeviceSummary:
+    """What the logs say about one address."""
+
+    __slots__ = ("first", "last", "sightings", "vendor", "privacy", "tags", "rssi_min", "rssi_max")
+
+    def __init__(self, t, vendor, privacy):
+        self.first = self.last = t
+        self.sightings = 0
+        self.vendor = vendor
+        self.privacy = privacy
+        self.tags = set()
+        self.rssi_min = 127
+        self.rssi_max = -128
+
+    def merge(self, other):
+        self.first = min(self.first, other.first)
+        self.last = max(self.last, other.last)
+        self.sightings += other.sightings
+        if self.vendor == "Unknown":
+            self.vendor = other.vendor
+        if self.privacy == "?":
+            self.privacy = other.privacy
+        self.tags |= other.tags
+        self.rssi_min = min(self.rssi_min, other.rssi_min)
+        self.rssi_max = max(self.rssi_max, other.rssi_max)
+
+
+class Aggregate:
+    """Mergeable totals of one or more log files."""
+
+    def __init__(self):
+        self.files = 0
+        self.sightings = 0
+        self.devices = {}           # address -> DeviceSummary
+        self.tag_sightings = Counter()
+        self.rssi = Counter()       # dBm -> sightings
+        self.errors = []            # (path, message)
+
+    def add(self, t, address, rssi, vendor, privacy, tags, sightings=1):
+        dev = self.devices.get(address)
+        if dev is None:
+            dev = self.devices[address] = DeviceSummary(t, vendor, privacy)
+        elif t < dev.first:
+            dev.first = t
+        elif t > dev.last:
+            dev.last = t
+        dev.sightings += sightings
+        if rssi < dev.rssi_min:
+            dev.rssi_min = rssi
+        if rssi > dev.rssi_max:
+            dev.rssi_max = rssi
+        if dev.vendor == "Unknown":
+            dev.vendor = vendor
+        if dev.privacy == "?":
+            dev.privacy = privacy
+        for tag in tags:
+            dev.tags.add(tag)
+            self.tag_sightings[tag] += sightings
+        self.rssi[rssi] += sightings
+        self.sightings += sightings
+
+    def merge(self, other):
+        self.files += other.files
+        self.sightings += other.sightings
+        devices = self.devices
+        for address, dev in other.devices.items():
+            mine = devices.get(address)
+            if mine is None:
+                devices[address] = dev
+            else:
+                mine.merge(dev)
+        self.tag_sightings.update(other.tag_sightings)
+        self.rssi.update(other.rssi)
+        self.errors.extend(other.errors)
+        return self
+
+
+def analyze_file(path):
+    """Partial Aggregate of one file (runs in a worker process)."""
+    agg = Aggregate()
+    agg.files = 1
+    add = agg.add
+    try:
+        for row in READERS[os.path.splitext(path)[1].lower()](path):
+            add(*row)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        agg.errors.append((path, str(e) or type(e).__name__))
+    return agg
+
+
+def collect(paths):
+    """Log files among `paths`; directories are searched recursively."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith(SUFFIXES))
+        else:
+            files.append(path)
+    return files
+
+
+def analyze(paths, jobs=None, on_file=None):
+    """
+    Analyzes every file with a pool of `jobs` processes (1 = in process).
+    Largest files are submitted first so one big file does not finish last.
+    Returns the merged Aggregate; `on_file(done, total)` reports progress.
+    """
+    def size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    paths = sorted(paths, key=size, reverse=True)
+    total = Aggregate()
+    if jobs == 1 or len(paths) < 2:
+        for done, path in enumerate(paths, 1):
+            total.merge(analyze_file(path))
+            if on_file:
+                on_file(done, len(paths))
+        return total
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(analyze_file, path) for path in paths]
+        for done, future in enumerate(as_completed(futures), 1):
+            total.merge(future.result())
+            if on_file:
+                on_file(done, len(paths))
+    return total
+
+
+def percentile(counts, q):
+    """q-quantile of a {value: count} histogram."""
+    n = sum(counts.values())
+    if not n:
+        return None
+    rank = q * (n - 1)
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if seen > rank:
+            return value
+    return max(counts)
+
+
+def ranked(counts, top=None):
+    """Most common first, ties by name (independent of the order files finished in)."""
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:top]
+
+
+def iso(t):
+    return datetime.fromtimestamp(t).isoformat(timespec="seconds") if t is not None else None
+
+
+def report(agg, top=None, with_devices=False):
+    """JSON-ready report of an Aggregate."""
+    devices = agg.devices.values()
+    vendor_devices = Counter()
+    vendor_sightings = Counter()
+    privacy = Counter()
+    tag_devices = Counter()
+    for dev in devices:
+        vendor_devices[dev.vendor] += 1
+        vendor_sightings[dev.vendor] += dev.sightings
+        privacy[dev.privacy] += 1
+        tag_devices.update(dev.tags)
+
+    known = privacy["RAND"] + privacy["PUBLIC"]
+    n = sum(agg.rssi.values())
+    out = {
+        "files": agg.files,
+        "sightings": agg.sightings,
+        "devices": len(agg.devices),
+        "first_seen": iso(min((d.first for d in devices), default=None)),
+        "last_seen": iso(max((d.last for d in devices), default=None)),
+        "vendors": [
+            {"vendor": vendor, "devices": count, "sightings": vendor_sightings[vendor]}
+            for vendor, count in ranked(vendor_devices, top)
+        ],
+        "privacy": {
+            "RAND": privacy["RAND"],
+            "PUBLIC": privacy["PUBLIC"],
+            "unknown": privacy["?"],
+            "random_ratio": round(privacy["RAND"] / known, 4) if known else None,
+        },
+        "tags": [
+            {"tag": tag, "devices": count, "sightings": agg.tag_sightings[tag]}
+            for tag, count in ranked(tag_devices, top)
+        ],
+        "rssi": {
+            "min": min(agg.rssi, default=None),
+            "max": max(agg.rssi, default=None),
+            "mean": round(sum(v * c for v, c in agg.rssi.items()) / n, 1) if n else None,
+            "p10": percentile(agg.rssi, 0.1),
+            "p50": percentile(agg.rssi, 0.5),
+            "p90": percentile(agg.rssi, 0.9),
+            "histogram": {str(v): agg.rssi[v] for v in sorted(agg.rssi)},
+        },
+        "errors": [{"file": path, "error": error} for path, error in agg.errors],
+    }
+    if with_devices:
+        out["device_list"] = [
+            {
+                "address": address, "vendor": d.vendor, "privacy": d.privacy,
+                "first_seen": iso(d.first), "last_seen": iso(d.last), "sightings": d.sightings,
+                "rssi_min": d.rssi_min, "rssi_max": d.rssi_max, "tags": sorted(d.tags),
+            }
+            for address, d in sorted(agg.devices.items(), key=lambda item: item[1].first)
+        ]
+    return out
+
+
+def print_report(rep):
+    print(f"[*] {rep['files']} file(s), {rep['sightings']:,} sightings, {rep['devices']:,} devices")
+    print(f"[*] Seen from {rep['first_seen']} to {rep['last_seen']}")
+    p = rep["privacy"]
+    ratio = f"{p['random_ratio']:.1%} random" if p["random_ratio"] is not None else "n/a"
+    print(f"[*] Privacy: {p['RAND']:,} RAND / {p['PUBLIC']:,} PUBLIC ({ratio}), {p['unknown']:,} unknown")
+    r = rep["rssi"]
+    if r["mean"] is not None:
+        print(f"[*] RSSI: {r['min']} .. {r['max']} dBm, mean {r['mean']}, p10/p50/p90 {r['p10']}/{r['p50']}/{r['p90']}")
+
+    print("\nVENDORS (unique devices)")
+    for v in rep["vendors"]:
+        print(f"  {v['devices']:>8,}  {v['vendor']}  ({v['sightings']:,} sightings)")
+    if rep["tags"]:
+        print("\nSERVICE TAGS (unique devices)")
+        for t in rep["tags"]:
+            print(f"  {t['devices']:>8,}  {t['tag']}  ({t['sightings']:,} sightings)")
+    for e in rep["errors"]:
+        print(f"[-] {e['file']}: {e['error']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="bluesentry analyze",
+        description="Aggregate archived session logs and device summaries in parallel.",
+    )
+    parser.add_argument("paths", nargs="+", help="Log files (.csv, .jsonl, .bsl) or directories to search")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes (default: one per CPU)")
+    parser.add_argument("-o", "--output", type=str, help="Write the full report as JSON to this file")
+    parser.add_argument("--devices", action="store_true", help="Include every device (first/last seen) in the JSON report")
+    parser.add_argument("--top", type=int, default=15, help="Vendors and tags listed (default: 15, 0 = all)")
+    args = parser.parse_args(argv)
+
+    files = collect(args.paths)
+    if not files:
+        print("[-] No log files found")
+        return 1
+
+    started = time.perf_counter()
+    agg = analyze(files, args.jobs)
+    elapsed = time.perf_counter() - started
+
+    rep = report(agg, args.top or None, args.devices)
+    print_report(rep)
+    print(f"\n[*] Analyzed in {elapsed:.2f}s ({agg.sightings / max(elapsed, 1e-9):,.0f} sightings/s, {args.jobs} job(s))")
+    if args.output:
+        if args.top:  # The JSON report always lists everything
+            rep = report(agg, None, args.devices)
+        with open(args.output, "w") as f:
+            json.dump(rep, f, indent=2)
+        print(f"[*] Report saved to {args.output}")
+    return 1 if agg.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""
+Micro-benchmark for the Apple Continuity TLV parser.
+
+    python3 benchmarks/bench_continuity.py [payload count]
+
+Runs offline on synthetic payloads and prints payloads/second.
+"""
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vendors
+
+
+def synthetic_payloads(n, seed=1):
+    """A realistic mix of single and multi-TLV Apple payloads."""
+    rng = random.Random(seed)
+
+    def rand(k):
+        return bytes(rng.getrandbits(8) for _ in range(k))
+
+    shapes = [
+        lambda: bytes([0x10, 0x05, 0x01, 0x18]) + rand(3),                                  # Nearby Info
+        lambda: bytes([0x10, 0x05, 0x0B, 0x1C]) + rand(3) + bytes([0x0C, 0x0E, 0x00]) + rand(13),  # Nearby + Handoff
+        lambda: bytes([0x07, 0x19, 0x01, 0x0E, 0x20, 0x2B, 0x99, 0x8F, 0x01]) + rand(19),   # AirPods Pro
+        lambda: bytes([0x12, 0x19, 0x10]) + rand(24),                                         # Find My
+        lambda: bytes([0x02, 0x15]) + rand(16) + bytes([0x00, 0x01, 0x00, 0x02, 0xC5]),       # iBeacon
+        lambda: bytes([0x0F, 0x05, 0x90, 0x00]) + rand(3) + bytes([0x10, 0x02, 0x0B, 0x00]), # Nearby Action + Info
+    ]
+    return [rng.choice(shapes)() for _ in range(n)]
+
+
+def bench(fn, payloads, repeat=5):
+    """Best-of-N payloads/second for fn over the corpus."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for p in payloads:
+            fn(p)
+        best = min(best, time.perf_counter() - start)
+    return len(payloads) / best
+
+
+def run(n=100000):
+    payloads = synthetic_payloads(n)
+    return {
+        "parse_continuity": bench(vendors.parse_continuity, payloads),
+        "identify_apple_device": bench(vendors.identify_apple_device, payloads),
+    }
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for name, rate in run(count).items():
+        print(f"{name:<24} {rate:>12,.0f} payloads/s")
@@ -0,0 +1,299 @@
+"""
+Offline benchmark suite for the scanner, tracker and vendor decode hot paths.
+
+    python3 benchmarks/suite.py                          # Run, print results
+    python3 benchmarks/suite.py --save baseline.json     # Run and save results
+    python3 benchmarks/suite.py --baseline baseline.json # Run and compare
+
+Every case runs on synthetic advertisements (no Bluetooth) with a fixed
+seed and reports best-of-N operations/second. With --baseline, a case
+that got slower by more than --tolerance is reported as a regression and
+the exit code is 1.
+"""
+import argparse
+import importlib.util
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rich.console import Console
+
+import capture
+import decoder
+import ingest
+import scanner
+import tracker
+import vendors
+import watchlist
+from bench_continuity import synthetic_payloads
+
+SIZES = (100, 1000, 10000)  # Devices in the store for the render cases
+TOLERANCE = 0.15            # Slowdown reported as a regression
+REPEAT = 5
+MIN_TIME = 0.2              # Seconds each timed round runs at least
+
+
+def measure(fn, ops=1, repeat=REPEAT, min_time=MIN_TIME):
+    """Best-of-`repeat` rate of `fn()` (which performs `ops` operations), in ops/second."""
+    calls = 1
+    while True:  # Calibrate: enough calls per round for a stable clock reading
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 4:
+            break
+        calls *= 2
+    best = elapsed / calls
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return ops / best
+
+
+def synthetic_adverts(n, devices, seed=1):
+    """(ReplayDevice, ReplayAdvertisement) pairs from `devices` addresses, Apple-heavy like a busy room."""
+    rng = random.Random(seed)
+    payloads = synthetic_payloads(256, seed)
+    services = [[], ["0000180d-0000-1000-8000-00805f9b34fb"], ["0000fe2c-0000-1000-8000-00805f9b34fb"]]
+    pool = []
+    for i in range(devices):
+        address = f"{rng.choice((0x4A, 0x5C, 0x00)):02X}:" + ":".join(f"{rng.getrandbits(8):02X}" for _ in range(5))
+        if rng.random() < 0.7:
+            mfr = {76: payloads[i % len(payloads)]}
+        else:
+            mfr = {rng.choice((6, 117, 224, 89)): bytes(rng.getrandbits(8) for _ in range(rng.randint(4, 20)))}
+        pool.append((address, rng.choice((None, "Tag", "Phone")), mfr, rng.choice(services)))
+    adverts = []
+    for _ in range(n):
+        address, name, mfr, uuids = rng.choice(pool)
+        rssi = rng.randint(-95, -35)
+        adverts.append((
+            capture.ReplayDevice(address, name, rssi),
+            capture.ReplayAdvertisement(name, mfr, {}, uuids, None, rssi),
+        ))
+    return adverts
+
+
+def fill_store(devices):
+    ingest.device_store.clear()
+    ingest.device_store.configure(max_size=0)
+    for device, adv in synthetic_adverts(devices * 2, devices):
+        ingest.process_device(device, adv)
+
+
+def bench_process_device(count=20000):
+    """Callback-to-store throughput (decode, privacy check, store update)."""
+    adverts = synthetic_adverts(count, 500)
+
+    def run():
+        ingest.device_store.clear()
+        for device, adv in adverts:
+            ingest.process_device(device, adv)
+
+    return {"process_device": (measure(run, count, repeat=3), "adverts/s")}
+
+
+def bench_render(sizes=SIZES):
+    """Table, radar and full-frame cost with `size` devices in the store."""
+    results = {}
+    sink = Console(file=io.StringIO(), width=160, height=48, force_terminal=True, color_system="truecolor")
+    for size in sizes:
+        fill_store(size)
+        results[f"generate_table[{size}]"] = (measure(lambda: scanner.generate_table(0, 40)), "tables/s")
+        results[f"generate_radar_view[{size}]"] = (measure(scanner.generate_radar_view), "views/s")
+
+        # One device changes per frame, like a live scan between redraws
+        updates = itertools.cycle(synthetic_adverts(5000, size, seed=2))
+        scanner.live_view = None
+
+        def frame():
+            ingest.process_device(*next(updates))
+            sink.file.seek(0)
+            sink.file.truncate()
+            sink.print(scanner.get_layout())
+
+        results[f"get_layout[{size}]"] = (measure(frame, repeat=3), "frames/s")
+    ingest.device_store.clear()
+    return results
+
+
+def bench_summary(devices=10000):
+    """Device summary CSV (save_log_to_file) write rate."""
+    fill_store(devices)
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        rate = measure(lambda: ingest.write_summary(path), devices, repeat=3)
+    finally:
+        os.remove(path)
+        ingest.device_store.clear()
+    return {"save_log_to_file": (rate, "rows/s")}
+
+
+def bench_vendors(count=20000):
+    """Apple Continuity decode rate."""
+    payloads = synthetic_payloads(count)
+
+    def run():
+        for p in payloads:
+            vendors.identify_apple_device(p)
+
+    return {"identify_apple_device": (measure(run, count), "payloads/s")}
+
+
+def bench_tracker():
+    """Per-frame graph cost of one target with a full history window."""
+    target = tracker.Target("AA:BB:CC:11:22:33")
+    rng = random.Random(1)
+    now = 1000.0
+    t = now - tracker.HISTORY_SIZE * tracker.BUCKET_SECONDS * 2
+    while t < now:
+        target.record(t, rng.randint(-80, -50))
+        t += 0.05
+
+    chart = tracker.BrailleChart(100, 12)
+    chart.extend(target.trace(now, chart.columns))
+    results = {
+        "tracker_series": (measure(lambda: target.series(now)), "frames/s"),
+        "tracker_braille_push": (measure(lambda: chart.push(rng.randint(-80, -50))), "columns/s"),
+    }
+    if importlib.util.find_spec("plotext") is None:
+        print("[-] plotext not installed, skipping update_graph")
+    else:
+        results["update_graph"] = (measure(lambda: tracker.update_graph(target, 100, 24, now), repeat=3), "frames/s")
+    return results
+
+
+def watchlist_rules(count, seed=1):
+    """`count` rules mixing exact addresses, address prefixes, company IDs, Continuity types and services."""
+    rng = random.Random(seed)
+    rules = []
+    for i in range(count):
+        kind = i % 5
+        if kind == 0:
+            spec = {"address": ":".join(f"{rng.getrandbits(8):02X}" for _ in range(6))}
+        elif kind == 1:
+            spec = {"address": ":".join(f"{rng.getrandbits(8):02X}" for _ in range(3)) + ":*"}
+        elif kind == 2:
+            spec = {"company": rng.randrange(1, 3000)}
+        elif kind == 3:
+            spec = {"continuity": rng.randrange(0x20, 0x100), "company": 76}
+        else:
+            spec = {"service": f"{rng.randrange(0x1800, 0x1900):04x}"}
+        rules.append(dict(spec, name=f"rule {i}", rssi_min=-60, cooldown=3600))
+    return rules
+
+
+def bench_watchlist(counts=(10, 5000)):
+    """Per-sighting watchlist check, with few and with thousands of rules."""
+    sightings = [(device.address, decoder.classify(adv.manufacturer_data, adv.service_uuids), device.rssi)
+                 for device, adv in synthetic_adverts(20000, 500)]
+    results = {}
+    for count in counts:
+        rules = watchlist.Watchlist(watchlist_rules(count))
+
+        def run():
+            for i, (address, info, rssi) in enumerate(sightings):
+                rules.check(address, info, rssi, float(i))
+
+        results[f"watchlist_{count}"] = (measure(run, len(sightings), repeat=3), "checks/s")
+    return results
+
+
+CASES = {
+    "process_device": bench_process_device,
+    "render": bench_render,
+    "summary": bench_summary,
+    "vendors": bench_vendors,
+    "tracker": bench_tracker,
+    "watchlist": bench_watchlist,
+}
+
+
+def run(cases=None, sizes=SIZES):
+    """Runs the selected cases. Returns {name: {"rate": ops/s, "unit": unit}}."""
+    results = {}
+    for case in cases or CASES:
+        print(f"[*] {case}...", file=sys.stderr, flush=True)
+        found = CASES[case](sizes) if case == "render" else CASES[case]()
+        for name, (rate, unit) in found.items():
+            results[name] = {"rate": rate, "unit": unit}
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+    Rows of (name, rate, baseline rate or None, ratio or None, regressed)
+    for every result; ratio > 1 means faster than the baseline.
+    """
+    rows = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if not old:
+            rows.append((name, result["rate"], None, None, False))
+            continue
+        ratio = result["rate"] / old["rate"]
+        rows.append((name, result["rate"], old["rate"], ratio, ratio < 1 - tolerance))
+    return rows
+
+
+def environment():
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="BlueSentry benchmark suite (offline, synthetic adverts)")
+    parser.add_argument("cases", nargs="*", metavar="CASE", help=f"Cases to run (default: all of {', '.join(CASES)})")
+    parser.add_argument("--save", type=str, help="Write results as JSON to this file")
+    parser.add_argument("--baseline", type=str, help="Compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help=f"Slowdown counted as a regression (default: {TOLERANCE:g} = {TOLERANCE:.0%})")
+    parser.add_argument("--quick", action="store_true", help="Render cases at 100 and 1000 devices only")
+    args = parser.parse_args()
+    unknown = [case for case in args.cases if case not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+
+    results = run(args.cases, SIZES[:2] if args.quick else SIZES)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    regressions = 0
+    print(f"{'case':<30} {'rate':>14}  {'unit':<12} {'baseline':>14} {'change':>8}")
+    for name, rate, old, ratio, regressed in compare(results, baseline, args.tolerance):
+        unit = results[name]["unit"]
+        if ratio is None:
+            print(f"{name:<30} {rate:>14,.0f}  {unit}")
+            continue
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<30} {rate:>14,.0f}  {unit:<12} {old:>14,.0f} {ratio - 1:>+8.1%}{flag}")
+        regressions += regressed
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f"[*] Results saved to {args.save}")
+    if regressions:
+        print(f"[-] {regressions} case(s) slower than the baseline by more than {args.tolerance:.0%}")
+        sys.exit(1)
@@ -0,0 +1,354 @@
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+from operator import itemgetter
+
+import vendors
+
+# Binary session log (little endian), written append-only:
+#
+#   <name>.bsl       header: 8s magic, u32 record size, u32 flags
+#                    records: f64 time, 6s address, i8 rssi, u8 flags,
+#                             u16 company id, u64 heap offset, u16 payload len
+#                             (padded to 32 bytes)
+#   <name>.bsl.heap  raw manufacturer payloads, back to back
+#
+# Records are fixed width, so the reader can mmap the file, binary search
+# the time column and unpack slices without parsing anything else. Each
+# batch is sorted before it is written, but overflow coalescing can still
+# hand over a batch older than the last one; the writer then sets
+# LOG_UNORDERED in the header and readers scan instead of bisecting.
+
+MAGIC = b"BSLOG\x00\x01\x00"
+HEADER = struct.Struct("<8sII")
+RECORD = struct.Struct("<d6sbBHQH4x")
+TIME = struct.Struct("<d")
+
+LOG_UNORDERED = 0x01
+
+NO_COMPANY = 0xFFFF
+FLAG_RANDOM = 0x01
+FLAG_PUBLIC = 0x02
+
+Sighting = namedtuple("Sighting", "time address rssi privacy company_id payload")
+
+
+def pack_address(address):
+    """AA:BB:CC:DD:EE:FF -> 6 bytes. Non-MAC ids (macOS UUIDs) are hashed."""
+    try:
+        raw = bytes.fromhex(address.replace(":", ""))
+        if len(raw) == 6:
+            return raw
+    except ValueError:
+        pass
+    return hashlib.blake2b(address.encode(), digest_size=6).digest()
+
+
+def unpack_address(raw):
+    return ":".join(f"{b:02X}" for b in raw)
+
+
+def heap_path(path):
+    return path + ".heap"
+
+
+class BinSink:
+    """Session log sink writing the binary format (see sessionlog.SINKS)."""
+
+    suffix = ".bsl"
+
+    def __init__(self, path):
+        self.path = path
+        self._records = open(path, "r+b" if os.path.exists(path) else "w+b")
+        self._heap = open(heap_path(path), "r+b" if os.path.exists(heap_path(path)) else "w+b")
+        self._flags = 0
+        self._last_time = float("-inf")
+        self._heap_end = 0
+        try:
+            self._recover()
+        except BaseException:
+            self.close()
+            raise
+
+    def _recover(self):
+        """
+        Drops whatever a crash left past the last whole record, and the heap
+        bytes no record points at, so appends line up again.
+        """
+        size = self._records.seek(0, os.SEEK_END)
+        if size < HEADER.size:
+            self._records.seek(0)
+            self._records.truncate()
+            self._records.write(HEADER.pack(MAGIC, RECORD.size, 0))
+        else:
+            self._records.seek(0)
+            magic, record_size, self._flags = HEADER.unpack(self._records.read(HEADER.size))
+            if magic != MAGIC or record_size != RECORD.size:
+                raise ValueError(f"{self.path} is not a BlueSentry binary log")
+            count = (size - HEADER.size) // RECORD.size
+            end = HEADER.size + count * RECORD.size
+            if count:
+                self._records.seek(end - RECORD.size)
+                ts, _, _, _, _, offset, n = RECORD.unpack(self._records.read(RECORD.size))
+                self._last_time = ts
+                self._heap_end = offset + n
+            self._records.truncate(end)
+            self._records.seek(end)
+        self._heap.truncate(self._heap_end)
+        self._heap.seek(self._heap_end)
+
+    def _mark_unordered(self):
+        self._flags |= LOG_UNORDERED
+        self._records.seek(0)
+        self._records.write(HEADER.pack(MAGIC, RECORD.size, self._flags))
+        self._records.seek(0, os.SEEK_END)
+
+    def write(self, rows):
+        if not rows:
+            return
+        rows = sorted(rows, key=itemgetter(0))
+        if rows[0][0] < self._last_time and not self._flags & LOG_UNORDERED:
+            self._mark_unordered()
+        self._last_time = max(self._last_time, rows[-1][0])
+        pack = RECORD.pack
+        records = []
+        payloads = []
+        offset = self._heap_end
+        for ts, address, _, rssi, _, company_id, _, privacy, payload in rows:
+            flags = FLAG_RANDOM if privacy == "RAND" else FLAG_PUBLIC if privacy == "PUBLIC" else 0
+            n = len(payload)
+            records.append(pack(
+                ts,
+                pack_address(address),
+                max(-128, min(127, rssi)),
+                flags,
+                company_id if company_id >= 0 else NO_COMPANY,
+                offset,
+                n,
+            ))
+            if n:
+                payloads.append(payload)
+                offset += n
+        self._heap.write(b"".join(payloads))
+        self._records.write(b"".join(records))
+        self._heap_end = offset
+
+    def flush(self, fsync=False):
+        # Heap first, so a record never points past the end of the heap
+        for f in (self._heap, self._records):
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+
+    def size(self):
+        return self._records.tell() + self._heap_end
+
+    def close(self):
+        self._heap.close()
+        self._records.close()
+
+
+def _map(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class BinLog:
+    """
+    Read-only, memory-mapped view of a binary session log.
+    Only the pages touched by a query are ever read from disk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._records = _map(path)
+        if len(self._records) < HEADER.size:
+            raise ValueError(f"{path} is not a BlueSentry binary log")
+        magic, size, flags = HEADER.unpack_from(self._records, 0)
+        if magic != MAGIC or size != RECORD.size:
+            raise ValueError(f"{path} is not a BlueSentry binary log")
+        self.ordered = not flags & LOG_UNORDERED
+        self._heap = _map(heap_path(path)) if os.path.exists(heap_path(path)) else b""
+        # Whole records only (a crash can leave a partial one at the end)
+        self.count = (len(self._records) - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        for m in (self._records, self._heap):
+            if isinstance(m, mmap.mmap):
+                m.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def time_at(self, i):
+        return TIME.unpack_from(self._records, HEADER.size + i * RECORD.size)[0]
+
+    def bisect_time(self, t):
+        """First record index with time >= t (only meaningful when self.ordered)."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.time_at(mid) < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def payload(self, offset, length):
+        return bytes(self._heap[offset:offset + length])
+
+    def _address_hits(self, raw, start, end):
+        """Record indexes whose address matches, found with a C-level byte search."""
+        mm = self._records
+        base = HEADER.size + TIME.size  # Address field offset in record 0
+        pos = HEADER.size + start * RECORD.size
+        stop = HEADER.size + end * RECORD.size
+        while True:
+            pos = mm.find(raw, pos, stop)
+            if pos < 0:
+                return
+            i, rem = divmod(pos - base, RECORD.size)
+            if rem == 0:
+                yield i
+                pos += RECORD.size
+            else:
+                pos += 1
+
+    def query(self, address=None, company_id=None, rssi_min=None, rssi_max=None,
+              since=None, until=None, with_payload=False):
+        """Yields Sightings matching every given filter."""
+        if self.ordered:
+            start = self.bisect_time(since) if since is not None else 0
+            end = self.bisect_time(until) if until is not None else self.count
+            if start >= end:
+                return
+            # The index range already applies the time window
+            t_lo = t_hi = None
+        else:
+            start, end = 0, self.count
+            t_lo, t_hi = since, until
+
+        if address is not None:
+            unpack = RECORD.unpack_from
+            rows = (unpack(self._records, HEADER.size + i * RECORD.size)
+                    for i in self._address_hits(pack_address(address), start, end))
+        else:
+            view = memoryview(self._records)[HEADER.size + start * RECORD.size:HEADER.size + end * RECORD.size]
+            rows = RECORD.iter_unpack(view)
+
+        lo = -128 if rssi_min is None else rssi_min
+        hi = 127 if rssi_max is None else rssi_max
+        for ts, addr, rssi, flags, cid, offset, n in rows:
+            if t_lo is not None and ts < t_lo:
+                continue
+            if t_hi is not None and ts >= t_hi:
+                continue
+            if company_id is not None and cid != company_id:
+                continue
+            if not lo <= rssi <= hi:
+                continue
+            privacy = "RAND" if flags & FLAG_RANDOM else "PUBLIC" if flags & FLAG_PUBLIC else "?"
+            payload = self.payload(offset, n) if with_payload else b""
+            yield Sighting(ts, unpack_address(addr), rssi, privacy, None if cid == NO_COMPANY else cid, payload)
+
+
+def parse_company(text):
+    """Accepts a numeric company ID (decimal or 0x..) or part of a vendor name."""
+    try:
+        return int(text, 0)
+    except ValueError:
+        pass
+    needle = text.lower()
+    for cid, name in vendors.COMPANY_IDS.items():
+        if needle in name.lower():
+            return cid
+    raise argparse.ArgumentTypeError(f"Unknown company: {text}")
+
+
+def parse_time(text):
+    """Accepts epoch seconds, an ISO timestamp, or HH:MM[:SS] (today)."""
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        pass
+    for fmt in ("%H:%M:%S", "%H:%M"):
+        try:
+            t = datetime.strptime(text, fmt).time()
+            return datetime.combine(datetime.now().date(), t).timestamp()
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f"Bad time: {text}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="bluesentry query",
+        description="Filter binary session logs (--log-format bin) without loading them.",
+    )
+    parser.add_argument("files", nargs="+", help="One or more .bsl session logs")
+    parser.add_argument("-a", "--address", help="Only this device address")
+    parser.add_argument("-c", "--company", type=parse_company, help="Company ID or vendor name (e.g. 76, 0x004c, apple)")
+    parser.add_argument("--rssi-min", type=int, help="Minimum RSSI (dBm)")
+    parser.add_argument("--rssi-max", type=int, help="Maximum RSSI (dBm)")
+    parser.add_argument("--since", type=parse_time, help="Start time (epoch, ISO or HH:MM[:SS])")
+    parser.add_argument("--until", type=parse_time, help="End time (epoch, ISO or HH:MM[:SS])")
+    parser.add_argument("--payload", action="store_true", help="Print the raw manufacturer payload")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many matches")
+    parser.add_argument("--count", action="store_true", help="Only print the number of matches")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    matches = 0
+    scanned = 0
+    out = sys.stdout
+    try:
+        for path in args.files:
+            with BinLog(path) as log:
+                scanned += len(log)
+                for s in log.query(args.address, args.company, args.rssi_min, args.rssi_max,
+                                   args.since, args.until, with_payload=args.payload):
+                    matches += 1
+                    if not args.count:
+                        stamp = datetime.fromtimestamp(s.time).isoformat(timespec="milliseconds")
+                        vendor = "" if s.company_id is None else vendors.COMPANY_IDS.get(s.company_id, f"ID: {s.company_id}")
+                        line = f"{stamp}  {s.address}  {s.rssi:>4}  {s.privacy:<6}  {vendor}"
+                        if args.payload and s.payload:
+                            line += f"  {s.payload.hex()}"
+                        out.write(line + "\n")
+                    if args.limit and matches >= args.limit:
+                        break
+            if args.limit and matches >= args.limit:
+                break
+    except BrokenPipeError:
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"[-] Error: {e}", file=sys.stderr)
+        return 1
+
+    elapsed = time.perf_counter() - started
+    if args.count:
+        print(matches)
+    print(f"[*] {matches} matches in {scanned} records ({elapsed:.2f}s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
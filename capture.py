@@ -0,0 +1,279 @@
+import asyncio
+import struct
+import sys
+import time
+import uuid
+from collections import namedtuple
+
+# Capture file format (little endian):
+#   header : b"BSCAP\x01"
+#   record : u16 length, then the record body
+#   body   : f64 timestamp, i8 rssi, i8 tx_power (127 = unknown),
+#            u8 address len + address, u8 name len + name (utf-8),
+#            u8 manufacturer count + [u16 company id, u8 len, payload]...,
+#            u8 service count + [16 byte uuid]...
+# A record that is cut short (crash mid-write) is ignored on read.
+
+MAGIC = b"BSCAP\x01"
+TX_UNKNOWN = 127
+
+_LEN = struct.Struct("<H")
+_HEAD = struct.Struct("<dbb")
+_MFR = struct.Struct("<HB")
+
+# Lightweight stand-ins for bleak's BLEDevice / AdvertisementData.
+# They expose the attributes process_device and the tracker read.
+ReplayDevice = namedtuple("ReplayDevice", "address name rssi")
+ReplayAdvertisement = namedtuple(
+    "ReplayAdvertisement",
+    "local_name manufacturer_data service_data service_uuids tx_power rssi",
+)
+
+
+def _short(text):
+    """Encodes a string as u8 length + utf-8 bytes (truncated to 255)."""
+    raw = (text or "").encode("utf-8")[:255]
+    return bytes([len(raw)]) + raw
+
+
+def encode_record(timestamp, address, rssi, name=None, manufacturer_data=None,
+                  service_uuids=(), tx_power=None):
+    """Packs a single sighting into a capture record body."""
+    rssi = max(-128, min(126, int(rssi if rssi is not None else -100)))
+    tx = TX_UNKNOWN if tx_power is None else max(-128, min(126, int(tx_power)))
+
+    parts = [_HEAD.pack(timestamp, rssi, tx), _short(address), _short(name)]
+
+    mfr = manufacturer_data or {}
+    parts.append(bytes([min(len(mfr), 255)]))
+    for company_id, payload in list(mfr.items())[:255]:
+        payload = bytes(payload)[:255]
+        parts.append(_MFR.pack(company_id, len(payload)))
+        parts.append(payload)
+
+    uuids = list(service_uuids or ())[:255]
+    parts.append(bytes([len(uuids)]))
+    for s in uuids:
+        parts.append(uuid.UUID(str(s)).bytes)
+
+    return b"".join(parts)
+
+
+def decode_record(body):
+    """
+    Unpacks a record body.
+    Returns (timestamp, ReplayDevice, ReplayAdvertisement).
+    """
+    timestamp, rssi, tx = _HEAD.unpack_from(body, 0)
+    pos = _HEAD.size
+
+    n = body[pos]
+    address = str(body[pos + 1:pos + 1 + n], "utf-8")
+    pos += 1 + n
+
+    n = body[pos]
+    name = str(body[pos + 1:pos + 1 + n], "utf-8", "replace") or None
+    pos += 1 + n
+
+    manufacturer_data = {}
+    count = body[pos]
+    pos += 1
+    for _ in range(count):
+        company_id, n = _MFR.unpack_from(body, pos)
+        pos += _MFR.size
+        manufacturer_data[company_id] = bytes(body[pos:pos + n])
+        pos += n
+
+    service_uuids = []
+    count = body[pos]
+    pos += 1
+    for _ in range(count):
+        service_uuids.append(str(uuid.UUID(bytes=bytes(body[pos:pos + 16]))))
+        pos += 16
+
+    tx_power = None if tx == TX_UNKNOWN else tx
+    device = ReplayDevice(address, name, rssi)
+    adv = ReplayAdvertisement(name, manufacturer_data, {}, service_uuids, tx_power, rssi)
+    return timestamp, device, adv
+
+
+class CaptureWriter:
+    """Appends advertisements to a capture file while scanning."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._f = open(path, "wb")
+        self._f.write(MAGIC)
+
+    def write(self, device, advertisement_data, timestamp=None):
+        body = encode_record(
+            time.time() if timestamp is None else timestamp,
+            device.address,
+            advertisement_data.rssi,
+            device.name or advertisement_data.local_name,
+            advertisement_data.manufacturer_data,
+            advertisement_data.service_uuids,
+            getattr(advertisement_data, "tx_power", None),
+        )
+        self._f.write(_LEN.pack(len(body)))
+        self._f.write(body)
+        self.count += 1
+
+    def tap(self, callback):
+        """Wraps a detection callback so every advertisement is recorded first."""
+        def recording_callback(device, advertisement_data):
+            self.write(device, advertisement_data)
+            callback(device, advertisement_data)
+        return recording_callback
+
+    def close(self):
+        if not self._f.closed:
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def check_capture(path):
+    """Raises OSError or ValueError unless `path` is a readable capture file."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a BlueSentry capture file")
+
+
+def read_capture(path):
+    """
+    Yields (timestamp, device, advertisement_data) for every complete record.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a BlueSentry capture file")
+
+    view = memoryview(data)
+    pos = len(MAGIC)
+    end = len(data)
+    while pos + _LEN.size <= end:
+        (length,) = _LEN.unpack_from(view, pos)
+        pos += _LEN.size
+        if pos + length > end:
+            break  # Truncated tail
+        yield decode_record(view[pos:pos + length])
+        pos += length
+
+
+def replay_sync(path, callback):
+    """
+    Feeds a capture into a callback as fast as possible, without asyncio.
+    Returns the number of advertisements delivered. Handy for profiling.
+    """
+    count = 0
+    for _, device, adv in read_capture(path):
+        callback(device, adv)
+        count += 1
+    return count
+
+
+class ReplayScanner:
+    """
+    Drop-in stand-in for BleakScanner that replays a capture file.
+
+    speed=1.0 replays in real time, speed=N replays N times faster and
+    speed=0 replays as fast as possible.
+    """
+
+    # How many records to deliver between event loop yields at speed=0
+    BATCH = 256
+
+    def __init__(self, path, detection_callback=None, speed=1.0):
+        self.path = path
+        self.detection_callback = detection_callback
+        self.speed = speed
+        self.delivered = 0
+        self._task = None
+        self._done = asyncio.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def register_detection_callback(self, callback):
+        self.detection_callback = callback
+
+    async def start(self):
+        """Starts replaying. A missing or foreign file raises here, not in the task."""
+        check_capture(self.path)
+        self._done.clear()
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._done.set()
+
+    @property
+    def error(self):
+        """Exception that ended the replay early, or None."""
+        task = self._task
+        if task is None or not task.done() or task.cancelled():
+            return None
+        return task.exception()
+
+    async def wait(self):
+        """Waits until the whole capture has been delivered. Re-raises a failed replay."""
+        await self._done.wait()
+        if self.error is not None:
+            raise self.error
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        first_ts = None
+        start = loop.time()
+        try:
+            for timestamp, device, adv in read_capture(self.path):
+                if self.speed > 0:
+                    if first_ts is None:
+                        first_ts = timestamp
+                    due = start + (timestamp - first_ts) / self.speed
+                    delay = due - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                elif self.delivered % self.BATCH == 0:
+                    await asyncio.sleep(0)
+
+                if self.detection_callback:
+                    self.detection_callback(device, adv)
+                self.delivered += 1
+        finally:
+            self._done.set()
+
+
+def open_scanner(detection_callback, replay=None, speed=1.0):
+    """
+    Returns a live BleakScanner, or a ReplayScanner when a capture is given.
+    """
+    if replay:
+        return ReplayScanner(replay, detection_callback=detection_callback, speed=speed)
+
+    from bleak import BleakScanner
+    return BleakScanner(detection_callback=detection_callback)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python3 capture.py <CAPTURE_FILE>")
+        sys.exit(1)
+
+    for ts, dev, adv in read_capture(sys.argv[1]):
+        stamp = time.strftime("%H:%M:%S", time.localtime(ts))
+        mfr = ",".join(f"{k}:{v.hex()}" for k, v in adv.manufacturer_data.items())
+        print(f"{stamp} {dev.address} {adv.rssi:>4} {dev.name or '-'} {mfr} {' '.join(adv.service_uuids)}")
@@ -0,0 +1,191 @@
+"""
+The `bluesentry` command line.
+
+    bluesentry [scan] [options]      live scanner (default command)
+    bluesentry track MAC [MAC...]    follow the signal of devices
+    bluesentry interrogate MAC...    connect and dump GATT profiles
+    bluesentry query FILE...         filter binary session logs
+    bluesentry analyze PATH...       report over archived logs
+
+Only argparse is imported up front: option defaults are repeated below,
+and the module behind an option type is imported when the option is given.
+The module behind a command (and with it rich, bleak or plotext) is
+imported once the command is known, so `--help`, `query` and headless runs
+start without loading any UI. tools/check_startup.py guards this.
+"""
+import argparse
+import importlib
+import os
+import sys
+
+# Subcommand -> (module, summary). The module's main(argv) parses its own options.
+COMMANDS = {
+    "track": ("tracker", "Follow the signal strength of one or more devices"),
+    "interrogate": ("interrogator", "Connect to devices and dump their GATT profiles"),
+    "query": ("binlog", "Filter binary session logs without loading them"),
+    "analyze": ("analyze", "Aggregate archived logs in parallel into a report"),
+}
+
+# pipeline.DROP_OLDEST / pipeline.POLICIES, repeated so parsing does not load asyncio
+OVERFLOW_POLICIES = ("drop-oldest", "coalesce")
+
+# Defaults of the modules behind the scan options, repeated for the same reason
+# (sqlite3, threading, the vendor tables); tests/test_cli.py keeps them in sync
+LOG_FORMATS = ("bin", "csv", "jsonl")  # sessionlog.SINKS
+DECODE_CACHE_SIZE = 4096  # decoder.DEFAULT_CACHE_SIZE
+REIDENT_GAP = 900.0  # reident.MAX_GAP
+OCCUPANCY_WINDOWS = (60, 900, 3600)  # occupancy.WINDOWS
+OCCUPANCY_INTERVAL = 60.0  # occupancy.EXPORT_INTERVAL
+GATT_CACHE_PATH = os.path.join("~", ".cache", "bluesentry", "gatt_cache.sqlite")  # gattcache.DEFAULT_PATH
+
+USAGE = "bluesentry [scan] [options]\n       bluesentry {%s} ..." % ",".join(COMMANDS)
+DESCRIPTION = (
+    "BlueSentry: Advanced BLE Scanner, Analyzer & Tracker\n\n"
+    "commands:\n"
+    "  scan          Live scan (default, options below)\n"
+    + "".join(f"  {name:<13} {summary}\n" for name, (_, summary) in COMMANDS.items())
+    + "\n`bluesentry COMMAND --help` shows the options of a command."
+)
+
+
+def positive_int(text):
+    """argparse type for sizes that must be at least 1."""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return value
+
+
+def occupancy_windows(text):
+    """--occupancy-windows: see occupancy.parse_windows."""
+    import occupancy
+    try:
+        return occupancy.parse_windows(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def watchlist_file(path):
+    """--watchlist: compiles the rule file while parsing, so mistakes are reported up front."""
+    import watchlist
+    try:
+        return watchlist.load(path)
+    except (OSError, ValueError) as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def build_parser():
+    # Custom Help Formatter to allow newlines in description
+    parser = argparse.ArgumentParser(
+        prog="bluesentry",
+        usage=USAGE,
+        description=DESCRIPTION,
+        formatter_class=argparse.RawTextHelpFormatter,
+        epilog="""[bold]EXAMPLES:[/bold]
+  [green]1. Standard Scan (20s):[/green]
+     sudo bluesentry
+
+  [green]2. Long Scan (60s) with custom log file:[/green]
+     sudo bluesentry --duration 60 --output results.csv
+
+  [green]3. Passive Mode (Background Surveillance):[/green]
+     sudo bluesentry --passive --duration 3600
+
+     Day-long JSONL log, new file every hour:
+     sudo bluesentry --passive --duration 86400 --output day.jsonl --rotate-time 3600
+
+  [green]4. Track a specific device (Bloodhound) / dump its GATT profile:[/green]
+     sudo bluesentry track AA:BB:CC:11:22:33
+     sudo bluesentry interrogate AA:BB:CC:11:22:33
+
+  [green]5. Record a capture, then replay it offline at 10x speed:[/green]
+     sudo bluesentry --record hall.bscap
+     bluesentry --replay hall.bscap --replay-speed 10
+
+  [green]6. Binary session log, then query it:[/green]
+     sudo bluesentry --passive --duration 3600 --output night.bsl
+     bluesentry query night.bsl --company apple --rssi-min -60 --since 02:00
+
+  [green]7. All-day passive capture, rotating addresses merged:[/green]
+     sudo bluesentry --passive --duration 28800 --reident --summary devices.csv
+
+  [green]8. Unattended sensor node (no UI, runs until SIGTERM):[/green]
+     sudo bluesentry --headless --duration 0 --output node.bsl --rotate-time 3600
+
+  [green]9. Profile a replay / expose Prometheus metrics:[/green]
+     bluesentry --replay hall.bscap --replay-speed 0 --passive --profile
+     sudo bluesentry --headless --duration 0 --metrics-port 9464
+
+  [green]10. Alert on watchlist matches (Find My tags, Tiles, known MACs):[/green]
+     sudo bluesentry --headless --duration 0 --watchlist rules.json
+
+  [green]11. People counting: devices present per minute / 15 min / hour:[/green]
+     sudo bluesentry --headless --duration 0 --occupancy-log occupancy.jsonl
+"""
+    )
+
+    parser.add_argument("-t", "--duration", type=int, default=20, help="Scan duration in seconds (default: 20)")
+    parser.add_argument("-o", "--output", type=str, help="Session log filename, streamed during the scan (default: sentry_log_TIMESTAMP.csv)")
+    parser.add_argument("--log-format", choices=LOG_FORMATS, help="Session log format (default: from --output extension, else csv)")
+    parser.add_argument("--flush-interval", type=float, default=1.0, help="Seconds between session log flushes (default: 1)")
+    parser.add_argument("--flush-size", type=positive_int, default=500, help="Sightings per session log write, flushed early when reached (default: 500)")
+    parser.add_argument("--rotate-size", type=float, default=0, help="Start a new log file after this many MB (default: 0 = never)")
+    parser.add_argument("--rotate-time", type=int, default=0, help="Start a new log file after this many seconds (default: 0 = never)")
+    parser.add_argument("--summary", type=str, help="Also write a per-device CSV snapshot at the end of the scan")
+    parser.add_argument("-p", "--passive", action="store_true", help="Run in passive mode (no interactive menu, just log)")
+    parser.add_argument("--headless", action="store_true", help="No UI at all: status lines on stdout, stops on SIGTERM/SIGINT, SIGHUP rotates the log (--duration 0 = run until stopped)")
+    parser.add_argument("--status-interval", type=float, default=60, help="Seconds between headless status lines (default: 60, 0 = none)")
+    parser.add_argument("--max-devices", type=int, default=10000, help="Maximum devices kept in memory, oldest evicted first (default: 10000, 0 = unlimited)")
+    parser.add_argument("--ttl", type=int, default=0, help="Forget devices not seen for this many seconds (default: 0 = never)")
+    parser.add_argument("--decode-cache", type=int, default=DECODE_CACHE_SIZE, help=f"Advertisement decode cache entries (default: {DECODE_CACHE_SIZE}, 0 = off)")
+    parser.add_argument("--coalesce-window", type=float, default=2.0, help="Repeats of an unchanged advertisement within this many seconds skip decoding (default: 2, 0 = off)")
+    parser.add_argument("--queue-size", type=positive_int, default=10000, help="Pending advertisements buffered between the BLE callback and the decoder (default: 10000)")
+    parser.add_argument("--overflow", choices=OVERFLOW_POLICIES, default=OVERFLOW_POLICIES[0], help="What to do when the ingest queue is full (default: drop-oldest)")
+    parser.add_argument("--radar-top", type=int, default=10, help="Strongest devices shown on the radar (default: 10)")
+    parser.add_argument("--reident", action="store_true", help="Merge rotating random addresses of the same device into one entry")
+    parser.add_argument("--reident-gap", type=float, default=REIDENT_GAP, help=f"Longest silence (seconds) between a device's old and new address (default: {REIDENT_GAP:g})")
+    parser.add_argument("--occupancy", action="store_true", help="Count devices present over sliding windows (shown in the status line and stats)")
+    parser.add_argument("--occupancy-windows", type=occupancy_windows, default=OCCUPANCY_WINDOWS, help="Occupancy windows in seconds, comma separated (default: 60,900,3600)")
+    parser.add_argument("--occupancy-log", type=str, help="Append an occupancy snapshot per --occupancy-interval to this JSONL file (implies --occupancy)")
+    parser.add_argument("--occupancy-interval", type=float, default=OCCUPANCY_INTERVAL, help="Seconds between occupancy snapshots (default: 60)")
+    parser.add_argument("--watchlist", type=watchlist_file, metavar="RULES", help="Alert rules (JSON) checked on every advertisement, see watchlist.py")
+    # None = default, so main_entry can tell when they were given with --headless
+    parser.add_argument("--gatt-cache", type=str, help=f"GATT profile cache, labels known devices in the live table (default: {GATT_CACHE_PATH})")
+    parser.add_argument("--gatt-ttl", type=float, help="Days a cached GATT profile stays valid (default: 7)")
+    parser.add_argument("--no-gatt-cache", action="store_true", help="Neither use nor update the GATT profile cache (headless runs never use it)")
+    parser.add_argument("--profile", action="store_true", help="Measure decode/render timings and print a profile at exit")
+    parser.add_argument("--metrics-port", type=int, default=0, help="Serve Prometheus metrics on this local port (default: 0 = off)")
+    parser.add_argument("--metrics-host", type=str, default="127.0.0.1", help="Address for --metrics-port (default: 127.0.0.1)")
+    parser.add_argument("--record", type=str, help="Write every advertisement to a capture file")
+    parser.add_argument("--replay", type=str, help="Replay a capture file instead of using the Bluetooth adapter")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay speed multiplier, 0 = as fast as possible (default: 1)")
+
+    return parser
+
+
+def main_entry(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Subcommands: import only the module that runs
+    command = argv[0] if argv else None
+    if command in COMMANDS:
+        module = importlib.import_module(COMMANDS[command][0])
+        sys.exit(module.main(argv[1:]))
+    if command == "scan":
+        argv = argv[1:]
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.headless:
+        # The cache only labels rows of the live table, which headless runs do not have
+        if args.gatt_cache is not None or args.gatt_ttl is not None:
+            parser.error("--gatt-cache and --gatt-ttl cannot be used with --headless")
+        import daemon
+        sys.exit(daemon.main(args))
+
+    import scanner
+    sys.exit(scanner.main(args))
+
+
+if __name__ == "__main__":
+    main_entry()
@@ -0,0 +1,190 @@
+"""
+Headless scan loop for unattended sensor nodes (`bluesentry --headless`).
+
+No rich, no plotext and no polling: the loop sleeps on an asyncio event
+until the next status line, TTL sweep, the end of the run, or a signal.
+  SIGTERM / SIGINT  stop cleanly (drain the queue, flush and close the log)
+  SIGHUP            start a new session log file (for logrotate)
+"""
+import asyncio
+import signal
+from datetime import datetime
+
+import ingest
+import metrics
+
+# Seconds between --ttl sweeps of the device store (independent of status lines)
+EXPIRE_INTERVAL = 1.0
+
+
+def log(message):
+    print(f"[*] {message}", flush=True)
+
+
+def log_first_error(trace):
+    print(f"[-] Failed to process an advertisement (later failures are only counted):\n{trace}", end="", flush=True)
+
+
+class StatusReporter:
+    """Builds the compact periodic status line."""
+
+    def __init__(self, pipe, started):
+        self.pipe = pipe
+        self.started = started
+        self._last_time = started
+        self._last_received = 0
+
+    def line(self, now):
+        q = self.pipe.stats()
+        stats = ingest.device_store.stats()
+        elapsed = max(now - self._last_time, 1e-9)
+        rate = (q["received"] - self._last_received) / elapsed
+        self._last_time, self._last_received = now, q["received"]
+
+        parts = [
+            datetime.now().strftime("%H:%M:%S"),
+            f"up={now - self.started:.0f}s",
+            f"devices={stats['live']}",
+            f"adverts={q['received']}",
+            f"rate={rate:.0f}/s",
+            f"queue={q['depth']}",
+            f"dropped={q['dropped']}",
+        ]
+        if q["errors"]:
+            parts.append(f"errors={q['errors']}")
+        writer = ingest.session_writer
+        if writer is not None:
+            w = writer.stats()
+            parts.append(f"logged={w['written']}")
+            parts.append(f"logq={w['queue']}")
+            if w["dropped"]:
+                parts.append(f"log_dropped={w['dropped']}")
+        if ingest.reident_index is not None:
+            parts.append(f"merged={ingest.reident_index.merged}")
+        if ingest.alerts is not None:
+            parts.append(f"alerts={ingest.alerts.fired}")
+        if ingest.presence is not None:
+            parts.append("present=" + "/".join(str(ingest.presence.present(w)) for w in ingest.presence.windows))
+        return " ".join(parts)
+
+
+async def run_headless(args):
+    """Scans until the deadline, the end of a replay or a stop signal. Returns an exit code."""
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    reason = ["duration reached"]
+
+    def request_stop(name):
+        reason[0] = f"{name} received"
+        stop.set()
+
+    def request_rotate():
+        writer = ingest.session_writer
+        if writer is not None:
+            writer.rotate()
+            log("SIGHUP received, starting a new log file")
+
+    handled = []
+    for sig, handler in ((signal.SIGTERM, lambda: request_stop("SIGTERM")),
+                         (signal.SIGINT, lambda: request_stop("SIGINT")),
+                         (signal.SIGHUP, request_rotate)):
+        try:
+            loop.add_signal_handler(sig, handler)
+            handled.append(sig)
+        except (NotImplementedError, RuntimeError, AttributeError):
+            pass  # No signal support on this platform / thread
+
+    pipe = scanner = recorder = metrics_server = None
+    code = 0
+    try:
+        # Inside the try: an unwritable --output or --record still gets a clean shutdown
+        ingest.start_session(args, on_alert=lambda line: print(f"[!] ALERT {line}", flush=True))
+        pipe, scanner, recorder = ingest.open_source(args, on_error=log_first_error)
+        log(f"BlueSentry headless: logging to {ingest.session_writer.path}"
+            + (f", replaying {args.replay}" if args.replay else ""))
+
+        started = loop.time()
+        deadline = started + args.duration if args.duration > 0 else None
+        interval = args.status_interval if args.status_interval > 0 else None
+        next_status = started + interval if interval else None
+        next_expire = started + EXPIRE_INTERVAL if args.ttl > 0 else None
+        status = StatusReporter(pipe, started)
+
+        try:
+            metrics_server = await ingest.start_metrics_server(args)
+            if metrics_server:
+                log(f"Metrics on http://{args.metrics_host}:{args.metrics_port}/metrics")
+        except OSError as e:
+            print(f"[-] Metrics endpoint unavailable: {e}", flush=True)
+        pipe.start()
+        await scanner.start()
+        if args.replay:
+            def replay_done(future):
+                if not future.cancelled() and future.exception() is None:
+                    reason[0] = "replay finished"
+                stop.set()
+            asyncio.ensure_future(scanner.wait()).add_done_callback(replay_done)
+
+        while not stop.is_set():
+            wake = min(t for t in (deadline, next_status, next_expire, float("inf")) if t is not None)
+            timeout = None if wake == float("inf") else max(0.0, wake - loop.time())
+            try:
+                await asyncio.wait_for(stop.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+            now = loop.time()
+            if next_expire is not None and now >= next_expire:
+                ingest.device_store.expire()
+                next_expire = now + EXPIRE_INTERVAL
+            if next_status is not None and now >= next_status:
+                log(status.line(now))
+                next_status += interval * (1 + int((now - next_status) // interval))
+            if deadline is not None and now >= deadline:
+                break
+        if args.replay and scanner.error is not None:
+            raise scanner.error
+    except Exception as e:
+        print(f"[-] Error: {e}", flush=True)
+        reason[0] = "error"
+        code = 1
+    finally:
+        for sig in handled:
+            loop.remove_signal_handler(sig)
+        log(f"Stopping ({reason[0]})")
+        if scanner is not None:
+            try:
+                await scanner.stop()
+            except Exception:
+                pass
+        if pipe is not None:
+            await pipe.stop()
+        if metrics_server:
+            metrics_server.close()
+
+        if recorder:
+            recorder.close()
+            log(f"Capture saved: {args.record} ({recorder.count} adverts)")
+        if pipe is not None:
+            for line in ingest.stats_lines(pipe):
+                log(line)
+        if args.profile:
+            for line in metrics.REGISTRY.summary():
+                log(line.strip())
+
+        writer = ingest.close_session()
+        if writer is not None:
+            log_stats = writer.stats()
+            log(f"Session log saved: {', '.join(writer.files)} ({log_stats['written']} sightings, {log_stats['dropped']} dropped)")
+        if args.summary and pipe is not None:
+            try:
+                log(f"Device summary saved: {ingest.write_summary(args.summary)}")
+            except OSError as e:
+                print(f"[-] Failed to save summary: {e}", flush=True)
+                code = 1
+    return code
+
+
+def main(args):
+    """Entry point for `bluesentry --headless` (args from cli.build_parser)."""
+    return asyncio.run(run_headless(args))
@@ -0,0 +1,102 @@
+from collections import namedtuple
+from functools import lru_cache
+
+import vendors
+
+# Prebuilt result of decoding one advertisement's manufacturer data and
+# service list. Cached, so it must never be mutated.
+Classification = namedtuple("Classification", "company_id payload services manufacturer tags")
+
+NO_MANUFACTURER = Classification(-1, b"", (), "Unknown", ())
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+def service_tag(name):
+    """Short display tag for a service name (styled by the UI)."""
+    if "Heart Rate" in name: return "Heart Rate"
+    elif "Battery" in name: return "Battery"
+    elif "Human Interface" in name: return "HID"
+    elif "Google" in name: return "Fast Pair"
+    elif "Tile" in name: return "Tile"
+    elif "Exposure" in name: return "COVID"
+    return name.split(" ")[0]
+
+
+# 16-bit service number -> tag. Computed once at import for the curated
+# services; other SIG services are tagged (or marked None) on first sight.
+SERVICE_TAGS = {number: service_tag(name) for number, name in vendors.SERVICE_UUIDS.overrides.items()}
+
+
+def tag_for(uuid):
+    number = vendors.uuid16(uuid)
+    try:
+        return SERVICE_TAGS[number]
+    except KeyError:
+        name = vendors.SERVICE_UUIDS.get(number)
+        tag = SERVICE_TAGS[number] = service_tag(name) if name else None
+        return tag
+
+
+def _decode(company_id, payload, service_uuids):
+    # Manufacturer (De-Anonymization)
+    if company_id < 0:
+        manufacturer = "Unknown"
+    elif company_id == 76:  # Apple
+        manufacturer = vendors.identify_apple_device(payload)
+    else:
+        manufacturer = vendors.COMPANY_IDS.get(company_id, f"ID: {company_id}")
+
+    # Service tags
+    tags = []
+    for s in service_uuids:
+        tag = tag_for(s)
+        if tag:
+            tags.append(tag)
+
+    return Classification(company_id, payload, service_uuids, manufacturer, tuple(tags))
+
+
+_cached_decode = lru_cache(maxsize=DEFAULT_CACHE_SIZE)(_decode)
+
+
+def configure(max_size=DEFAULT_CACHE_SIZE):
+    """Resizes (and empties) the decode cache. 0 disables caching."""
+    global _cached_decode
+    _cached_decode = lru_cache(maxsize=max_size)(_decode) if max_size else _decode
+
+
+def classify(manufacturer_data, service_uuids):
+    """
+    Returns the Classification for an advertisement.
+    Results are memoized on (company_id, payload bytes, service UUID tuple),
+    so repeats of the same advertisement skip decoding entirely.
+    """
+    if manufacturer_data:
+        company_id = next(iter(manufacturer_data))
+        payload = bytes(manufacturer_data[company_id])
+    else:
+        if not service_uuids:
+            return NO_MANUFACTURER
+        company_id = -1
+        payload = b""
+    return _cached_decode(company_id, payload, tuple(service_uuids))
+
+
+def unchanged(info, manufacturer_data, service_uuids):
+    """True if an advertisement carries exactly what `info` was decoded from."""
+    if manufacturer_data:
+        company_id = next(iter(manufacturer_data))
+        if company_id != info.company_id or manufacturer_data[company_id] != info.payload:
+            return False
+    elif info.company_id >= 0:
+        return False
+    return tuple(service_uuids) == info.services
+
+
+def cache_stats():
+    """Hit/miss counters of the decode cache."""
+    if not hasattr(_cached_decode, "cache_info"):
+        return {"hits": 0, "misses": 0, "size": 0, "max_size": 0}
+    info = _cached_decode.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
@@ -0,0 +1,207 @@
+"""
+On-disk cache of interrogated GATT profiles (SQLite).
+
+Profiles are stored twice:
+  address      the full profile of one device, values included
+  fingerprint  a template for every device with the same advertisement
+               shape: the service layout plus the maker's name. Model,
+               serial and revision strings are never shared, because
+               different models can advertise alike (iPhone, iPad, Mac).
+
+Both kinds expire after `ttl` seconds.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from functools import lru_cache
+
+import vendors
+from vendors import uuid16
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "bluesentry", "gatt_cache.sqlite")
+DEFAULT_TTL = 7 * 24 * 3600
+
+ADDRESS = "address"
+FINGERPRINT = "fingerprint"
+
+# 16-bit characteristics whose value is the same for every device sharing
+# a fingerprint (the fingerprint includes the company ID). Model Number,
+# revisions and PnP ID identify a model and are always read live.
+STATIC_CHARACTERISTICS = {
+    0x2A29: "manufacturer",  # Manufacturer Name String
+}
+DEVICE_NAME = 0x2A00
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    stored REAL NOT NULL,
+    label TEXT,
+    profile TEXT NOT NULL,
+    PRIMARY KEY (kind, key)
+)
+"""
+
+
+def payload_shape(company_id, payload):
+    """
+    Model-bearing part of a manufacturer payload. Apple: the type and
+    length of every Continuity message, plus the model of Proximity
+    Pairing (AirPods) messages. Others: payload length and type byte.
+    """
+    if company_id == 76:
+        parts = []
+        for message in vendors.parse_continuity(payload):
+            part = f"{message.type:02x}/{message.length}"
+            if message.type == vendors.APPLE_PROXIMITY_PAIRING and message.detail:
+                part += f"/{message.detail.model:04x}"
+            parts.append(part)
+        return ".".join(parts)
+    return f"{len(payload)}:{bytes(payload[:1]).hex()}"
+
+
+def fingerprint(company_id, payload, services):
+    """
+    Key of an advertisement's shape: company ID, payload_shape() and the
+    advertised service UUIDs. Counters, rotating IDs and battery levels in
+    the payload body do not change it.
+    """
+    key = f"{company_id}:{payload_shape(company_id, payload)}:{','.join(sorted(services))}"
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+
+@lru_cache(maxsize=4096)
+def fingerprint_of(info):
+    """Fingerprint of a decoder.Classification (memoized, like the decode itself)."""
+    return fingerprint(info.company_id, info.payload, info.services)
+
+
+def static_values(profile):
+    """{uuid: characteristic dict} of the read values shared by every device with the fingerprint."""
+    values = {}
+    for service in profile["services"]:
+        for char in service["characteristics"]:
+            if STATIC_CHARACTERISTICS.get(uuid16(char["uuid"])) and char["value"] is not None:
+                values[char["uuid"]] = char
+    return values
+
+
+def profile_label(profile):
+    """Short description for the scanner table, e.g. "Acme Band 2"."""
+    fields = {}
+    for service in profile["services"]:
+        for char in service["characteristics"]:
+            number = uuid16(char["uuid"])
+            if char["value"] is not None and number in (DEVICE_NAME, 0x2A24, 0x2A29):
+                fields.setdefault(number, char["value"].strip())
+    model = fields.get(0x2A24) or fields.get(DEVICE_NAME)
+    maker = fields.get(0x2A29)
+    if model and maker and not model.startswith(maker):
+        return f"{maker} {model}"
+    return model or maker or f"{sum(len(s['characteristics']) for s in profile['services'])} chars"
+
+
+def template(profile):
+    """Copy of a profile without per-unit values (only static ones are kept)."""
+    keep = static_values(profile)
+    return dict(
+        profile,
+        address=None,
+        services=[
+            dict(service, characteristics=[
+                char if char["uuid"] in keep else dict(char, value=None, raw=None, error=None)
+                for char in service["characteristics"]
+            ])
+            for service in profile["services"]
+        ],
+    )
+
+
+class GattCache:
+    """
+    SQLite-backed profile cache. Profiles are the JSON-ready dicts of
+    interrogator.profile_to_dict(). Labels of fresh entries are kept in
+    memory so the scanner can look them up per sighting without a query.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute(SCHEMA)
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+        self._labels = {}
+        self.purge()
+        for kind, key, label in self._db.execute("SELECT kind, key, label FROM profiles"):
+            self._labels[kind, key] = label
+
+    def _fresh_after(self, now=None):
+        return (now if now is not None else time.time()) - self.ttl
+
+    def get(self, address=None, fingerprint=None, now=None):
+        """
+        Returns (kind, profile dict) of the freshest match, trying the
+        address first and then the fingerprint, or None.
+        """
+        for kind, key in ((ADDRESS, address), (FINGERPRINT, fingerprint)):
+            if key is None:
+                continue
+            row = self._db.execute(
+                "SELECT profile FROM profiles WHERE kind = ? AND key = ? AND stored >= ?",
+                (kind, key, self._fresh_after(now)),
+            ).fetchone()
+            if row:
+                self.hits += 1
+                return kind, json.loads(row[0])
+        self.misses += 1
+        return None
+
+    def put(self, profile, fingerprint=None, now=None):
+        """Stores a profile dict under its address and, as a template, under `fingerprint`."""
+        now = now if now is not None else time.time()
+        rows = [(ADDRESS, profile["address"], now, profile_label(profile), json.dumps(profile))]
+        if fingerprint:
+            shared = template(profile)
+            rows.append((FINGERPRINT, fingerprint, now, profile_label(shared), json.dumps(shared)))
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?, ?)", rows)
+        for kind, key, _, label, _ in rows:
+            self._labels[kind, key] = label
+
+    def label(self, address=None, fingerprint=None):
+        """In-memory label for a device (by address, else by fingerprint), or None."""
+        labels = self._labels
+        return labels.get((ADDRESS, address)) or labels.get((FINGERPRINT, fingerprint))
+
+    def purge(self, now=None):
+        """Deletes expired profiles. Returns how many were removed."""
+        cutoff = self._fresh_after(now)
+        with self._db:
+            removed = self._db.execute("DELETE FROM profiles WHERE stored < ?", (cutoff,)).rowcount
+        if removed:
+            self._labels = {
+                (kind, key): label
+                for kind, key, label in self._db.execute("SELECT kind, key, label FROM profiles")
+            }
+        return removed
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+
+def open_cache(path=DEFAULT_PATH, ttl=DEFAULT_TTL):
+    """Opens the cache, or returns None (with the reason) if it cannot be used."""
+    try:
+        return GattCache(path, ttl), None
+    except (OSError, sqlite3.Error) as e:
+        return None, str(e)
@@ -0,0 +1,286 @@
+"""
+Advertisement ingest shared by every front end: the device store, the
+streaming session log and the per-sighting decode path. Nothing here
+imports rich, so the headless daemon can use it on its own.
+"""
+import csv
+from datetime import datetime
+
+import capture  # Record / replay
+import decoder  # Cached advertisement classification
+import gattcache  # Cached GATT profiles
+import metrics  # Optional instrumentation
+import occupancy  # Sliding-window presence counts
+import pipeline  # Callback -> worker ingest queue
+import reident  # Rotating address re-identification
+import sessionlog  # Streaming session log
+import store  # Device store
+
+# Bounded device store: {address: DeviceRecord}
+device_store = store.DeviceStore()
+
+# Streaming session log (set while a scan is running)
+session_writer = None
+
+# GATT profile cache (known devices are labelled in the table)
+gatt_cache = None
+
+# Merges rotating random addresses into one device (None = off)
+reident_index = None
+
+# Repeats of an unchanged advertisement within this many seconds skip decoding
+coalesce_window = 2.0
+coalesce_stats = {"coalesced": 0, "decoded": 0}
+
+# Devices present per window, vendor, privacy class and RSSI band (None = off)
+presence = None
+
+# Compiled watchlist checked on every sighting (None = off)
+alerts = None
+
+def process_device(device, advertisement_data):
+    """
+    Callback function that triggers whenever a BLE device is seen.
+    Synchronous path: decodes right away. Live scans use the ingest
+    pipeline instead, which queues the raw sighting for process_sighting.
+    """
+    process_sighting(pipeline.raw_sighting(device, advertisement_data))
+
+def process_sighting(raw):
+    """
+    Parses a raw sighting (see pipeline.raw_sighting) into a readable
+    format, applies heuristics and updates the store.
+    """
+    timestamp, address, name, rssi, manufacturer_data, service_uuids, tx_power = raw
+
+    # 1. Device Name
+    dev_name = name or "Unknown"
+    
+    # 2. RSSI
+    rssi = rssi or -100
+
+    # Rotated addresses of a known device are stored under its first address
+    key = reident_index.resolve(address, timestamp) if reident_index is not None else None
+
+    # Fast path: same payload from the same address seen recently.
+    # Only the RSSI aggregates and packet counters change.
+    rec = device_store.get(key or address)
+    if rec is not None and rec.adv_key is not None and timestamp - rec.decoded_at < coalesce_window:
+        info, last_name = rec.adv_key
+        if last_name == dev_name and decoder.unchanged(info, manufacturer_data, service_uuids):
+            device_store.touch(rec, rssi, timestamp)
+            coalesce_stats["coalesced"] += 1
+            if presence is not None:
+                presence.observe(key or address, timestamp, info.company_id, rec.privacy, rssi)
+            if alerts is not None:
+                alerts.check(address, info, rssi, timestamp, key)
+            if session_writer:
+                session_writer.write((timestamp, address, dev_name, rssi, info.manufacturer, info.company_id, info.tags, rec.privacy, info.payload))
+            return
+    coalesce_stats["decoded"] += 1
+    
+    # 3 + 4. Manufacturer Analysis (De-Anonymization) and Service UUIDs
+    # Memoized: repeats of the same payload skip decoding entirely
+    info = decoder.classify(manufacturer_data, service_uuids)
+
+    # 5. Privacy Check
+    try:
+        first_byte = int(address.split(":")[0], 16)
+        is_random = (first_byte & 0x02) == 0x02
+    except:
+        is_random = store.PRIVACY_UNKNOWN
+
+    # 6. Re-identification: a new random address may be a known device after rotation
+    aliases = None
+    if reident_index is not None and key is None and is_random is True:
+        ident = reident_index.link(
+            address, timestamp,
+            reident.identity_key(info.company_id, info.payload, info.services, dev_name, tx_power),
+        )
+        key, aliases = ident.canonical, ident.addresses - 1
+
+    # Store/Update
+    rec = device_store.update(
+        key or address,
+        dev_name,
+        rssi,
+        info.manufacturer,
+        info.company_id,
+        info.tags,
+        is_random,
+        now=timestamp,
+        adv_key=(info, dev_name),
+    )
+    if gatt_cache is not None:
+        rec.profile = gatt_cache.label(address, gattcache.fingerprint_of(info))
+    if aliases is not None:
+        rec.aliases = aliases
+    if presence is not None:
+        presence.observe(key or address, timestamp, info.company_id, rec.privacy, rssi)
+    if alerts is not None:
+        alerts.check(address, info, rssi, timestamp, key)
+
+    # Stream the sighting to the session log
+    if session_writer:
+        session_writer.write((timestamp, address, dev_name, rssi, info.manufacturer, info.company_id, info.tags, rec.privacy, info.payload))
+
+def default_log_name(suffix=".csv"):
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"sentry_log_{timestamp}{suffix}"
+
+def open_session_writer(args):
+    """Starts the streaming session log described by the CLI arguments."""
+    fmt = args.log_format
+    if not fmt:
+        # Pick the format from the output extension (.csv, .jsonl, .bsl)
+        fmt = "csv"
+        for name, sink in sessionlog.SINKS.items():
+            if args.output and args.output.endswith(sink.suffix):
+                fmt = name
+    filename = args.output or default_log_name(sessionlog.SINKS[fmt].suffix)
+    return sessionlog.SessionWriter(
+        filename,
+        fmt=fmt,
+        flush_interval=args.flush_interval,
+        batch_size=args.flush_size,
+        rotate_bytes=int(args.rotate_size * 1024 * 1024),
+        rotate_seconds=args.rotate_time,
+    ).start()
+
+def start_session(args, on_alert=None):
+    """
+    Applies the scan options shared by all front ends and starts the session log.
+    `on_alert` receives the watchlist's alert lines (the "log" action).
+    """
+    global session_writer, coalesce_window, reident_index, presence, alerts
+    session_writer = open_session_writer(args)
+    device_store.configure(max_size=args.max_devices, ttl=args.ttl)
+    decoder.configure(args.decode_cache)
+    coalesce_window = args.coalesce_window
+    reident_index = reident.ReidentIndex(max_gap=args.reident_gap) if args.reident else None
+    presence = None
+    if args.occupancy or args.occupancy_log:
+        presence = occupancy.Occupancy(args.occupancy_windows, export=args.occupancy_log, interval=args.occupancy_interval)
+    alerts = args.watchlist  # Compiled by the CLI (cli.watchlist_file)
+    if alerts is not None:
+        alerts.emit = on_alert
+    if args.profile or args.metrics_port:
+        metrics.enable()
+    return session_writer
+
+def open_source(args, on_error=None):
+    """
+    Builds the advertisement source: (IngestPipeline, scanner, CaptureWriter or None).
+    The BLE callback only queues; the pipeline's worker decodes in batches.
+    `on_error` receives the traceback of the first failed sighting.
+    """
+    handler = process_sighting
+    if metrics.enabled:
+        handler = metrics.timed(process_sighting, metrics.DECODE_SECONDS)
+    ingest = pipeline.IngestPipeline(handler, max_size=args.queue_size, policy=args.overflow, on_error=on_error)
+    if metrics.enabled:
+        register_metrics(ingest)
+    callback = ingest.push
+    recorder = None
+    if args.record:
+        recorder = capture.CaptureWriter(args.record)
+        callback = recorder.tap(ingest.push)
+    scanner = capture.open_scanner(callback, replay=args.replay, speed=args.replay_speed)
+    return ingest, scanner, recorder
+
+def register_metrics(ingest):
+    """Exposes the pipeline, store, decoder and log counters (read when scraped)."""
+    def log_stat(key):
+        return lambda: session_writer.stats()[key] if session_writer else 0
+
+    probe = metrics.REGISTRY.probe
+    probe("bluesentry_adverts_received_total", "Advertisements delivered by the BLE callback", lambda: ingest.received, "counter")
+    probe("bluesentry_adverts_processed_total", "Advertisements decoded and stored", lambda: ingest.processed, "counter")
+    probe("bluesentry_adverts_dropped_total", "Advertisements dropped by a full ingest queue", lambda: ingest.dropped, "counter")
+    probe("bluesentry_ingest_errors_total", "Advertisements skipped because decoding raised", lambda: ingest.errors, "counter")
+    probe("bluesentry_adverts_coalesced_total", "Repeats that skipped decoding", lambda: coalesce_stats["coalesced"], "counter")
+    probe("bluesentry_ingest_queue_depth", "Advertisements waiting to be decoded", lambda: ingest.depth)
+    probe("bluesentry_ingest_latency_seconds", "Callback-to-decode delay of the last batch", lambda: ingest.last_latency)
+    probe("bluesentry_decode_cache_hits_total", "Decode cache hits", lambda: decoder.cache_stats()["hits"], "counter")
+    probe("bluesentry_decode_cache_misses_total", "Decode cache misses", lambda: decoder.cache_stats()["misses"], "counter")
+    probe("bluesentry_devices", "Devices in the store", lambda: len(device_store))
+    probe("bluesentry_devices_evicted_total", "Devices evicted by the size limit or TTL", lambda: device_store.evicted, "counter")
+    probe("bluesentry_store_bytes", "Approximate memory held by the device store", lambda: device_store.stats()["bytes"])
+    probe("bluesentry_log_queue_depth", "Sightings waiting for the session log writer", log_stat("queue"))
+    probe("bluesentry_log_written_total", "Sightings written to the session log", log_stat("written"), "counter")
+    probe("bluesentry_log_dropped_total", "Sightings dropped by a full log queue", log_stat("dropped"), "counter")
+    if alerts is not None:
+        probe("bluesentry_alerts_total", "Watchlist alerts fired", lambda: alerts.fired, "counter")
+    if presence is not None:
+        for window in presence.windows:
+            probe(f"bluesentry_present_{occupancy.window_label(window)}", f"Devices seen in the last {window} s",
+                  lambda window=window: presence.totals[presence.windows.index(window)][occupancy.TOTAL])
+
+async def start_metrics_server(args):
+    """Starts the Prometheus endpoint if --metrics-port is set. Returns the server or None."""
+    if not args.metrics_port:
+        return None
+    return await metrics.serve(args.metrics_port, args.metrics_host)
+
+def close_session():
+    """
+    Drains and closes the session log, occupancy export and watchlist.
+    Returns the writer (for its stats and files), None if it never opened.
+    """
+    global session_writer
+    writer, session_writer = session_writer, None
+    if writer is not None:
+        writer.close()
+    if presence is not None:
+        presence.close()
+    if alerts is not None:
+        alerts.close()
+    return writer
+
+def stats_lines(ingest):
+    """End-of-scan statistics as plain text lines."""
+    stats = device_store.stats()
+    lines = [f"Devices: {stats['live']} live, {stats['evicted']} evicted (~{stats['bytes'] // 1024} KiB)"]
+    cache = decoder.cache_stats()
+    lines.append(f"Decode: {coalesce_stats['coalesced']} repeats coalesced, {coalesce_stats['decoded']} decoded (cache: {cache['hits']} hits, {cache['misses']} misses)")
+    if reident_index is not None:
+        r = reident_index.stats()
+        lines.append(f"Re-identification: {r['merged']} rotated addresses merged ({r['identities']} random devices tracked)")
+    if presence is not None:
+        counts = ", ".join(f"{presence.present(w)} ({occupancy.window_label(w)})" for w in presence.windows)
+        exported = f", {presence.exported} snapshots exported" if presence.exported else ""
+        lines.append(f"Occupancy: {counts} present{exported}")
+    if alerts is not None:
+        a = alerts.stats()
+        failed = f", {a['failed']} actions failed" if a["failed"] else ""
+        dropped = f", {a['dropped']} actions dropped" if a["dropped"] else ""
+        lines.append(f"Watchlist: {a['fired']} alerts from {a['rules']} rules{failed}{dropped}")
+    q = ingest.stats()
+    errors = f", {q['errors']} failed" if q["errors"] else ""
+    lines.append(f"Ingest: {q['processed']} processed in {q['batches']} batches, {q['dropped']} dropped, {q['coalesced']} coalesced{errors}, max latency {q['max_latency_ms']:.0f} ms")
+    return lines
+
+def write_summary(filename=None):
+    """Writes a per-device snapshot of the store (last RSSI) to a CSV file. Returns the filename."""
+    if not filename:
+        filename = default_log_name()
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Address", "Name", "Manufacturer", "Last RSSI", "Services", "Privacy",
+                         "Min RSSI", "Max RSSI", "Avg RSSI", "Packets", "Adv/s"])
+        
+        for addr, rec in device_store.items():
+            writer.writerow([
+                addr, 
+                rec.name, 
+                rec.manufacturer, 
+                rec.rssi, 
+                ", ".join(rec.tags),
+                rec.privacy,
+                rec.rssi_min,
+                rec.rssi_max,
+                round(rec.rssi_ema, 1),
+                rec.count,
+                round(rec.rate, 2)
+            ])
+    return filename
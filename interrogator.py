@@ -1,62 +1,267 @@
+import argparse
 import asyncio
+import json
 import sys
-from bleak import BleakClient
-
-# Common Bluetooth UUIDs for readability
-UUID_MAP = {
-    "00001800-0000-1000-8000-00805f9b34fb": "Generic Access",
-    "00001801-0000-1000-8000-00805f9b34fb": "Generic Attribute",
-    "0000180a-0000-1000-8000-00805f9b34fb": "Device Information",
-    "0000180f-0000-1000-8000-00805f9b34fb": "Battery Service",
-    "0000180d-0000-1000-8000-00805f9b34fb": "Heart Rate",
-    "00002a00-0000-1000-8000-00805f9b34fb": "Device Name",
-    "00002a19-0000-1000-8000-00805f9b34fb": "Battery Level",
-    "00002a29-0000-1000-8000-00805f9b34fb": "Manufacturer Name String",
-    "00002a24-0000-1000-8000-00805f9b34fb": "Model Number String",
-}
-
-async def interrogate_device(address):
-    print(f"[*] Connecting to {address}...")
-    
+import time
+from collections import namedtuple
+
+import gattcache  # Profile cache
+import vendors  # SIG service / characteristic names
+
+# Defaults
+CONCURRENCY = 4         # GATT reads in flight per connection
+READ_TIMEOUT = 5.0      # Seconds per read attempt
+RETRIES = 2             # Extra attempts after a failed/timed out read
+CONNECT_TIMEOUT = 10.0  # Seconds to establish a connection
+SLOTS = 2               # Devices connected at the same time
+
+# Structured results. `value` is the decoded text (or hex), `raw` the bytes;
+# both are None if the characteristic was not readable or the read failed.
+CharacteristicInfo = namedtuple("CharacteristicInfo", "uuid name handle properties value raw error attempts")
+ServiceInfo = namedtuple("ServiceInfo", "uuid name characteristics")
+# source: "live" (everything read over the air), "cache" (known address, no
+# connection) or "template" (connected; the maker's name from a same-fingerprint profile)
+DeviceProfile = namedtuple("DeviceProfile", "address connected services error elapsed source", defaults=("live",))
+
+
+def decode_value(value):
+    """Text if the value is printable UTF-8, otherwise hex."""
     try:
-        async with BleakClient(address) as client:
-            print(f"[+] Connected to {address}")
-            print(f"    Paired: {client.is_connected}")
-
-            print("\n[*] Enumerating Services...")
-            for service in client.services:
-                service_name = UUID_MAP.get(str(service.uuid), "Unknown Service")
-                print(f"\nSERVICE: {service.uuid} ({service_name})")
-                
-                for char in service.characteristics:
-                    char_name = UUID_MAP.get(str(char.uuid), "Unknown Characteristic")
-                    props = ",".join(char.properties)
-                    print(f"  └── CHAR: {char.uuid} ({char_name})")
-                    print(f"      Properties: [{props}]")
-
-                    # Attempt to READ readable characteristics
-                    if "read" in char.properties:
-                        try:
-                            # Standard UUIDs often contain simple strings or bytes
-                            value = await client.read_gatt_char(char.uuid)
-                            
-                            # Try to decode as string, otherwise show hex
-                            try:
-                                decoded_val = value.decode('utf-8')
-                            except:
-                                decoded_val = value.hex()
-                                
-                            print(f"      >>> VALUE: {decoded_val}")
-                        except Exception as e:
-                            print(f"      >>> READ FAILED: {e}")
+        text = bytes(value).decode("utf-8")
+    except UnicodeDecodeError:
+        return bytes(value).hex()
+    return text if text.isprintable() else bytes(value).hex()
+
+
+async def read_characteristic(client, char, limit, timeout=READ_TIMEOUT, retries=RETRIES):
+    """
+    Reads one characteristic under the `limit` semaphore.
+    Returns (raw bytes or None, error string or None, attempts).
+    """
+    error = None
+    for attempt in range(1, retries + 2):
+        async with limit:
+            try:
+                raw = await asyncio.wait_for(client.read_gatt_char(char), timeout)
+                return bytes(raw), None, attempt
+            except asyncio.TimeoutError:
+                error = f"timed out after {timeout:g}s"
+            except Exception as e:
+                error = str(e) or type(e).__name__
+        if attempt <= retries:
+            await asyncio.sleep(0.1 * attempt)
+    return None, error, retries + 1
+
+
+async def read_profile(client, concurrency=CONCURRENCY, read_timeout=READ_TIMEOUT, retries=RETRIES, known=None):
+    """
+    Enumerates services of a connected client and reads every readable
+    characteristic concurrently. Characteristics in `known` ({uuid: cached
+    characteristic dict}) are taken from the cache instead of being read.
+    """
+    known = known or {}
+    limit = asyncio.Semaphore(max(1, concurrency))
+    layout = []
+    reads = []
+    for service in client.services:
+        chars = list(service.characteristics)
+        layout.append((service, chars))
+        for char in chars:
+            if "read" in char.properties and char.uuid not in known:
+                reads.append(read_characteristic(client, char, limit, read_timeout, retries))
 
+    results = iter(await asyncio.gather(*reads))
+
+    services = []
+    for service, chars in layout:
+        infos = []
+        for char in chars:
+            raw = error = None
+            attempts = 0
+            if char.uuid in known:
+                raw = bytes.fromhex(known[char.uuid]["raw"])
+            elif "read" in char.properties:
+                raw, error, attempts = next(results)
+            infos.append(CharacteristicInfo(
+                char.uuid,
+                vendors.gatt_name(char.uuid, "Unknown Characteristic"),
+                getattr(char, "handle", None),
+                tuple(char.properties),
+                decode_value(raw) if raw is not None else None,
+                raw, error, attempts,
+            ))
+        services.append(ServiceInfo(service.uuid, vendors.gatt_name(service.uuid, "Unknown Service"), tuple(infos)))
+    return tuple(services)
+
+
+def _client(address, timeout):
+    from bleak import BleakClient
+    return BleakClient(address, timeout=timeout)
+
+
+async def interrogate_device(address, concurrency=CONCURRENCY, read_timeout=READ_TIMEOUT,
+                             retries=RETRIES, connect_timeout=CONNECT_TIMEOUT, client_factory=_client,
+                             cache=None, fingerprint=None, refresh=False):
+    """
+    Connects to one device and returns its DeviceProfile.
+    Never raises for device errors: a failed connection is reported in `error`.
+
+    With a gattcache.GattCache, a fresh profile of the same address is
+    returned without connecting, and a profile with the same `fingerprint`
+    spares the reads of values shared by the whole fingerprint. `refresh` ignores cached profiles.
+    Successful interrogations are stored back into the cache.
+    """
+    started = time.monotonic()
+    known = None
+    if cache is not None and not refresh:
+        hit = cache.get(address, fingerprint)
+        if hit:
+            kind, data = hit
+            if kind == gattcache.ADDRESS:
+                return profile_from_dict(data, source="cache", elapsed=time.monotonic() - started)
+            known = gattcache.static_values(data)
+
+    connected = False
+    try:
+        async with client_factory(address, connect_timeout) as client:
+            connected = True
+            services = await read_profile(client, concurrency, read_timeout, retries, known)
     except Exception as e:
-        print(f"[-] Error: {e}")
+        return DeviceProfile(address, connected, (), str(e) or type(e).__name__, time.monotonic() - started)
+
+    profile = DeviceProfile(address, True, services, None, time.monotonic() - started,
+                            "template" if known else "live")
+    if cache is not None:
+        cache.put(profile_to_dict(profile), fingerprint)
+    return profile
+
+
+async def interrogate_many(addresses, slots=SLOTS, on_result=None, fingerprints=None, **options):
+    """
+    Works through a queue of addresses with at most `slots` connections open
+    at once. Returns the profiles in input order; `on_result(profile)` is
+    called as each one finishes. `fingerprints` maps addresses to their
+    advertisement fingerprint; `options` go to interrogate_device().
+    """
+    addresses = list(addresses)
+    fingerprints = fingerprints or {}
+    queue = asyncio.Queue()
+    for i, address in enumerate(addresses):
+        queue.put_nowait((i, address))
+    profiles = [None] * len(addresses)
+
+    async def worker():
+        while True:
+            try:
+                i, address = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            profile = await interrogate_device(address, fingerprint=fingerprints.get(address), **options)
+            profiles[i] = profile
+            if on_result:
+                on_result(profile)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(slots, len(addresses))))))
+    return profiles
+
+
+def profile_to_dict(profile):
+    """JSON-friendly form of a DeviceProfile (raw bytes as hex)."""
+    return {
+        "address": profile.address,
+        "connected": profile.connected,
+        "error": profile.error,
+        "elapsed": round(profile.elapsed, 3),
+        "source": profile.source,
+        "services": [
+            {
+                "uuid": s.uuid,
+                "name": s.name,
+                "characteristics": [
+                    dict(c._asdict(), properties=list(c.properties), raw=c.raw.hex() if c.raw is not None else None)
+                    for c in s.characteristics
+                ],
+            }
+            for s in profile.services
+        ],
+    }
+
+
+def profile_from_dict(data, **fields):
+    """Inverse of profile_to_dict(); `fields` override DeviceProfile fields."""
+    services = tuple(
+        ServiceInfo(s["uuid"], s["name"], tuple(
+            CharacteristicInfo(
+                c["uuid"], c["name"], c["handle"], tuple(c["properties"]), c["value"],
+                bytes.fromhex(c["raw"]) if c["raw"] is not None else None,
+                c["error"], c["attempts"],
+            )
+            for c in s["characteristics"]
+        ))
+        for s in data["services"]
+    )
+    profile = DeviceProfile(data["address"], data["connected"], services, data["error"],
+                            data["elapsed"], data.get("source", "live"))
+    return profile._replace(**fields)
+
+
+def print_profile(profile):
+    if not profile.connected:
+        print(f"[-] {profile.address}: {profile.error}")
+        return
+    source = "" if profile.source == "live" else f", {profile.source}"
+    print(f"[+] {profile.address} ({profile.elapsed:.1f}s{source})")
+    if profile.error:
+        print(f"[-] Error: {profile.error}")
+    for service in profile.services:
+        print(f"\nSERVICE: {service.uuid} ({service.name})")
+        for char in service.characteristics:
+            print(f"  └── CHAR: {char.uuid} ({char.name})")
+            print(f"      Properties: [{','.join(char.properties)}]")
+            if char.value is not None:
+                print(f"      >>> VALUE: {char.value}")
+            elif char.error:
+                print(f"      >>> READ FAILED: {char.error}")
+    print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="bluesentry interrogate",
+        description="BlueSentry Interrogator: connect and dump GATT profiles",
+    )
+    parser.add_argument("addresses", nargs="+", metavar="MAC_ADDRESS", help="Device(s) to interrogate")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help=f"Reads in flight per device (default: {CONCURRENCY})")
+    parser.add_argument("--timeout", type=float, default=READ_TIMEOUT, help=f"Seconds per read (default: {READ_TIMEOUT:g})")
+    parser.add_argument("--retries", type=int, default=RETRIES, help=f"Retries per failed read (default: {RETRIES})")
+    parser.add_argument("--slots", type=int, default=SLOTS, help=f"Devices connected at once (default: {SLOTS})")
+    parser.add_argument("--json", action="store_true", help="Print profiles as JSON")
+    parser.add_argument("--cache", type=str, default=gattcache.DEFAULT_PATH, help="GATT profile cache (default: %(default)s)")
+    parser.add_argument("--cache-ttl", type=float, default=gattcache.DEFAULT_TTL / 86400, help="Days a cached profile stays valid (default: 7)")
+    parser.add_argument("--no-cache", action="store_true", help="Neither use nor update the profile cache")
+    parser.add_argument("--refresh", action="store_true", help="Re-interrogate even if a cached profile exists")
+    args = parser.parse_args(argv)
+
+    cache = None
+    if not args.no_cache:
+        cache, error = gattcache.open_cache(args.cache, args.cache_ttl * 86400)
+        if error and not args.json:
+            print(f"[-] Profile cache unavailable: {error}")
+
+    if not args.json:
+        print(f"[*] Interrogating {len(args.addresses)} device(s), {args.slots} at a time...")
+    profiles = asyncio.run(interrogate_many(
+        args.addresses, slots=args.slots,
+        on_result=None if args.json else print_profile,
+        concurrency=args.concurrency, read_timeout=args.timeout, retries=args.retries,
+        cache=cache, refresh=args.refresh,
+    ))
+    if cache:
+        cache.close()
+    if args.json:
+        print(json.dumps([profile_to_dict(p) for p in profiles], indent=2))
+    return 0 if all(p.connected for p in profiles) else 1
+
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python3 interrogator.py <MAC_ADDRESS>")
-        sys.exit(1)
-    
-    target_mac = sys.argv[1]
-    asyncio.run(interrogate_device(target_mac))
\ No newline at end of file
+    sys.exit(main())
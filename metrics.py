@@ -0,0 +1,221 @@
+"""
+Built-in instrumentation: counters, gauges and latency histograms.
+
+Nothing is measured unless enable() was called: hot-path timing is added
+by wrapping functions with timed() at setup time, so a disabled run has
+no extra work per advertisement. Values are exposed as a text summary
+(--profile) and in Prometheus text format over a small local HTTP server
+(--metrics-port).
+"""
+import asyncio
+import time
+from bisect import bisect_left
+
+# Latency buckets (seconds), 25 us .. 1 s
+DEFAULT_BUCKETS = (
+    0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+enabled = False
+started = time.monotonic()
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus semantics)."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot: +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Upper bucket bound below which a fraction `q` of observations fall."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def reset(self):
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def exposition(self):
+        lines = []
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            lines.append(f'{self.name}_bucket{{le="{bound:g}"}} {seen}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {self.sum:.9g}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class Probe:
+    """Counter or gauge whose value is read from existing state when scraped."""
+
+    def __init__(self, name, help, read, kind="gauge"):
+        self.name = name
+        self.help = help
+        self.read = read
+        self.kind = kind
+
+    def value(self):
+        try:
+            return self.read()
+        except Exception:
+            return 0
+
+    def exposition(self):
+        return [f"{self.name} {self.value():.9g}"]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def histogram(self, name, help, buckets=DEFAULT_BUCKETS):
+        return self.metrics.setdefault(name, Histogram(name, help, buckets))
+
+    def probe(self, name, help, read, kind="gauge"):
+        """Registers (or replaces) a counter/gauge read from `read()`."""
+        self.metrics[name] = metric = Probe(name, help, read, kind)
+        return metric
+
+    def exposition(self):
+        """All metrics in Prometheus text format (version 0.0.4)."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.exposition())
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Human readable lines for --profile."""
+        uptime = max(time.monotonic() - started, 1e-9)
+        lines = [f"Profile over {uptime:.1f}s:"]
+        for metric in self.metrics.values():
+            if metric.kind == "histogram":
+                if not metric.count:
+                    continue
+                lines.append(
+                    f"  {metric.name}: n={metric.count} ({metric.count / uptime:.1f}/s) "
+                    f"mean={metric.sum / metric.count * 1e3:.3f}ms p50<={metric.quantile(0.5) * 1e3:.3f}ms "
+                    f"p95<={metric.quantile(0.95) * 1e3:.3f}ms p99<={metric.quantile(0.99) * 1e3:.3f}ms "
+                    f"max={metric.max * 1e3:.3f}ms"
+                )
+            elif metric.kind == "counter":
+                value = metric.value()
+                lines.append(f"  {metric.name}: {value:.10g} ({value / uptime:.1f}/s)")
+            else:
+                lines.append(f"  {metric.name}: {metric.value():.10g}")
+        return lines
+
+
+REGISTRY = Registry()
+
+# Hot-path timings (only fed while enabled)
+DECODE_SECONDS = REGISTRY.histogram("bluesentry_decode_seconds", "Time to decode and store one sighting (process_sighting)")
+FRAME_SECONDS = REGISTRY.histogram("bluesentry_frame_seconds", "Time to build and draw one live view frame")
+TABLE_SECONDS = REGISTRY.histogram("bluesentry_table_seconds", "Time to build the device table (generate_table)")
+
+
+def enable():
+    """Turns instrumentation on. Call before the scan is set up."""
+    global enabled, started
+    enabled = True
+    started = time.monotonic()
+    REGISTRY.probe("bluesentry_uptime_seconds", "Seconds since instrumentation was enabled",
+                   lambda: time.monotonic() - started)
+
+
+def timed(fn, histogram):
+    """Wraps `fn` so every call's duration is observed in `histogram`."""
+    clock = time.perf_counter
+    observe = histogram.observe
+
+    def wrapper(*args):
+        t0 = clock()
+        try:
+            return fn(*args)
+        finally:
+            observe(clock() - t0)
+
+    wrapper.__wrapped__ = fn
+    return wrapper
+
+
+class _Span:
+    __slots__ = ("histogram", "t0")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.t0)
+
+
+class _NullSpan:
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(histogram):
+    """Context manager timing a block into `histogram` (a no-op while disabled)."""
+    return _Span(histogram) if enabled else _NULL_SPAN
+
+
+async def _handle(reader, writer):
+    try:
+        request = await asyncio.wait_for(reader.readline(), 5.0)
+        while (await asyncio.wait_for(reader.readline(), 5.0)) not in (b"\r\n", b"\n", b""):
+            pass  # Headers are not used
+        parts = request.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] in ("/metrics", "/"):
+            body = REGISTRY.exposition().encode()
+            head = "HTTP/1.0 200 OK\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+        else:
+            body = b"Not Found\n"
+            head = "HTTP/1.0 404 Not Found\r\nContent-Type: text/plain\r\n"
+        writer.write(f"{head}Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(port, host="127.0.0.1"):
+    """Starts the Prometheus endpoint (GET /metrics). Returns the asyncio server."""
+    return await asyncio.start_server(_handle, host, port)
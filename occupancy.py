@@ -0,0 +1,224 @@
+"""
+Sliding-window occupancy: how many devices are present, for people counting.
+
+Presence is kept in time buckets. A device belongs to the bucket it was
+last seen in, so seeing it again only moves it from one bucket to
+another. Every window (1 min, 15 min, 1 h by default) keeps a running
+total of the buckets inside it; a bucket that slides out is subtracted
+once. An update costs O(number of windows). Memory is bounded by the
+devices seen within the longest window, which are forgotten after that.
+
+Totals are broken down by vendor, privacy class and RSSI band.
+Snapshots can be appended to a JSONL file at a fixed interval of
+sighting time, so replays export on the recording's clock.
+"""
+import json
+from collections import Counter
+from datetime import datetime
+
+import vendors
+
+WINDOWS = (60, 900, 3600)  # Seconds
+BUCKET_SECONDS = 5.0       # Window edges are this precise
+EXPORT_INTERVAL = 60.0
+
+TOTAL = ("total", "")
+DIMENSIONS = ("vendor", "privacy", "rssi")
+
+_vendor_names = {}
+
+
+def vendor_name(company_id):
+    """Vendor of a company ID (memoized), "Unknown" without manufacturer data."""
+    try:
+        return _vendor_names[company_id]
+    except KeyError:
+        name = vendors.COMPANY_IDS.get(company_id, f"ID: {company_id}") if company_id >= 0 else "Unknown"
+        _vendor_names[company_id] = name
+        return name
+
+
+def rssi_band(rssi):
+    """Same thresholds as the scanner's RSSI colours."""
+    return "near" if rssi > -60 else "mid" if rssi > -80 else "far"
+
+
+def window_label(seconds):
+    """60 -> "1m", 900 -> "15m", 3600 -> "1h"."""
+    if seconds % 3600 == 0:
+        return f"{seconds // 3600:g}h"
+    if seconds % 60 == 0:
+        return f"{seconds // 60:g}m"
+    return f"{seconds:g}s"
+
+
+def parse_windows(text):
+    """ "60,900,3600" -> (60, 900, 3600)."""
+    windows = tuple(sorted({int(part) for part in text.split(",") if part.strip()}))
+    if not windows or windows[0] <= 0:
+        raise ValueError(f"Bad occupancy windows: {text!r}")
+    return windows
+
+
+class Occupancy:
+    """
+    Devices present within each of `windows` seconds, updated per sighting.
+    With `export` (a path), a snapshot() line is appended every `interval`
+    seconds of sighting time.
+    """
+
+    def __init__(self, windows=WINDOWS, bucket=BUCKET_SECONDS, export=None, interval=EXPORT_INTERVAL):
+        self.windows = tuple(sorted(windows))
+        self.bucket = bucket
+        self.spans = [max(1, round(w / bucket)) for w in self.windows]  # Buckets per window
+        self.totals = [Counter() for _ in self.windows]
+        self.current = None        # Index of the newest bucket
+        self._expired = [None] * len(self.windows)  # Newest bucket already subtracted, per window
+        self._buckets = {}         # index -> (Counter of keys, set of addresses)
+        self._devices = {}         # address -> (bucket index, keys)
+
+        self.interval = interval
+        self.exported = 0
+        self._next_export = None
+        self._last_seen = None     # Sighting time not yet covered by an export
+        self._export = open(export, "a") if export else None
+
+    def _advance(self, b):
+        """Moves time forward to bucket `b`, subtracting the buckets that left each window."""
+        previous = self.current
+        self.current = b
+        if previous is None:
+            self._expired = [b - span for span in self.spans]
+            return
+        buckets = self._buckets
+        last = len(self.spans) - 1
+        for i, span in enumerate(self.spans):
+            first_inside = b - span + 1
+            start = self._expired[i] + 1
+            if start >= first_inside:
+                continue
+            self._expired[i] = first_inside - 1
+            total = self.totals[i]
+            if first_inside - start >= span:
+                # Everything that was inside left (a long quiet gap)
+                total.clear()
+                indexes = [index for index in buckets if index < first_inside] if i == last else ()
+            else:
+                indexes = range(start, first_inside)
+                for index in indexes:
+                    entry = buckets.get(index)
+                    if entry:
+                        total.subtract(entry[0])
+            if i == last:
+                # Out of the longest window: forget the bucket and its devices
+                devices = self._devices
+                for index in indexes:
+                    entry = buckets.pop(index, None)
+                    if entry:
+                        for address in entry[1]:
+                            del devices[address]
+
+    def observe(self, address, t, company_id, privacy, rssi):
+        """Records one sighting at time `t` (seconds)."""
+        if self._export is not None:
+            if self._next_export is None:
+                self._next_export = (t // self.interval + 1) * self.interval
+            while t >= self._next_export:
+                self._write(self._next_export)
+                self._next_export += self.interval
+            self._last_seen = t
+
+        b = int(t // self.bucket)
+        if self.current is None or b > self.current:
+            self._advance(b)
+        else:
+            b = self.current  # Late sightings count as now
+
+        keys = (TOTAL, ("vendor", vendor_name(company_id)), ("privacy", privacy), ("rssi", rssi_band(rssi)))
+        old = self._devices.get(address)
+        if old is not None:
+            ob, old_keys = old
+            if ob == b and old_keys == keys:
+                return
+            counts, addresses = self._buckets[ob]
+            for key in old_keys:
+                counts[key] -= 1
+            addresses.discard(address)
+        entry = self._buckets.get(b)
+        if entry is None:
+            entry = self._buckets[b] = (Counter(), set())
+        counts = entry[0]
+        for key in keys:
+            counts[key] += 1
+        entry[1].add(address)
+        self._devices[address] = (b, keys)
+
+        for total, span in zip(self.totals, self.spans):
+            if old is not None and ob > b - span:
+                # Already counted in this window: only a changed band/vendor/class moves
+                if old_keys != keys:
+                    for old_key, key in zip(old_keys, keys):
+                        if old_key != key:
+                            total[old_key] -= 1
+                            total[key] += 1
+            else:
+                for key in keys:
+                    total[key] += 1
+
+    def _window(self, window):
+        if window is None:
+            return 0
+        try:
+            return self.windows.index(window)
+        except ValueError:
+            raise ValueError(f"No {window}s window (have {', '.join(map(str, self.windows))})") from None
+
+    def present(self, window=None, now=None):
+        """Devices seen within `window` seconds (default: the shortest window)."""
+        if now is not None:
+            self.advance(now)
+        return self.totals[self._window(window)][TOTAL]
+
+    def breakdown(self, window=None, now=None):
+        """{"total": n, "vendor": {...}, "privacy": {...}, "rssi": {...}} for one window."""
+        if now is not None:
+            self.advance(now)
+        total = self.totals[self._window(window)]
+        out = {"total": total[TOTAL]}
+        out.update({dimension: {} for dimension in DIMENSIONS})
+        for (dimension, name), n in total.items():
+            if n > 0 and dimension in out and name:
+                out[dimension][name] = n
+        return out
+
+    def snapshot(self, now=None):
+        """Breakdown of every window, keyed by label ("1m", "15m", ...)."""
+        if now is not None:
+            self.advance(now)
+        return {window_label(w): self.breakdown(w) for w in self.windows}
+
+    def advance(self, now):
+        """Lets the windows slide to `now` without a sighting (e.g. before a query)."""
+        b = int(now // self.bucket)
+        if self.current is None or b > self.current:
+            self._advance(b)
+
+    def _write(self, t):
+        self.advance(t - 1e-9)  # State at the end of the interval
+        line = {"time": datetime.fromtimestamp(t).isoformat(timespec="seconds"), "windows": self.snapshot()}
+        self._export.write(json.dumps(line) + "\n")
+        self._export.flush()
+        self.exported += 1
+        self._last_seen = None
+
+    def close(self):
+        """Writes a last snapshot for the unfinished interval and closes the export."""
+        if self._export is not None:
+            if self._last_seen is not None:
+                self._write(self._last_seen)
+            self._export.close()
+            self._export = None
+
+    def __len__(self):
+        """Devices remembered (seen within the longest window)."""
+        return len(self._devices)
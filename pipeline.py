@@ -0,0 +1,182 @@
+import asyncio
+import time
+import traceback
+from collections import deque
+
+# Overflow policies
+DROP_OLDEST = "drop-oldest"
+COALESCE = "coalesce"
+POLICIES = (DROP_OLDEST, COALESCE)
+
+
+def raw_sighting(device, advertisement_data):
+    """
+    The only work done inside the BLE callback: copy out references.
+    (timestamp, address, name, rssi, manufacturer_data, service_uuids, tx_power)
+    """
+    return (
+        time.time(),
+        device.address,
+        device.name or advertisement_data.local_name,
+        advertisement_data.rssi,
+        advertisement_data.manufacturer_data,
+        advertisement_data.service_uuids,
+        getattr(advertisement_data, "tx_power", None),
+    )
+
+
+class IngestPipeline:
+    """
+    Decouples the BLE detection callback from decoding.
+
+    push() is the callback: it stores a raw tuple on a bounded queue and
+    returns. A worker task drains the queue in batches, hands each tuple to
+    `handler`, and yields to the event loop between batches so rendering
+    keeps running under burst load.
+
+    Overflow policies:
+      drop-oldest  the oldest pending sighting is discarded when full
+      coalesce     a pending sighting from the same address is replaced by
+                   the newer one (latest wins); when still full, the oldest
+                   address is discarded
+
+    A handler exception is counted in `errors` and the sighting skipped.
+    The first traceback is kept in `first_error` and passed to `on_error`.
+    """
+
+    def __init__(self, handler, max_size=10000, batch_size=256, policy=DROP_OLDEST, on_error=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        if max_size < 1:
+            raise ValueError(f"Queue size must be at least 1, not {max_size}")
+        self.handler = handler
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.policy = policy
+        self.on_error = on_error
+
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.first_error = None
+        self.batches = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+
+        if policy == COALESCE:
+            self._pending = {}
+        else:
+            self._pending = deque(maxlen=max_size)
+        self._wakeup = None
+        self._task = None
+
+    def push(self, device, advertisement_data):
+        """BLE detection callback."""
+        raw = raw_sighting(device, advertisement_data)
+        self.received += 1
+        pending = self._pending
+
+        if self.policy == COALESCE:
+            address = raw[1]
+            if address in pending:
+                self.coalesced += 1
+            elif len(pending) >= self.max_size:
+                del pending[next(iter(pending))]
+                self.dropped += 1
+            pending[address] = raw
+        else:
+            if len(pending) == self.max_size:
+                self.dropped += 1
+            pending.append(raw)
+
+        if self._wakeup is not None and not self._wakeup.is_set():
+            self._wakeup.set()
+
+    @property
+    def depth(self):
+        return len(self._pending)
+
+    def _take_batch(self):
+        pending = self._pending
+        n = min(self.batch_size, len(pending))
+        if self.policy == COALESCE:
+            batch = []
+            for _ in range(n):
+                address = next(iter(pending))
+                batch.append(pending.pop(address))
+            return batch
+        popleft = pending.popleft
+        return [popleft() for _ in range(n)]
+
+    def drain_batch(self):
+        """Processes up to one batch. Returns how many sightings were handled."""
+        batch = self._take_batch()
+        if not batch:
+            return 0
+
+        latency = time.time() - batch[0][0]
+        self.last_latency = latency
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+        handler = self.handler
+        for raw in batch:
+            try:
+                handler(raw)
+            except Exception:
+                self.errors += 1
+                if self.first_error is None:
+                    self._first_error()
+        self.processed += len(batch)
+        self.batches += 1
+        return len(batch)
+
+    def _first_error(self):
+        self.first_error = traceback.format_exc()
+        if self.on_error is not None:
+            self.on_error(self.first_error)
+
+    def drain(self):
+        """Processes everything pending, synchronously."""
+        while self.drain_batch():
+            pass
+
+    async def run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self.drain_batch():
+                await asyncio.sleep(0)
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        if self._pending:
+            self._wakeup.set()
+        self._task = asyncio.ensure_future(self.run())
+        return self
+
+    async def stop(self):
+        """Stops the worker and processes whatever is still queued."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.drain()
+
+    def stats(self):
+        return {
+            "depth": self.depth,
+            "received": self.received,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "batches": self.batches,
+            "last_latency_ms": self.last_latency * 1000,
+            "max_latency_ms": self.max_latency * 1000,
+        }
@@ -0,0 +1,106 @@
+"""
+Raster engine for the scanner's proximity radar.
+
+The background (crosshairs and the "@" in the middle) is drawn once per
+size. A device is a marker at a distance set by its RSSI and at a fixed
+bearing hashed from its address, so it keeps its place when the ranking
+changes. update() only rewrites the cells whose marker appeared, moved or
+left, and re-joins only those rows: a frame costs the top-K position
+computations, not a pass over the grid.
+"""
+import math
+import zlib
+
+CENTER = "@"
+OVERFLOW = "•"  # Marker of devices ranked beyond the nine digit symbols
+
+TURN = 2 * math.pi / 2 ** 32
+
+
+def bearing(address):
+    """Stable angle (radians) of a device: CRC-32 of its address, same on every run."""
+    return zlib.crc32(address.encode()) * TURN
+
+
+def symbol(rank):
+    """Marker of the device at 0-based `rank`: its table ID (1-9), else a dot."""
+    return str(rank + 1) if rank < 9 else OVERFLOW
+
+
+class RadarRaster:
+    """
+    `width` x `height` character radar. RSSI `hi` (and stronger) sits in the
+    middle, `lo` (and weaker) on the edge. `rows` holds the rendered lines,
+    `cells` the markers ({(y, x): (symbol, style)}) for styling, and
+    `version` is bumped on every change so views can skip idle frames.
+    """
+
+    def __init__(self, width=60, height=15, lo=-100, hi=-30):
+        self.lo = lo
+        self.hi = hi
+        self.version = 0
+        self.resize(width, height)
+
+    def resize(self, width, height):
+        """Sets the size, redraws the background and clears the markers."""
+        self.width = max(3, width)
+        self.height = max(3, height)
+        cy, cx = self.center = (self.height // 2, self.width // 2)
+
+        background = []
+        for y in range(self.height):
+            row = ["-"] * self.width if y == cy else [" "] * self.width
+            if y != cy:
+                row[cx] = "|"
+            background.append(row)
+        background[cy][cx] = CENTER
+
+        self._background = background
+        self._grid = [row[:] for row in background]
+        self.rows = ["".join(row) for row in background]
+        self.cells = {}
+        self.version += 1
+
+    def position(self, address, rssi):
+        """(y, x) cell of a device."""
+        dist = min(max((self.hi - rssi) / (self.hi - self.lo), 0.0), 1.0)
+        angle = bearing(address)
+        cy, cx = self.center
+        x = int(cx + dist * (self.width // 2 - 2) * math.cos(angle))
+        y = int(cy + dist * (self.height // 2 - 1) * math.sin(angle))
+        return min(max(y, 0), self.height - 1), min(max(x, 0), self.width - 1)
+
+    def update(self, devices):
+        """
+        Places the markers of `devices` ([(address, rssi, style)], strongest
+        first). A cell shared by two devices shows the stronger one.
+        Returns True if anything on the radar changed.
+        """
+        cells = {}
+        for rank, (address, rssi, style) in enumerate(devices):
+            pos = self.position(address, rssi)
+            if pos not in cells:
+                cells[pos] = (symbol(rank), style)
+
+        old = self.cells
+        if cells == old:
+            return False
+
+        grid = self._grid
+        dirty = set()
+        for y, x in old.keys() - cells.keys():
+            grid[y][x] = self._background[y][x]
+            dirty.add(y)
+        for (y, x), (mark, _) in cells.items():
+            if grid[y][x] != mark:
+                grid[y][x] = mark
+                dirty.add(y)
+        for y in dirty:
+            self.rows[y] = "".join(grid[y])
+
+        self.cells = cells
+        self.version += 1
+        return True
+
+    def render(self):
+        return "\n".join(self.rows)
@@ -0,0 +1,165 @@
+"""
+Links rotating random addresses back to one logical device.
+
+BLE privacy rotates a device's resolvable private address every few
+minutes, but most of what it advertises stays the same. An advertisement
+is reduced to an identity key (company ID, payload structure with the
+rotating bytes masked out, service set, name, TX power); a new random
+address whose key matches a device that just went quiet is treated as
+that device under its next address.
+"""
+from collections import OrderedDict
+
+import vendors
+
+MIN_GAP = 0.5     # The previous address must be quiet at least this long...
+MAX_GAP = 900.0   # ...and at most this long (about one rotation period)
+PRUNE_EVERY = 1024  # New addresses between prune() passes
+
+
+def payload_shape(company_id, payload):
+    """
+    The non-rotating structure of a manufacturer payload.
+    Apple Continuity: the TLV types and lengths, plus the model of AirPods
+    status messages and the identifiers of iBeacons. Other vendors: the
+    payload length and its first two (type/version) bytes.
+    """
+    if company_id == 76:
+        shape = []
+        for msg in vendors.parse_continuity(payload):
+            detail = msg.detail
+            if isinstance(detail, vendors.AirPodsStatus):
+                shape.append((msg.type, msg.length, detail.model))
+            elif isinstance(detail, vendors.IBeacon):
+                shape.append((msg.type, msg.length, detail.uuid, detail.major, detail.minor))
+            else:
+                shape.append((msg.type, msg.length))
+        return tuple(shape)
+    return len(payload), bytes(payload[:2])
+
+
+def identity_key(company_id, payload, services, name=None, tx_power=None):
+    """Hashable key of the stable features of an advertisement."""
+    if name == "Unknown":
+        name = None
+    return company_id, payload_shape(company_id, payload), frozenset(services), name, tx_power
+
+
+class Identity:
+    """One logical device and the addresses it has used."""
+
+    __slots__ = ("canonical", "key", "address", "addresses", "last_seen")
+
+    def __init__(self, address, key, now):
+        self.canonical = address  # First address seen: the device's key in the store
+        self.key = key
+        self.address = address    # Address currently in use
+        self.addresses = 1
+        self.last_seen = now
+
+
+class ReidentIndex:
+    """
+    address -> Identity map plus, per key, the identities ordered by when
+    they were last seen.
+
+    resolve() is a dict lookup for every sighting of a known address.
+    link() runs once per new random address and only looks at the front of
+    its key's order: the identity that has been quiet the longest. If that
+    one is not quiet for `min_gap` yet, none is. So a new address is linked
+    to the device that went quiet first, in O(1) however many devices
+    share the key. Identities quiet for longer than `max_gap` can no
+    longer be linked. They leave the key order when link() meets them and
+    are pruned oldest-first every PRUNE_EVERY new addresses.
+    """
+
+    def __init__(self, min_gap=MIN_GAP, max_gap=MAX_GAP):
+        self.min_gap = min_gap
+        self.max_gap = max_gap
+        self.merged = 0
+        self._links = 0
+        self._by_address = {}
+        self._by_key = {}             # key -> OrderedDict(canonical -> Identity), least recently seen first
+        self._recent = OrderedDict()  # canonical -> Identity, least recently seen first
+
+    def resolve(self, address, now):
+        """Canonical address of a known random address (and marks it seen), else None."""
+        ident = self._by_address.get(address)
+        if ident is None:
+            return None
+        ident.last_seen = now
+        ident.address = address
+        canonical = ident.canonical
+        self._recent.move_to_end(canonical)
+        group = self._by_key.get(ident.key)
+        if group is None:
+            group = self._by_key[ident.key] = OrderedDict()
+        group[canonical] = ident
+        group.move_to_end(canonical)
+        return canonical
+
+    def link(self, address, now, key):
+        """
+        Registers a new random address. Returns the Identity it belongs to:
+        an existing one whose address went quiet within the gap window, or
+        a new one. Identities still advertising are distinct devices.
+        """
+        group = self._by_key.get(key)
+        ident = None
+        if group:
+            cutoff = now - self.max_gap
+            while group:
+                quietest = next(iter(group.values()))
+                if quietest.last_seen >= cutoff:
+                    if now - quietest.last_seen >= self.min_gap:
+                        ident = quietest
+                    break
+                group.popitem(last=False)  # Quiet too long to be linked (resolve() adds it back)
+            if not group:
+                del self._by_key[key]
+        if ident is not None:
+            ident.addresses += 1
+            self.merged += 1
+        else:
+            ident = Identity(address, key, now)
+            self._recent[address] = ident
+        self._by_address[address] = ident
+        self.resolve(address, now)
+
+        # Sighting time, not wall time: replays prune on the recording's clock
+        self._links += 1
+        if self._links % PRUNE_EVERY == 0:
+            self.prune(now)
+        return ident
+
+    def aliases(self, canonical):
+        """How many other addresses were merged into this device."""
+        ident = self._recent.get(canonical)
+        return ident.addresses - 1 if ident else 0
+
+    def prune(self, now):
+        """Forgets identities quiet for longer than max_gap. Returns how many."""
+        recent = self._recent
+        cutoff = now - self.max_gap
+        pruned = 0
+        while recent:
+            ident = next(iter(recent.values()))
+            if ident.last_seen >= cutoff:
+                break
+            del recent[ident.canonical]
+            group = self._by_key.get(ident.key)
+            if group is not None:
+                group.pop(ident.canonical, None)
+                if not group:
+                    del self._by_key[ident.key]
+            pruned += 1
+        if pruned:
+            self._by_address = {a: i for a, i in self._by_address.items() if i.canonical in recent}
+        return pruned
+
+    def stats(self):
+        return {
+            "addresses": len(self._by_address),
+            "identities": len(self._recent),
+            "merged": self.merged,
+        }
@@ -1,11 +1,8 @@
 import asyncio
+import os
 import sys
-import csv
-import math
 import time
-from datetime import datetime
 
-from bleak import BleakScanner, BleakClient
 from rich.console import Console
 from rich.live import Live
 from rich.table import Table
@@ -15,251 +12,469 @@ from rich.layout import Layout
 from rich.panel import Panel
 from rich.align import Align
 from rich.text import Text
+from rich.tree import Tree
+from rich.markup import escape
 
-import vendors  # Our database
+import ingest  # Device store, session log, decode path
 import tracker  # Our tracking module
+import interrogator  # GATT interrogation engine
+import gattcache  # Cached GATT profiles
+import metrics  # Optional instrumentation
+import occupancy  # Sliding-window presence counts
+import radar  # Proximity radar raster
+import watchlist  # Alert rules
 
 # Initialize Rich Console
 console = Console()
 
-# Dictionary to store detected devices: {address: {data...}}
-detected_devices = {}
-
-def process_device(device, advertisement_data):
+# Device store, session log and decode path live in ingest (rich-free)
+from ingest import device_store
+
+# Rich styling for service tags (applied at render time)
+TAG_STYLES = {
+    "Heart Rate": "red",
+    "Battery": "yellow",
+    "HID": "magenta",
+    "Fast Pair": "blue",
+    "Tile": "green",
+    "COVID": "bold white on red",
+}
+
+def rssi_color(rssi):
+    return "green" if rssi > -60 else "yellow" if rssi > -80 else "red"
+
+def format_tags(tags):
+    """Renders plain service tags as Rich markup."""
+    out = []
+    for tag in tags:
+        style = TAG_STYLES.get(tag)
+        out.append(f"[{style}]{tag}[/{style}]" if style else tag)
+    return ", ".join(out)
+
+def format_rate(rate):
+    """Advertisements per second, as shown in the table."""
+    return f"{rate:.1f}" if rate else "-"
+
+def format_privacy(is_random, short=False):
+    if is_random is None:
+        return "?"
+    if is_random:
+        return "[green]R[/green]" if short else "[green]RAND[/green]"
+    return "[red]P[/red]" if short else "[red]PUBLIC[/red]"
+
+# Devices shown on the radar (strongest first)
+RADAR_TOP = 10
+
+# Radar raster shared by generate_radar_view() callers without their own
+radar_raster = radar.RadarRaster()
+
+def radar_panel(raster):
+    """Panel around a radar raster: markers coloured by signal strength."""
+    text = Text(raster.render())
+    line = raster.width + 1
+    cy, cx = raster.center
+    text.stylize("bold white", cy * line + cx, cy * line + cx + 1)
+    for (y, x), (_, style) in raster.cells.items():
+        text.stylize(style, y * line + x, y * line + x + 1)
+    return Panel(Align.center(text), title="[bold green]RADAR (Proximity Visualization)[/bold green]", box=box.ROUNDED)
+
+def generate_radar_view(raster=None, top=RADAR_TOP):
     """
-    Callback function that triggers whenever a BLE device is seen.
-    Parses raw data into a readable format and applies heuristics.
+    Creates a text-based 'Radar' visualization.
+    RSSI maps to the distance from the center; the angle is fixed per
+    device, and only the markers that changed are redrawn.
     """
-    
-    # 1. Device Name
-    dev_name = device.name or advertisement_data.local_name or "Unknown"
-    
-    # 2. RSSI
-    rssi = advertisement_data.rssi or -100
-    
-    # 3. Manufacturer Analysis (De-Anonymization)
-    manufacturer = "Unknown"
-    man_data_raw = advertisement_data.manufacturer_data
-    
-    if man_data_raw:
-        m_id = list(man_data_raw.keys())[0]
-        m_bytes = man_data_raw[m_id]
-        
-        if m_id == 76: # Apple
-            manufacturer = vendors.identify_apple_device(m_bytes)
-        else:
-            manufacturer = vendors.COMPANY_IDS.get(m_id, f"ID: {m_id}")
-
-    # 4. Service UUIDs
-    services = [str(s) for s in advertisement_data.service_uuids]
-    service_hints = []
-    
-    for s in services:
-        if s in vendors.SERVICE_UUIDS:
-            name = vendors.SERVICE_UUIDS[s]
-            if "Heart Rate" in name: service_hints.append("[red]Heart Rate[/red]")
-            elif "Battery" in name: service_hints.append("[yellow]Battery[/yellow]")
-            elif "Human Interface" in name: service_hints.append("[magenta]HID[/magenta]")
-            elif "Google" in name: service_hints.append("[blue]Fast Pair[/blue]")
-            elif "Tile" in name: service_hints.append("[green]Tile[/green]")
-            elif "Exposure" in name: service_hints.append("[bold white on red]COVID[/bold white on red]")
-            else: service_hints.append(name.split(" ")[0])
-            
-    service_str = ", ".join(service_hints) if service_hints else ""
+    raster = raster or radar_raster
+    raster.update([(rec.address, rec.rssi, rssi_color(rec.rssi)) for rec in device_store.top(top)])
+    return radar_panel(raster)
+
+def build_row_cells(rec):
+    """Renders the per-device cells of a table row (everything but the ID)."""
+    color = rssi_color(rec.rssi)
+
+    # Combine Name and Manufacturer for compact view
+    name_display = rec.name
+    if rec.manufacturer != "Unknown":
+        name_display += f" ([cyan]{rec.manufacturer}[/cyan])"
+    if rec.profile:
+        name_display += f" [magenta]\\[{escape(rec.profile)}][/magenta]"
+
+    address = Text(rec.address)
+    if rec.aliases:
+        address.append(f" +{rec.aliases}", style="dim")
+
+    return (
+        address,
+        Text.from_markup(format_privacy(rec.is_random, short=True)),
+        Text.from_markup(f"[{color}]{rec.rssi}[/{color}]"),
+        Text(format_rate(rec.rate), style="dim"),
+        Text.from_markup(name_display),
+        Text.from_markup(format_tags(rec.tags)),
+    )
 
-    # 5. Privacy Check
-    try:
-        first_byte = int(device.address.split(":")[0], 16)
-        is_random = (first_byte & 0x02) == 0x02
-        privacy_status = "[green]RAND[/green]" if is_random else "[red]PUBLIC[/red]"
-    except:
-        privacy_status = "?"
-
-    # Store/Update
-    detected_devices[device.address] = {
-        "Time": time.strftime("%H:%M:%S"),
-        "Name": dev_name,
-        "RSSI": rssi,
-        "Manufacturer": manufacturer,
-        "Services": service_str,
-        "Privacy": privacy_status,
-        "RawData": man_data_raw  # For logging
-    }
-
-def generate_radar_view():
+class RowCache:
     """
-    Creates a text-based 'Radar' visualization.
-    We map RSSI to distance from center.
+    Keeps rendered row cells for the rows on screen.
+    A device's cells are rebuilt only when one of its displayed values changes.
     """
-    # Canvas size
-    width = 60
-    height = 15
-    center_x = width // 2
-    center_y = height // 2
-    
-    # Create an empty grid
-    grid = [[" " for _ in range(width)] for _ in range(height)]
-    
-    # Draw crosshairs
-    for x in range(width): grid[center_y][x] = "-"
-    for y in range(height): grid[y][center_x] = "|"
-    grid[center_y][center_x] = "[bold white]@[/bold white]" # You are here
-    
-    # Plot devices
-    sorted_devices = sorted(detected_devices.items(), key=lambda x: x[1]['RSSI'], reverse=True)
-    
-    # Limit to top 10 strongest signals to avoid clutter
-    for i, (addr, data) in enumerate(sorted_devices[:10]):
-        rssi = data['RSSI']
-        
-        # Normalize RSSI (-100 to -30) to distance (0 to 1)
-        # Stronger signal (-30) = Closer (0 distance)
-        # Weaker signal (-100) = Farther (1 distance)
-        dist_factor = (rssi + 30) / -70.0 
-        dist_factor = max(0, min(1, dist_factor))
-        
-        # Calculate visuals
-        # We vary angle based on index to spread them out visually (fake angle)
-        angle = (i * (2 * 3.14159)) / min(len(sorted_devices), 10)
-        
-        # Radius in characters
-        radius_x = dist_factor * (width // 2 - 2)
-        radius_y = dist_factor * (height // 2 - 1)
-        
-        pos_x = int(center_x + radius_x * math.cos(angle))
-        pos_y = int(center_y + radius_y * math.sin(angle))
-        
-        # Clamp
-        pos_x = max(0, min(width - 1, pos_x))
-        pos_y = max(0, min(height - 1, pos_y))
-        
-        # Marker
-        symbol = str(i + 1) # ID number
-        color = "green" if rssi > -60 else "yellow" if rssi > -80 else "red"
-        
-        grid[pos_y][pos_x] = f"[{color}]{symbol}[/{color}]"
 
-    # Convert grid to string
-    radar_str = ""
-    for row in grid:
-        radar_str += "".join(row) + "\n"
-        
-    return Panel(Align.center(radar_str), title="[bold green]RADAR (Proximity Visualization)[/bold green]", box=box.ROUNDED)
+    def __init__(self):
+        self._rows = {}
+
+    def cells(self, rec):
+        key = (rec.rssi, format_rate(rec.rate), rec.name, rec.manufacturer, rec.tags, rec.is_random, rec.profile, rec.aliases)
+        hit = self._rows.get(rec.address)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+        cells = build_row_cells(rec)
+        self._rows[rec.address] = (key, cells)
+        return cells
 
-def generate_table():
-    """Generates the Rich Table."""
+    def retain(self, addresses):
+        """Forgets rows that scrolled off screen or were evicted."""
+        self._rows = {a: self._rows[a] for a in addresses if a in self._rows}
+
+def generate_table(start=0, count=None, row_cache=None):
+    """
+    Generates the Rich Table.
+    With `count`, only that many rows from position `start` are built.
+    """
     table = Table(box=box.SIMPLE, show_header=True, header_style="bold blue")
 
-    table.add_column("ID", width=3)
+    table.add_column("ID", width=len(str(len(device_store))) + 1)
     table.add_column("Address", style="dim")
     table.add_column("T", width=4, justify="center") # Type
     table.add_column("RSSI", justify="right")
+    table.add_column("Adv/s", justify="right")
     table.add_column("Name / Manufacturer", style="white")
     table.add_column("Tags", style="dim")
 
-    sorted_devices = sorted(detected_devices.items(), key=lambda x: x[1]['RSSI'], reverse=True)
+    if count is None:
+        records = device_store.ranked()[start:]
+    else:
+        records = device_store.page(start, count)
 
-    for idx, (address, data) in enumerate(sorted_devices):
-        rssi_val = data['RSSI']
-        rssi_color = "green" if rssi_val > -60 else "yellow" if rssi_val > -80 else "red"
-        
-        # Combine Name and Manufacturer for compact view
-        name_display = data['Name']
-        if data['Manufacturer'] != "Unknown":
-            name_display += f" ([cyan]{data['Manufacturer']}[/cyan])"
-            
-        table.add_row(
-            str(idx + 1),
-            address,
-            data['Privacy'].replace("RAND", "R").replace("PUBLIC", "P"),
-            f"[{rssi_color}]{rssi_val}[/{rssi_color}]",
-            name_display,
-            data['Services']
-        )
+    for idx, rec in enumerate(records, start):
+        cells = row_cache.cells(rec) if row_cache else build_row_cells(rec)
+        table.add_row(str(idx + 1), *cells)
+
+    if row_cache:
+        row_cache.retain([rec.address for rec in records])
     return table
 
+class LiveView:
+    """
+    The scanner's live screen (device table + radar).
+
+    Frames are only rebuilt when the device store, the terminal size or the
+    scroll position changed, and the table is virtualized: just the rows
+    that fit on screen are built, with cached cells for unchanged devices.
+    The radar fills the bottom area and shows the `radar_top` strongest
+    devices; its panel is only rebuilt when a marker changed.
+    """
+
+    # Panel borders + table header/padding inside the top area
+    TABLE_CHROME = 6
+    # Panel borders around the radar
+    RADAR_CHROME = 2
+
+    def __init__(self, radar_top=RADAR_TOP):
+        self.offset = 0
+        self.row_cache = RowCache()
+        self.radar_top = radar_top
+        self.radar = radar.RadarRaster(*self.radar_size())
+        self._radar_drawn = None
+        self.input_event = asyncio.Event()
+        self._drawn = None
+        self._layout = Layout()
+        self._layout.split_column(
+            Layout(name="top", ratio=2),
+            Layout(name="bottom", ratio=1)
+        )
+
+    def page_size(self):
+        height = console.size.height
+        return max(1, (height * 2) // 3 - self.TABLE_CHROME)
+
+    def radar_size(self):
+        width, height = console.size
+        return width - 2 * self.RADAR_CHROME, height - (height * 2) // 3 - self.RADAR_CHROME
+
+    def scroll(self, rows):
+        self.offset += rows
+        self._clamp()
+        self.input_event.set()
+
+    def _clamp(self):
+        last = max(0, len(device_store) - self.page_size())
+        self.offset = max(0, min(self.offset, last))
+
+    def handle_keys(self, keys):
+        """Scroll keys: j/k or arrows (row), n/p, space or PgDn/PgUp (page), g/G (top/bottom)."""
+        page = self.page_size()
+        moves = {
+            "j": 1, "\x1b[B": 1,
+            "k": -1, "\x1b[A": -1,
+            "n": page, " ": page, "\x1b[6~": page,
+            "p": -page, "\x1b[5~": -page,
+            "g": -len(device_store), "G": len(device_store),
+        }
+        for seq in sorted(moves, key=len, reverse=True):
+            if keys.startswith(seq):
+                self.scroll(moves[seq])
+                return self.handle_keys(keys[len(seq):])
+        if keys:
+            return self.handle_keys(keys[1:])
+
+    def _state(self):
+        return (device_store.version, tuple(console.size), self.offset)
+
+    @property
+    def dirty(self):
+        return self._state() != self._drawn
+
+    def render(self):
+        if not self.dirty:
+            return self._layout
+
+        self._clamp()
+        rows = self.page_size()
+        total = len(device_store)
+        with metrics.span(metrics.TABLE_SECONDS):
+            table = generate_table(self.offset, rows, self.row_cache)
+
+        first = min(self.offset + 1, total)
+        last = min(self.offset + rows, total)
+        subtitle = f"[dim]{first}-{last} of {total} | j/k scroll, n/p page[/dim]"
+        if ingest.presence is not None:
+            present = ingest.presence
+            counts = " / ".join(f"{present.present(w)} {occupancy.window_label(w)}" for w in present.windows)
+            subtitle = f"[dim]present: {counts} | [/dim]" + subtitle
+
+        title = "BlueSentry Live Feed"
+        if ingest.alerts is not None and ingest.alerts.recent:
+            last = ingest.alerts.recent[-1]
+            title += f" | [bold red]ALERT {escape(last.rule)}: {last.address} {last.rssi} dBm[/bold red] ({ingest.alerts.fired})"
+
+        self._layout["top"].update(Panel(table, title=title, subtitle=subtitle, border_style="blue"))
+        size = self.radar_size()
+        if size != (self.radar.width, self.radar.height):
+            self.radar.resize(*size)
+        self.radar.update([(rec.address, rec.rssi, rssi_color(rec.rssi)) for rec in device_store.top(self.radar_top)])
+        if self.radar.version != self._radar_drawn:
+            self._layout["bottom"].update(radar_panel(self.radar))
+            self._radar_drawn = self.radar.version
+        self._drawn = self._state()
+        return self._layout
+
+live_view = None
+
 def get_layout():
-    layout = Layout()
-    layout.split_column(
-        Layout(name="top", ratio=2),
-        Layout(name="bottom", ratio=1)
-    )
-    layout["top"].update(Panel(generate_table(), title="BlueSentry Live Feed", border_style="blue"))
-    layout["bottom"].update(generate_radar_view())
-    return layout
+    global live_view
+    if live_view is None:
+        live_view = LiveView()
+    return live_view.render()
 
-import argparse
+def attach_keyboard(view):
+    """
+    Feeds keypresses from an interactive terminal to the view for scrolling.
+    Returns a function that restores the terminal.
+    """
+    try:
+        import termios
+        import tty
+    except ImportError:
+        return lambda: None  # Not a Unix terminal
+    if not sys.stdin.isatty():
+        return lambda: None
 
-# ... (Imports remain the same) ...
+    fd = sys.stdin.fileno()
+    old_attrs = termios.tcgetattr(fd)
+    tty.setcbreak(fd)
+    loop = asyncio.get_running_loop()
 
-# [Keep existing helper functions: process_device, generate_radar_view, generate_table, get_layout, save_log, interrogate_target]
+    def on_keys():
+        view.handle_keys(os.read(fd, 64).decode(errors="ignore"))
+
+    loop.add_reader(fd, on_keys)
+
+    def restore():
+        loop.remove_reader(fd)
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_attrs)
+
+    return restore
+
+# ... (Imports remain the same) ...
 
 async def run_scan(args):
     console.print(f"[bold yellow]Initializing BlueSentry System...[/bold yellow]")
     console.print(f"[dim]Mode: {'Passive (No Interaction)' if args.passive else 'Interactive'}[/dim]")
     console.print(f"[dim]Duration: {args.duration}s | Output: {args.output}[/dim]")
-    
-    scanner = BleakScanner(detection_callback=process_device)
+    if args.replay:
+        console.print(f"[dim]Replaying: {args.replay} (speed: {args.replay_speed or 'max'})[/dim]")
+
+    pipe = scanner = recorder = metrics_server = None
+    code = 0
     
     try:
+        # Inside the try: an unwritable --output or --record still gets a clean shutdown
+        ingest.start_session(args)
+        if not args.no_gatt_cache:
+            ttl = gattcache.DEFAULT_TTL if args.gatt_ttl is None else args.gatt_ttl * 86400
+            ingest.gatt_cache, error = gattcache.open_cache(args.gatt_cache or gattcache.DEFAULT_PATH, ttl)
+            if error:
+                console.print(f"[yellow]GATT profile cache unavailable:[/yellow] {error}")
+
+        # The BLE callback only queues; a worker task decodes in batches
+        pipe, scanner, recorder = ingest.open_source(args)
+        try:
+            metrics_server = await ingest.start_metrics_server(args)
+        except OSError as e:
+            console.print(f"[yellow]Metrics endpoint unavailable:[/yellow] {e}")
+        pipe.start()
         await scanner.start()
         
         # Determine loop duration
         start_t = time.time()
         end_t = start_t + args.duration
         
-        with Live(get_layout(), refresh_per_second=4, screen=True) as live:
-            while time.time() < end_t:
-                live.update(get_layout())
-                await asyncio.sleep(0.5)
+        view = LiveView(radar_top=args.radar_top)
+        restore_keyboard = attach_keyboard(view)
+
+        # Refreshed by hand: idle frames (nothing changed) cost nothing
+        try:
+            with Live(view.render(), auto_refresh=False, screen=True) as live:
+                while time.time() < end_t:
+                    device_store.expire()
+                    if view.dirty:
+                        with metrics.span(metrics.FRAME_SECONDS):
+                            live.update(view.render(), refresh=True)
+                    # A finished replay has nothing more to deliver
+                    if getattr(scanner, "done", False):
+                        break
+                    # Wake early on a scroll key
+                    try:
+                        await asyncio.wait_for(view.input_event.wait(), timeout=0.5)
+                    except asyncio.TimeoutError:
+                        pass
+                    view.input_event.clear()
+        finally:
+            restore_keyboard()
+        if getattr(scanner, "error", None) is not None:
+            raise scanner.error
                 
     except KeyboardInterrupt:
         console.print("\n[bold yellow]Scan interrupted by user.[/bold yellow]")
     except Exception as e:
         console.print(f"\n[bold red]CRITICAL ERROR:[/bold red] {e}")
+        code = 1
     finally:
-        try:
-            await scanner.stop()
-        except:
-            pass
+        if scanner is not None:
+            try:
+                await scanner.stop()
+            except:
+                pass
+        if pipe is not None:
+            await pipe.stop()
+        if metrics_server:
+            metrics_server.close()
+
+        if recorder:
+            recorder.close()
+            console.print(f"[bold green]Capture Saved:[/bold green] {args.record} ({recorder.count} adverts)")
         
-        # AUTO-SAVE LOG (Crash Safe)
-        # We pass the custom filename if provided
-        save_log_to_file(args.output) 
-
-    # POST SCAN MENU (Only if not passive)
-    if not args.passive:
-        await show_interactive_menu()
+        if pipe is not None:
+            for line in ingest.stats_lines(pipe):
+                console.print(f"[dim]{line}[/dim]")
+            if pipe.first_error:
+                # Not printed when it happened: the live view owns the screen
+                console.print("[bold red]First advertisement processing failure:[/bold red]")
+                console.print(escape(pipe.first_error.rstrip()))
+        if ingest.alerts is not None:
+            # The live view only shows the latest alert
+            for alert in ingest.alerts.recent:
+                console.print(f"[bold red]ALERT[/bold red] {escape(watchlist.alert_line(alert))}")
+        if args.profile:
+            for line in metrics.REGISTRY.summary():
+                console.print(f"[dim]{line}[/dim]")
+
+        # Session log was streamed during the scan; drain what is left
+        writer = ingest.close_session()
+        if writer is not None:
+            log_stats = writer.stats()
+            console.print(f"[bold green]Session Log Saved:[/bold green] {', '.join(writer.files)} ({log_stats['written']} sightings)")
+            if log_stats["dropped"]:
+                console.print(f"[yellow]{log_stats['dropped']} sightings dropped (log queue full)[/yellow]")
+
+        # Optional per-device snapshot in the classic format
+        if args.summary and pipe is not None:
+            save_log_to_file(args.summary)
+
+    # POST SCAN MENU (Only if not passive, and only if the scan got started)
+    if not args.passive and pipe is not None:
+        await show_interactive_menu(args)
+
+    if ingest.gatt_cache is not None:
+        ingest.gatt_cache.close()
+        ingest.gatt_cache = None
+    return code
 
 def save_log_to_file(filename=None):
-    """Saves the session to a CSV file."""
-    if not filename:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"sentry_log_{timestamp}.csv"
-    
+    """Saves a per-device snapshot of the store (last RSSI) to a CSV file."""
     try:
-        with open(filename, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(["Address", "Name", "Manufacturer", "Last RSSI", "Services", "Privacy"])
-            
-            for addr, data in detected_devices.items():
-                writer.writerow([
-                    addr, 
-                    data['Name'], 
-                    data['Manufacturer'], 
-                    data['RSSI'], 
-                    data['Services'],
-                    data['Privacy']
-                ])
-        console.print(f"[bold green]Session Log Saved:[/bold green] {filename}")
+        filename = ingest.write_summary(filename)
+        console.print(f"[bold green]Device Summary Saved:[/bold green] {filename}")
     except Exception as e:
         console.print(f"[bold red]Failed to save log:[/bold red] {e}")
 
-async def show_interactive_menu():
+def render_profile(profile):
+    """Rich tree of an interrogator.DeviceProfile."""
+    if not profile.connected:
+        return Text(f"{profile.address}: {profile.error}", style="bold red")
+    source = "" if profile.source == "live" else f", {profile.source}"
+    tree = Tree(f"[bold white]{profile.address}[/bold white] [dim]({profile.elapsed:.1f}s{source})[/dim]")
+    if profile.error:
+        tree.add(f"[red]Error: {profile.error}[/red]")
+    for service in profile.services:
+        branch = tree.add(f"[bold cyan]{service.name}[/bold cyan] [dim]{service.uuid}[/dim]")
+        for char in service.characteristics:
+            line = f"{char.name} [dim]{char.uuid} \\[{','.join(char.properties)}][/dim]"
+            if char.value is not None:
+                line += f"\n[green]>>> {escape(char.value)}[/green]"
+            elif char.error:
+                line += f"\n[red]>>> READ FAILED: {escape(char.error)}[/red]"
+            branch.add(line)
+    return tree
+
+async def interrogate_target(addresses):
+    """Interrogates one or more devices (queued, bounded connections) and prints each profile."""
+    if isinstance(addresses, str):
+        addresses = [addresses]
+
+    # Advertisement fingerprints let same-model profiles from the cache shorten the reads
+    fingerprints = {}
+    for address in addresses:
+        rec = device_store.get(address)
+        if rec is not None and rec.adv_key is not None:
+            fingerprints[address] = gattcache.fingerprint_of(rec.adv_key[0])
+
+    def show(profile):
+        console.print(render_profile(profile))
+        rec = device_store.get(profile.address)
+        if rec is not None and ingest.gatt_cache is not None:
+            rec.profile = ingest.gatt_cache.label(profile.address, fingerprints.get(profile.address))
+
+    console.print(f"[bold yellow]Interrogating {len(addresses)} device(s)...[/bold yellow]")
+    return await interrogator.interrogate_many(
+        addresses, on_result=show, fingerprints=fingerprints, cache=ingest.gatt_cache
+    )
+
+async def show_interactive_menu(args=None):
     console.clear()
     console.print(Panel("[bold]Scan Complete[/bold]", style="green"))
     
-    sorted_devs = sorted(detected_devices.items(), key=lambda x: x[1]['RSSI'], reverse=True)
+    # Same ordering (and therefore IDs) as the live table
+    sorted_devs = [(r.address, r) for r in device_store.ranked()]
     if not sorted_devs: 
         console.print("No devices found.")
         return
@@ -275,22 +490,27 @@ async def show_interactive_menu():
         if choice == "0":
             break
             
-        target_idx = Prompt.ask("Enter Device ID from last scan")
-        if not target_idx.isdigit(): continue
+        target_idx = Prompt.ask("Enter Device ID(s) from last scan (comma separated)")
+        ids = [part.strip() for part in target_idx.split(",") if part.strip()]
+        if not ids or not all(part.isdigit() for part in ids): continue
         
-        idx = int(target_idx) - 1
-        if not (0 <= idx < len(sorted_devs)): 
+        indexes = [int(part) - 1 for part in ids]
+        if not all(0 <= idx < len(sorted_devs) for idx in indexes): 
             console.print("[red]Invalid ID[/red]")
             continue
             
-        target_mac = sorted_devs[idx][0]
+        target_macs = list(dict.fromkeys(sorted_devs[idx][0] for idx in indexes))
         
         if choice == "1":
-            await interrogate_target(target_mac)
+            await interrogate_target(target_macs)
         elif choice == "2":
-            # Launch Tracker
+            # Launch Tracker (one scanner follows every selected device)
             try:
-                await tracker.start_tracker(target_mac)
+                await tracker.start_tracker(
+                    target_macs,
+                    replay=getattr(args, "replay", None),
+                    speed=getattr(args, "replay_speed", 1.0),
+                )
             except KeyboardInterrupt:
                 pass
 
@@ -309,42 +529,24 @@ BANNER = r"""
 
 # ... (Previous code remains until main_entry)
 
-def main_entry():
-    # Custom Help Formatter to allow newlines in description
-    parser = argparse.ArgumentParser(
-        description="BlueSentry: Advanced BLE Scanner, Analyzer & Tracker",
-        formatter_class=argparse.RawTextHelpFormatter,
-        epilog="""[bold]EXAMPLES:[/bold]
-  [green]1. Standard Scan (20s):[/green]
-     sudo bluesentry
-
-  [green]2. Long Scan (60s) with custom log file:[/green]
-     sudo bluesentry --duration 60 --output results.csv
-
-  [green]3. Passive Mode (Background Surveillance):[/green]
-     sudo bluesentry --passive --duration 3600
-
-  [green]4. Track a specific device (Bloodhound):[/green]
-     sudo python3 tracker.py AA:BB:CC:11:22:33
-"""
-    )
-    
-    parser.add_argument("-t", "--duration", type=int, default=20, help="Scan duration in seconds (default: 20)")
-    parser.add_argument("-o", "--output", type=str, help="Output CSV filename (default: sentry_log_TIMESTAMP.csv)")
-    parser.add_argument("-p", "--passive", action="store_true", help="Run in passive mode (no interactive menu, just log)")
-    
-    args = parser.parse_args()
-
+def main(args):
+    """Runs the interactive (Rich) scanner with parsed CLI arguments."""
     # Print Banner
     console.print(BANNER)
 
     try:
-        asyncio.run(run_scan(args))
+        return asyncio.run(run_scan(args))
 # ... (Rest of file)
     except KeyboardInterrupt:
         pass
     except Exception as e:
         console.print(f"[red]Fatal Error:[/red] {e}")
+        return 1
+
+def main_entry():
+    # Argument parsing and subcommands live in cli (no UI imports)
+    import cli
+    cli.main_entry()
 
 if __name__ == "__main__":
     main_entry()
@@ -0,0 +1,209 @@
+import csv
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from binlog import BinSink
+
+# One sighting, as queued by the scanner:
+# (timestamp, address, name, rssi, manufacturer, company_id, tags, privacy, payload)
+# The raw manufacturer payload is only kept by the binary sink.
+FIELDS = ("time", "address", "name", "rssi", "manufacturer", "company_id", "services", "privacy")
+
+CSV_HEADER = ["Time", "Address", "Name", "RSSI", "Manufacturer", "Company ID", "Services", "Privacy"]
+
+_STOP = object()
+
+
+class CsvSink:
+    """Appends sightings as CSV rows."""
+
+    suffix = ".csv"
+
+    def __init__(self, path):
+        self.path = path
+        self._f = open(path, "a", newline="")
+        self._writer = csv.writer(self._f)
+        if self._f.tell() == 0:
+            self._writer.writerow(CSV_HEADER)
+
+    def write(self, rows):
+        self._writer.writerows(
+            (
+                datetime.fromtimestamp(ts).isoformat(timespec="milliseconds"),
+                address, name, rssi, manufacturer,
+                company_id if company_id >= 0 else "",
+                ", ".join(tags), privacy,
+            )
+            for ts, address, name, rssi, manufacturer, company_id, tags, privacy, _ in rows
+        )
+
+    def flush(self, fsync=False):
+        self._f.flush()
+        if fsync:
+            os.fsync(self._f.fileno())
+
+    def size(self):
+        return self._f.tell()
+
+    def close(self):
+        self._f.close()
+
+
+class JsonlSink(CsvSink):
+    """
+    Appends sightings as one JSON object per line. Like the empty CSV
+    field, "company_id" is null without manufacturer data.
+    """
+
+    suffix = ".jsonl"
+
+    def __init__(self, path):
+        self.path = path
+        self._f = open(path, "a")
+
+    def write(self, rows):
+        dumps = json.dumps
+        self._f.write("".join(
+            dumps(dict(zip(FIELDS, (ts, address, name, rssi, manufacturer,
+                                    company_id if company_id >= 0 else None, tags, privacy)))) + "\n"
+            for ts, address, name, rssi, manufacturer, company_id, tags, privacy, _ in rows
+        ))
+
+
+SINKS = {"csv": CsvSink, "jsonl": JsonlSink, "bin": BinSink}
+
+
+def rotated_name(path, n):
+    """sentry_log.csv -> sentry_log.1.csv, sentry_log.2.csv, ..."""
+    if n == 0:
+        return path
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{n}{ext}"
+
+
+class SessionWriter:
+    """
+    Streams sightings to disk from a background thread.
+
+    write() only puts a tuple on a bounded queue, so the BLE callback never
+    waits on the disk. The thread writes in batches, flushing every
+    `flush_interval` seconds or `batch_size` rows, and rotates to a new
+    file once `rotate_bytes` or `rotate_seconds` is reached.
+    """
+
+    def __init__(self, path, fmt="csv", flush_interval=1.0, batch_size=500,
+                 rotate_bytes=None, rotate_seconds=None, max_queue=100000, fsync=False):
+        if fmt not in SINKS:
+            raise ValueError(f"Unknown log format: {fmt}")
+        self.path = path
+        self.sink_class = SINKS[fmt]
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.rotate_bytes = rotate_bytes or None
+        self.rotate_seconds = rotate_seconds or None
+        self.fsync = fsync
+
+        self.written = 0
+        self.dropped = 0
+        self.files = []
+
+        self._queue = queue.Queue(max_queue)
+        self._sink = None
+        self._opened_at = 0.0
+        self._rotate_requested = False
+        self._thread = None
+
+    def start(self):
+        self._open(0)
+        self._thread = threading.Thread(target=self._run, name="bluesentry-log", daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self, sighting):
+        """Queues one sighting tuple (see FIELDS). Never blocks."""
+        try:
+            self._queue.put_nowait(sighting)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """Writes everything still queued and closes the file."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def rotate(self):
+        """Starts a new file at the next flush (e.g. on SIGHUP)."""
+        self._rotate_requested = True
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "queue": self.queue_depth,
+            "files": len(self.files),
+        }
+
+    def _open(self, n):
+        path = rotated_name(self.path, n)
+        self._sink = self.sink_class(path)
+        self._opened_at = time.monotonic()
+        self.files.append(path)
+
+    def _rotate_due(self):
+        if self._rotate_requested:
+            self._rotate_requested = False
+            return True
+        if self.rotate_bytes and self._sink.size() >= self.rotate_bytes:
+            return True
+        if self.rotate_seconds and time.monotonic() - self._opened_at >= self.rotate_seconds:
+            return True
+        return False
+
+    def _flush(self, batch):
+        if batch:
+            self._sink.write(batch)
+            self.written += len(batch)
+        self._sink.flush(self.fsync)
+        if self._rotate_due():
+            self._sink.close()
+            self._open(len(self.files))
+
+    def _run(self):
+        get = self._queue.get
+        batch = []
+        next_flush = time.monotonic() + self.flush_interval
+        stopping = False
+
+        while not stopping:
+            try:
+                item = get(timeout=max(0.0, next_flush - time.monotonic()))
+                while item is not _STOP:
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    item = self._queue.get_nowait()
+                else:
+                    stopping = True
+            except queue.Empty:
+                pass
+
+            if stopping or len(batch) >= self.batch_size or time.monotonic() >= next_flush:
+                try:
+                    self._flush(batch)
+                except OSError:
+                    self.dropped += len(batch)
+                batch = []
+                next_flush = time.monotonic() + self.flush_interval
+
+        self._sink.close()
@@ -5,15 +5,17 @@ setup(
     version="1.0.0",
     description="Advanced BLE Scanner, Analyzer & Tracker",
     author="BlueSentry Team",
-    py_modules=["scanner", "tracker", "vendors", "interrogator"],
+    py_modules=["scanner", "tracker", "vendors", "interrogator", "capture", "store", "sessionlog", "binlog", "decoder", "assigned_numbers", "pipeline", "sparkline", "gattcache", "reident", "ingest", "daemon", "cli", "metrics", "radar", "analyze", "occupancy", "watchlist"],
     install_requires=[
         "bleak",
-        "rich",
-        "plotext"
+        "rich"
     ],
+    extras_require={
+        "plotext": ["plotext"],
+    },
     entry_points={
         'console_scripts': [
-            'bluesentry=scanner:main_entry',
+            'bluesentry=cli:main_entry',
         ],
     },
 )
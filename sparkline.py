@@ -0,0 +1,124 @@
+"""
+Lightweight terminal charts for the tracker.
+
+BrailleChart draws a scrolling line chart with Unicode braille cells
+(2 x 4 dots per character). New samples are pushed one dot column at a
+time: the existing rows are shifted and only the newest character column
+is redrawn, so a frame costs a few string slices instead of a full
+plot rebuild.
+"""
+
+BRAILLE_BASE = 0x2800
+
+# Dot bits of one braille cell, bottom dot row first
+LEFT_BITS = (0x40, 0x04, 0x02, 0x01)
+RIGHT_BITS = (0x80, 0x20, 0x10, 0x08)
+
+BLANK = chr(BRAILLE_BASE)
+
+
+class BrailleChart:
+    """
+    Scrolling braille line chart, `width` x `height` characters.
+    Each pushed value is one dot column (two per character), joined to
+    the previous value with a vertical stroke.
+    """
+
+    def __init__(self, width, height, lo=-100, hi=-30):
+        self.lo = lo
+        self.hi = hi
+        self.resize(width, height)
+
+    def resize(self, width, height):
+        """Sets the size and clears the chart."""
+        self.width = max(1, width)
+        self.height = max(1, height)
+        self.rows = [BLANK * self.width] * self.height  # Top row first
+        self._cell = [0] * self.height  # Dot masks of the newest character column
+        self._half = False  # Newest character only has its left dot column
+        self._last_y = None
+        self.last_value = None
+
+    @property
+    def columns(self):
+        """Dot columns visible at once."""
+        return self.width * 2
+
+    def _y(self, value):
+        dots = self.height * 4
+        if value is None:
+            return 0
+        y = int((value - self.lo) * (dots - 1) / (self.hi - self.lo) + 0.5)
+        return min(max(y, 0), dots - 1)
+
+    def push(self, value):
+        """Appends one dot column, scrolling left by a character every second push."""
+        y = self._y(value)
+        prev = y if self._last_y is None else self._last_y
+        low, high = (prev, y) if prev <= y else (y, prev)
+
+        height = self.height
+        cell = self._cell
+        if self._half:
+            bits = RIGHT_BITS
+        else:
+            bits = LEFT_BITS
+            cell = self._cell = [0] * height
+        for dot in range(low, high + 1):
+            cell[height - 1 - dot // 4] |= bits[dot % 4]
+
+        rows = self.rows
+        if self._half:
+            # Same character column: only rows the stroke touched change
+            for r in range(height - 1 - high // 4, height - low // 4):
+                rows[r] = rows[r][:-1] + chr(BRAILLE_BASE + cell[r])
+        else:
+            for r in range(height):
+                rows[r] = rows[r][1:] + chr(BRAILLE_BASE + cell[r])
+
+        self._half = not self._half
+        self._last_y = y
+        self.last_value = value
+
+    def extend(self, values):
+        for value in values:
+            self.push(value)
+
+    def render(self):
+        return "\n".join(self.rows)
+
+
+class RefreshPacer:
+    """
+    Adaptive screen refresh: redraw at `fastest` while the value moves by
+    at least `threshold`, and back off (doubling up to `slowest`) while it
+    is stable.
+    """
+
+    def __init__(self, fastest=0.2, slowest=2.0, threshold=2.0):
+        self.fastest = fastest
+        self.slowest = slowest
+        self.threshold = threshold
+        self.interval = fastest
+        self.next_due = 0.0
+        self.shown = {}
+
+    def due(self, now, values):
+        """True if the screen should be redrawn for `values` ({key: value})."""
+        shown = self.shown
+        moved = False
+        for key, value in values.items():
+            old = shown.get(key)
+            if old is None or value is None or abs(value - old) >= self.threshold:
+                if old != value:
+                    moved = True
+                    break
+        if moved:
+            self.interval = self.fastest
+        elif now < self.next_due:
+            return False
+        else:
+            self.interval = min(self.interval * 2, self.slowest)
+        self.shown = dict(values)
+        self.next_due = now + self.interval
+        return True
@@ -0,0 +1,290 @@
+import sys
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+# Smoothing factor for the RSSI and advertising-interval averages
+EMA_ALPHA = 0.2
+
+# Privacy classes (derived from the first address byte)
+PRIVACY_UNKNOWN = None
+PRIVACY_PUBLIC = False
+PRIVACY_RANDOM = True
+
+
+class DeviceRecord:
+    """
+    One detected device. Only plain values are kept here;
+    colours and markup are applied by the UI at render time.
+    """
+    __slots__ = (
+        "address", "name", "rssi", "manufacturer", "company_id",
+        "tags", "is_random", "first_seen", "last_seen", "count",
+        "rssi_min", "rssi_max", "rssi_ema", "interval",
+        "adv_key", "decoded_at", "profile", "aliases",
+    )
+
+    def __init__(self, address, now):
+        self.address = address
+        self.name = "Unknown"
+        self.rssi = -100
+        self.manufacturer = "Unknown"
+        self.company_id = -1          # -1 = no manufacturer data
+        self.tags = ()                # Short service tags, e.g. ("Heart Rate",)
+        self.is_random = PRIVACY_UNKNOWN
+        self.first_seen = now
+        self.last_seen = now
+        self.count = 0                # Packets seen
+        self.rssi_min = 0
+        self.rssi_max = -128
+        self.rssi_ema = None
+        self.interval = None          # Smoothed seconds between packets
+        self.adv_key = None           # Opaque "what was decoded" marker (see scanner)
+        self.decoded_at = now
+        self.profile = None           # Label of a cached GATT profile (see gattcache)
+        self.aliases = 0              # Rotated addresses merged into this device (see reident)
+
+    def observe(self, rssi, now):
+        """Folds one packet into the RSSI aggregates and interval estimate."""
+        if self.count:
+            gap = now - self.last_seen
+            if self.interval is None:
+                self.interval = gap
+            else:
+                self.interval += EMA_ALPHA * (gap - self.interval)
+            self.rssi_ema += EMA_ALPHA * (rssi - self.rssi_ema)
+        else:
+            self.rssi_ema = float(rssi)
+        if rssi < self.rssi_min:
+            self.rssi_min = rssi
+        if rssi > self.rssi_max:
+            self.rssi_max = rssi
+        self.last_seen = now
+        self.count += 1
+
+    @property
+    def rate(self):
+        """Estimated advertisements per second (0 until two packets were seen)."""
+        if not self.interval:
+            return 0.0
+        return 1.0 / self.interval
+
+    @property
+    def privacy(self):
+        """Plain privacy label: RAND, PUBLIC or ?."""
+        if self.is_random is None:
+            return "?"
+        return "RAND" if self.is_random else "PUBLIC"
+
+    def __repr__(self):
+        return f"<DeviceRecord {self.address} {self.rssi}dBm {self.name!r}>"
+
+
+class RssiIndex:
+    """
+    Addresses ordered by RSSI, strongest first (ties broken by address).
+
+    Kept as a sorted list of (-rssi, address) keys, so a change is two
+    bisects plus a memmove, and top-K / rank queries never re-sort.
+    """
+
+    def __init__(self):
+        self._keys = []
+
+    def add(self, address, rssi):
+        insort(self._keys, (-rssi, address))
+
+    def remove(self, address, rssi):
+        key = (-rssi, address)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def move(self, address, old_rssi, new_rssi):
+        if old_rssi != new_rssi:
+            self.remove(address, old_rssi)
+            self.add(address, new_rssi)
+
+    def rank(self, address, rssi):
+        """0-based position of an address (0 = strongest)."""
+        return bisect_left(self._keys, (-rssi, address))
+
+    def top(self, k):
+        return [address for _, address in self._keys[:k]]
+
+    def page(self, start, count):
+        return [address for _, address in self._keys[start:start + count]]
+
+    def clear(self):
+        self._keys.clear()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return (address for _, address in self._keys)
+
+
+class DeviceStore:
+    """
+    Bounded store of detected devices keyed by address.
+
+    Records are kept in least-recently-seen order, so both the size cap
+    (max_size) and the last-seen TTL evict from the front in O(1) per record.
+    An RssiIndex is maintained alongside for ordered (UI) access, and
+    `version` is bumped on every change so views can skip idle frames.
+    """
+
+    def __init__(self, max_size=None, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.evicted = 0
+        self.version = 0
+        self._records = OrderedDict()
+        self.index = RssiIndex()
+
+    def configure(self, max_size=None, ttl=None):
+        """Changes the limits in place (the store object is shared by modules)."""
+        self.max_size = max_size or None
+        self.ttl = ttl or None
+        self.expire()
+        self._trim()
+
+    def update(self, address, name, rssi, manufacturer, company_id, tags, is_random, now=None, adv_key=None):
+        """Inserts or refreshes a device and returns its record."""
+        if now is None:
+            now = time.time()
+
+        rec = self._records.get(address)
+        if rec is None:
+            rec = DeviceRecord(address, now)
+            rec.rssi = rssi
+            self._records[address] = rec
+            self.index.add(address, rssi)
+            self._trim()
+        else:
+            self._records.move_to_end(address)
+            self.index.move(address, rec.rssi, rssi)
+            rec.rssi = rssi
+
+        rec.name = name
+        rec.manufacturer = manufacturer
+        rec.company_id = company_id
+        rec.tags = tags
+        rec.is_random = is_random
+        rec.adv_key = adv_key
+        rec.decoded_at = now
+        rec.observe(rssi, now)
+        self.version += 1
+        return rec
+
+    def touch(self, rec, rssi, now=None):
+        """
+        Records a repeat of an unchanged advertisement: only RSSI, the
+        aggregates and the LRU position change. Returns the record.
+        """
+        if now is None:
+            now = time.time()
+        self._records.move_to_end(rec.address)
+        self.index.move(rec.address, rec.rssi, rssi)
+        rec.rssi = rssi
+        rec.observe(rssi, now)
+        self.version += 1
+        return rec
+
+    def expire(self, now=None):
+        """Drops devices not seen within the TTL. Returns how many were dropped."""
+        if not self.ttl or not self._records:
+            return 0
+        if now is None:
+            now = time.time()
+
+        cutoff = now - self.ttl
+        dropped = 0
+        records = self._records
+        while records:
+            address, rec = next(iter(records.items()))
+            if rec.last_seen >= cutoff:
+                break
+            records.popitem(last=False)
+            self.index.remove(address, rec.rssi)
+            dropped += 1
+        if dropped:
+            self.evicted += dropped
+            self.version += 1
+        return dropped
+
+    def _trim(self):
+        if not self.max_size:
+            return
+        while len(self._records) > self.max_size:
+            address, rec = self._records.popitem(last=False)
+            self.index.remove(address, rec.rssi)
+            self.evicted += 1
+            self.version += 1
+
+    def get(self, address):
+        return self._records.get(address)
+
+    def records(self):
+        """All live records, least recently seen first."""
+        return list(self._records.values())
+
+    def items(self):
+        return self._records.items()
+
+    def ranked(self):
+        """All live records, strongest signal first."""
+        records = self._records
+        return [records[a] for a in self.index]
+
+    def top(self, k):
+        """The k strongest records."""
+        records = self._records
+        return [records[a] for a in self.index.top(k)]
+
+    def page(self, start, count):
+        """A slice of the RSSI ordering, for paged views."""
+        records = self._records
+        return [records[a] for a in self.index.page(start, count)]
+
+    def rank(self, address):
+        """0-based RSSI rank of a device, or None if it is not stored."""
+        rec = self._records.get(address)
+        if rec is None:
+            return None
+        return self.index.rank(address, rec.rssi)
+
+    def clear(self):
+        self._records.clear()
+        self.index.clear()
+        self.evicted = 0
+        self.version += 1
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, address):
+        return address in self._records
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def bytes_estimate(self):
+        """Rough resident size of the store in bytes."""
+        total = sys.getsizeof(self._records)
+        for rec in self._records.values():
+            total += (
+                sys.getsizeof(rec)
+                + sys.getsizeof(rec.address)
+                + sys.getsizeof(rec.name)
+                + sys.getsizeof(rec.manufacturer)
+            )
+        return total
+
+    def stats(self):
+        return {
+            "live": len(self._records),
+            "evicted": self.evicted,
+            "bytes": self.bytes_estimate(),
+        }
@@ -0,0 +1,87 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analyze
+import sessionlog
+
+SIGHTINGS = [
+    # (timestamp, address, name, rssi, manufacturer, company_id, tags, privacy, payload)
+    (1000.0, "4A:00:00:00:00:01", "Phone", -50, "Apple Nearby", 76, ("Battery",), "RAND", b"\x10\x05"),
+    (1001.0, "4A:00:00:00:00:01", "Phone", -60, "Apple Nearby", 76, ("Battery",), "RAND", b"\x10\x05"),
+    (1002.0, "00:11:22:33:44:55", "Band", -80, "Microsoft", 6, ("Heart Rate", "Battery"), "PUBLIC", b"\x01"),
+    (1003.0, "4A:00:00:00:00:02", "Unknown", -90, "Unknown", -1, (), "RAND", b""),
+]
+
+
+class TestAnalyze(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _log(self, fmt):
+        sink = sessionlog.SINKS[fmt](os.path.join(self.dir, f"session{sessionlog.SINKS[fmt].suffix}"))
+        sink.write(SIGHTINGS)
+        sink.close()
+        return sink.path
+
+    def test_every_session_format_gives_the_same_totals(self):
+        for fmt in ("csv", "jsonl", "bin"):
+            rep = analyze.report(analyze.analyze_file(self._log(fmt)))
+            self.assertEqual(rep["sightings"], 4, fmt)
+            self.assertEqual(rep["devices"], 3, fmt)
+            self.assertEqual(rep["privacy"]["RAND"], 2, fmt)
+            self.assertAlmostEqual(rep["privacy"]["random_ratio"], 2 / 3, places=3)
+            vendors = {v["vendor"]: v["devices"] for v in rep["vendors"]}
+            self.assertEqual(vendors[analyze.vendors.COMPANY_IDS[76]], 1, fmt)
+            self.assertEqual(rep["rssi"]["min"], -90)
+            self.assertEqual(rep["errors"], [])
+
+    def test_legacy_summary_with_markup(self):
+        path = os.path.join(self.dir, "sentry_log_20250101_080000.csv")
+        with open(path, "w") as f:
+            f.write("Address,Name,Manufacturer,Last RSSI,Services,Privacy\n"
+                    'AA:BB:CC:DD:EE:01,Phone,Apple AirPods,-60,"[red]Heart Rate[/red], [yellow]Battery[/yellow]",[green]RAND[/green]\n'
+                    "11:22:33:44:55:66,Band,ID: 6,-80,,[red]PUBLIC[/red]\n")
+        agg = analyze.analyze_file(path)
+        dev = agg.devices["AA:BB:CC:DD:EE:01"]
+        self.assertEqual(dev.tags, {"Heart Rate", "Battery"})
+        self.assertEqual(dev.privacy, "RAND")
+        self.assertEqual(dev.vendor, analyze.vendors.COMPANY_IDS[76])
+        self.assertEqual(agg.devices["11:22:33:44:55:66"].vendor, analyze.vendors.COMPANY_IDS[6])
+        self.assertEqual(analyze.iso(dev.first), "2025-01-01T08:00:00")
+
+    def test_merged_partials_match_a_single_pass(self):
+        first = self._log("csv")
+        second = os.path.join(self.dir, "later.jsonl")
+        sink = sessionlog.JsonlSink(second)
+        sink.write([(t + 500, *rest) for t, *rest in SIGHTINGS[:2]])
+        sink.close()
+
+        agg = analyze.analyze([first, second], jobs=1)
+        dev = agg.devices["4A:00:00:00:00:01"]
+        self.assertEqual(agg.files, 2)
+        self.assertEqual(dev.sightings, 4)
+        self.assertEqual((dev.first, dev.last), (1000.0, 1501.0))
+
+        pooled = analyze.analyze([first, second], jobs=2)
+        self.assertEqual(analyze.report(pooled), analyze.report(agg))
+
+    def test_unreadable_file_is_reported(self):
+        path = os.path.join(self.dir, "broken.csv")
+        with open(path, "w") as f:
+            f.write("something,else\n1,2\n")
+        rep = analyze.report(analyze.analyze([path], jobs=1))
+        self.assertEqual(len(rep["errors"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
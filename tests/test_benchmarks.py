@@ -0,0 +1,40 @@
+import os
+import sys
+import unittest
+
+# Add parent and benchmarks directories to path so we can import our modules
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "benchmarks"))
+
+import ingest
+import suite
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def tearDown(self):
+        ingest.device_store.clear()
+        ingest.device_store.configure()
+
+    def test_compare_flags_slowdowns_beyond_tolerance(self):
+        results = {"a": {"rate": 80.0}, "b": {"rate": 90.0}, "new": {"rate": 5.0}}
+        baseline = {"a": {"rate": 100.0}, "b": {"rate": 100.0}}
+        rows = {row[0]: row for row in suite.compare(results, baseline, tolerance=0.15)}
+
+        self.assertTrue(rows["a"][4])
+        self.assertFalse(rows["b"][4])
+        self.assertIsNone(rows["new"][2])
+
+    def test_synthetic_adverts_are_reproducible(self):
+        first = suite.synthetic_adverts(50, 10)
+        self.assertEqual(first, suite.synthetic_adverts(50, 10))
+        self.assertLessEqual(len({device.address for device, _ in first}), 10)
+
+    def test_measure_reports_a_rate(self):
+        rate = suite.measure(lambda: sum(range(100)), ops=100, repeat=1, min_time=0.001)
+        self.assertGreater(rate, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
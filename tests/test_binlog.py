@@ -0,0 +1,81 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import binlog
+
+class TestBinLog(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "log.bsl")
+        sink = binlog.BinSink(self.path)
+        rows = []
+        for i in range(100):
+            company = 76 if i % 2 else -1
+            payload = bytes([0x10, i]) if company == 76 else b""
+            rows.append((1000.0 + i, f"4A:00:00:00:00:{i % 10:02X}", "", -40 - i // 2, "", company, (), "RAND", payload))
+        sink.write(rows)
+        sink.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_query_filters(self):
+        """Address, company, RSSI and time filters combine."""
+        with binlog.BinLog(self.path) as log:
+            self.assertEqual(len(log), 100)
+            self.assertEqual(len(list(log.query(address="4A:00:00:00:00:03"))), 10)
+            self.assertEqual(len(list(log.query(company_id=76))), 50)
+            self.assertEqual(len(list(log.query(rssi_min=-44))), 10)
+
+            hits = list(log.query(company_id=76, since=1010.0, until=1020.0, with_payload=True))
+            self.assertEqual([s.time for s in hits], [1011.0 + 2 * i for i in range(5)])
+            self.assertEqual(hits[0].payload, bytes([0x10, 11]))
+            self.assertEqual(hits[0].address, "4A:00:00:00:00:01")
+            self.assertEqual(hits[0].privacy, "RAND")
+
+    def test_partial_record_ignored(self):
+        """A half-written trailing record is not returned."""
+        with open(self.path, "ab") as f:
+            f.write(b"\x00" * 10)
+        with binlog.BinLog(self.path) as log:
+            self.assertEqual(len(list(log.query())), 100)
+
+    def test_reopen_trims_partial_tail(self):
+        """Appending after a crash starts at a record boundary, not inside junk."""
+        with open(self.path, "ab") as f:
+            f.write(b"\x00" * 10)
+        with open(binlog.heap_path(self.path), "ab") as f:
+            f.write(b"\xff" * 7)
+        sink = binlog.BinSink(self.path)
+        sink.write([(2000.0, "4A:00:00:00:00:AA", "", -30, "", 76, (), "PUBLIC", b"\x12\x34")])
+        sink.close()
+        self.assertEqual(os.path.getsize(self.path), binlog.HEADER.size + 101 * binlog.RECORD.size)
+        with binlog.BinLog(self.path) as log:
+            self.assertTrue(log.ordered)
+            last = list(log.query(since=2000.0, with_payload=True))
+            self.assertEqual([(s.address, s.payload) for s in last], [("4A:00:00:00:00:AA", b"\x12\x34")])
+
+    def test_out_of_order_batches(self):
+        """A batch older than the last one disables bisecting, not the time filter."""
+        sink = binlog.BinSink(self.path)
+        sink.write([(1500.5, "4A:00:00:00:00:BB", "", -30, "", -1, (), "RAND", b""),
+                    (1050.5, "4A:00:00:00:00:BB", "", -30, "", -1, (), "RAND", b"")])
+        sink.close()
+        with binlog.BinLog(self.path) as log:
+            self.assertFalse(log.ordered)
+            self.assertEqual([s.time for s in log.query(since=1050.0, until=1051.0)], [1050.0, 1050.5])
+            self.assertEqual([s.time for s in log.query(since=1099.0)], [1099.0, 1500.5])
+
+    def test_company_by_name(self):
+        self.assertEqual(binlog.parse_company("apple"), 76)
+        self.assertEqual(binlog.parse_company("0x004c"), 76)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import capture
+
+HR_UUID = "0000180d-0000-1000-8000-00805f9b34fb"
+
+
+class TestCaptureFormat(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".bscap")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def _write_sample(self, n=3):
+        with capture.CaptureWriter(self.path) as writer:
+            for i in range(n):
+                dev = capture.ReplayDevice(f"AA:BB:CC:DD:EE:{i:02X}", "Band", -50 - i)
+                adv = capture.ReplayAdvertisement("Band", {76: bytes([0x10, 0x05, i % 256])}, {}, [HR_UUID], -8, -50 - i)
+                writer.write(dev, adv, timestamp=1000.0 + i)
+
+    def test_round_trip(self):
+        """Every field written is read back unchanged."""
+        self._write_sample()
+        records = list(capture.read_capture(self.path))
+        self.assertEqual(len(records), 3)
+
+        ts, dev, adv = records[2]
+        self.assertEqual(ts, 1002.0)
+        self.assertEqual(dev.address, "AA:BB:CC:DD:EE:02")
+        self.assertEqual(adv.rssi, -52)
+        self.assertEqual(adv.local_name, "Band")
+        self.assertEqual(adv.manufacturer_data, {76: bytes([0x10, 0x05, 0x02])})
+        self.assertEqual(adv.service_uuids, [HR_UUID])
+        self.assertEqual(adv.tx_power, -8)
+
+    def test_truncated_tail_is_ignored(self):
+        """A record cut short by a crash does not break reading."""
+        self._write_sample()
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 5)
+        self.assertEqual(len(list(capture.read_capture(self.path))), 2)
+
+    def test_replay_scanner_max_speed(self):
+        """speed=0 delivers the whole capture to the callback."""
+        self._write_sample(500)
+        seen = []
+
+        async def run():
+            scanner = capture.ReplayScanner(self.path, lambda d, a: seen.append(d.address), speed=0)
+            await scanner.start()
+            await scanner.wait()
+            await scanner.stop()
+
+        asyncio.run(run())
+        self.assertEqual(len(seen), 500)
+
+
+    def test_replay_of_a_bad_file_fails_at_start(self):
+        async def run(path):
+            scanner = capture.ReplayScanner(path, speed=0)
+            await scanner.start()
+
+        with self.assertRaises(OSError):
+            asyncio.run(run(self.path + ".missing"))
+        with open(self.path, "wb") as f:
+            f.write(b"not a capture")
+        with self.assertRaises(ValueError):
+            asyncio.run(run(self.path))
+
+    def test_replay_error_is_raised_by_wait(self):
+        self._write_sample(10)
+
+        def explode(device, adv):
+            raise RuntimeError("callback failed")
+
+        async def run():
+            scanner = capture.ReplayScanner(self.path, explode, speed=0)
+            await scanner.start()
+            try:
+                await scanner.wait()
+            finally:
+                await scanner.stop()
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
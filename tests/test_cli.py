@@ -0,0 +1,110 @@
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add parent and tools directories to path so we can import our modules
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "tools"))
+
+import check_startup
+import cli
+import decoder
+import gattcache
+import ingest
+import occupancy
+import pipeline
+import reident
+import sessionlog
+
+
+class TestDispatch(unittest.TestCase):
+
+    def _help(self, argv):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), self.assertRaises(SystemExit) as exit:
+            cli.main_entry(argv)
+        self.assertEqual(exit.exception.code, 0)
+        return out.getvalue()
+
+    def test_top_level_help_lists_commands(self):
+        text = self._help(["--help"])
+        for command in ("scan", "track", "interrogate", "query", "analyze"):
+            self.assertIn(command, text)
+
+    def test_scan_is_the_default_command(self):
+        self.assertEqual(self._help(["scan", "--help"]), self._help(["--help"]))
+
+    def test_subcommands_parse_their_own_options(self):
+        self.assertIn("usage: bluesentry track", self._help(["track", "--help"]))
+        self.assertIn("usage: bluesentry interrogate", self._help(["interrogate", "--help"]))
+        self.assertIn("usage: bluesentry query", self._help(["query", "--help"]))
+        self.assertIn("usage: bluesentry analyze", self._help(["analyze", "--help"]))
+
+    def test_overflow_choices_match_pipeline(self):
+        self.assertEqual(cli.OVERFLOW_POLICIES, pipeline.POLICIES)
+        self.assertEqual(cli.build_parser().parse_args([]).overflow, pipeline.DROP_OLDEST)
+
+    def test_option_defaults_match_modules(self):
+        self.assertEqual(cli.LOG_FORMATS, tuple(sorted(sessionlog.SINKS)))
+        self.assertEqual(cli.DECODE_CACHE_SIZE, decoder.DEFAULT_CACHE_SIZE)
+        self.assertEqual(cli.REIDENT_GAP, reident.MAX_GAP)
+        self.assertEqual(cli.OCCUPANCY_WINDOWS, occupancy.WINDOWS)
+        self.assertEqual(cli.OCCUPANCY_INTERVAL, occupancy.EXPORT_INTERVAL)
+        self.assertEqual(os.path.expanduser(cli.GATT_CACHE_PATH), gattcache.DEFAULT_PATH)
+
+    def test_bad_occupancy_windows_is_a_usage_error(self):
+        err = io.StringIO()
+        with contextlib.redirect_stderr(err), self.assertRaises(SystemExit) as exit:
+            cli.build_parser().parse_args(["--occupancy-windows", "0,60"])
+        self.assertEqual(exit.exception.code, 2)
+        self.assertIn("Bad occupancy windows", err.getvalue())
+        self.assertEqual(cli.build_parser().parse_args(["--occupancy-windows", "900,60"]).occupancy_windows, (60, 900))
+
+    def test_queue_size_must_be_positive(self):
+        for size in ("0", "-1"):
+            with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                cli.build_parser().parse_args(["--queue-size", size])
+        self.assertEqual(cli.build_parser().parse_args(["--queue-size", "1"]).queue_size, 1)
+
+    def test_flush_size_reaches_the_writer(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        args = cli.build_parser().parse_args(["--flush-size", "50", "-o", os.path.join(tmp, "log.csv")])
+        writer = ingest.open_session_writer(args)
+        writer.close()
+        self.assertEqual(writer.batch_size, 50)
+        with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            cli.build_parser().parse_args(["--flush-size", "0"])
+
+    def test_gatt_cache_options_rejected_with_headless(self):
+        for option in (["--gatt-cache", "profiles.db"], ["--gatt-ttl", "1"]):
+            err = io.StringIO()
+            with contextlib.redirect_stderr(err), self.assertRaises(SystemExit) as exit:
+                cli.main_entry(["--headless", *option])
+            self.assertEqual(exit.exception.code, 2)
+            self.assertIn("--headless", err.getvalue())
+
+    def test_bad_watchlist_is_a_usage_error(self):
+        err = io.StringIO()
+        with contextlib.redirect_stderr(err), self.assertRaises(SystemExit) as exit:
+            cli.build_parser().parse_args(["--watchlist", os.path.join(ROOT, "no-such-rules.json")])
+        self.assertEqual(exit.exception.code, 2)
+        self.assertIn("--watchlist", err.getvalue())
+
+
+class TestStartupImports(unittest.TestCase):
+    # Budgets are checked by tools/check_startup.py; here only what gets loaded
+
+    def test_help_and_query_load_no_ui_or_asyncio(self):
+        for name, code, forbidden, _ in check_startup.CHECKS:
+            _, loaded = check_startup.import_profile(code)
+            self.assertFalse({m.split(".")[0] for m in loaded} & set(forbidden), name)
+
+
+if __name__ == "__main__":
+    unittest.main()
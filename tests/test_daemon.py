@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import capture
+import cli
+import daemon
+import ingest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestHeadless(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.capture = os.path.join(self.dir, "hall.bscap")
+        with capture.CaptureWriter(self.capture) as writer:
+            for i in range(300):
+                dev = capture.ReplayDevice(f"4A:00:00:00:00:{i % 30:02X}", "Tag", -60)
+                adv = capture.ReplayAdvertisement("Tag", {89: bytes([1, i % 256])}, {}, [], None, -60)
+                writer.write(dev, adv, timestamp=1000.0 + i * 0.001)
+        ingest.device_store.clear()
+
+    def tearDown(self):
+        ingest.device_store.clear()
+        shutil.rmtree(self.dir)
+
+    def _args(self, *extra):
+        return cli.build_parser().parse_args([
+            "--headless", "--replay", self.capture, "--replay-speed", "0",
+            "-o", os.path.join(self.dir, "log.csv"), "--no-gatt-cache", *extra,
+        ])
+
+    def test_replay_runs_to_completion(self):
+        summary = os.path.join(self.dir, "devices.csv")
+        code = asyncio.run(daemon.run_headless(self._args("--duration", "0", "--summary", summary)))
+
+        self.assertEqual(code, 0)
+        self.assertEqual(len(ingest.device_store), 30)
+        self.assertIsNone(ingest.session_writer)
+        with open(os.path.join(self.dir, "log.csv")) as f:
+            self.assertEqual(len(f.readlines()), 301)
+        self.assertTrue(os.path.exists(summary))
+
+    def test_startup_failure_still_closes_the_log(self):
+        bad = os.path.join(self.dir, "missing", "capture.bscap")
+        code = asyncio.run(daemon.run_headless(self._args("--record", bad)))
+        self.assertEqual(code, 1)
+        self.assertIsNone(ingest.session_writer)
+
+    def test_missing_replay_is_an_error(self):
+        args = self._args()
+        args.replay = os.path.join(self.dir, "missing.bscap")
+        self.assertEqual(asyncio.run(daemon.run_headless(args)), 1)
+
+    def test_ttl_expires_without_status_lines(self):
+        """--ttl sweeps run on their own timer, even with --status-interval 0."""
+        late = os.path.join(self.dir, "late.bscap")
+        with capture.CaptureWriter(late) as writer:
+            for i in range(30):
+                dev = capture.ReplayDevice(f"4A:00:00:00:00:{i:02X}", "Tag", -60)
+                writer.write(dev, capture.ReplayAdvertisement("Tag", {}, {}, [], None, -60), timestamp=1000.0)
+            dev = capture.ReplayDevice("4A:00:00:00:00:FF", "Late", -60)
+            writer.write(dev, capture.ReplayAdvertisement("Late", {}, {}, [], None, -60), timestamp=1001.5)
+        args = self._args("--duration", "0", "--status-interval", "0", "--ttl", "1")
+        args.replay, args.replay_speed = late, 1.0
+
+        expire_interval = daemon.EXPIRE_INTERVAL
+        daemon.EXPIRE_INTERVAL = 0.1
+        self.addCleanup(setattr, daemon, "EXPIRE_INTERVAL", expire_interval)
+        self.addCleanup(ingest.device_store.configure, ttl=0)
+
+        self.assertEqual(asyncio.run(daemon.run_headless(args)), 0)
+        self.assertEqual(len(ingest.device_store), 1)
+
+    def test_status_line_is_compact(self):
+        pipe = argparse.Namespace(stats=lambda: {"received": 50, "depth": 0, "dropped": 0, "errors": 0})
+        line = daemon.StatusReporter(pipe, 0.0).line(10.0)
+        self.assertIn("devices=0", line)
+        self.assertIn("rate=5/s", line)
+        self.assertNotIn("[", line)
+
+    def test_headless_never_imports_rich(self):
+        code = ("import sys, cli, daemon, ingest\n"
+                "print(sorted(m for m in sys.modules if m.split('.')[0] in ('rich', 'plotext')))")
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
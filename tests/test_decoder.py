@@ -0,0 +1,43 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import decoder
+
+HR_UUID = "0000180d-0000-1000-8000-00805f9b34fb"
+TILE_UUID = "0000feed-0000-1000-8000-00805f9b34fb"
+
+class TestDecoder(unittest.TestCase):
+
+    def setUp(self):
+        decoder.configure(16)
+
+    def test_classification(self):
+        """Manufacturer and tags match the vendor tables."""
+        info = decoder.classify({76: bytes([0x05, 0x12, 0x34])}, [HR_UUID, TILE_UUID])
+        self.assertEqual(info.company_id, 76)
+        self.assertEqual(info.manufacturer, "Apple AirDrop")
+        self.assertEqual(info.tags, ("Heart Rate", "Tile"))
+
+        info = decoder.classify({117: b"\x01"}, [])
+        self.assertEqual(info.manufacturer, "Samsung Electronics")
+        self.assertIs(decoder.classify({}, []), decoder.NO_MANUFACTURER)
+
+    def test_repeats_hit_the_cache(self):
+        """An identical advertisement returns the same prebuilt record."""
+        first = decoder.classify({6: b"\x01\x02"}, [HR_UUID])
+        again = decoder.classify({6: bytearray(b"\x01\x02")}, [HR_UUID])
+        self.assertIs(first, again)
+        stats = decoder.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_cache_is_bounded(self):
+        for i in range(100):
+            decoder.classify({6: bytes([i])}, [])
+        self.assertEqual(decoder.cache_stats()["size"], 16)
+
+if __name__ == '__main__':
+    unittest.main()
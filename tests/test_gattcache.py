@@ -0,0 +1,120 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import decoder
+import gattcache
+import interrogator
+from test_interrogator import FakeClient
+
+DEVICE_NAME = "00002a00-0000-1000-8000-00805f9b34fb"
+MODEL_NUMBER = "00002a24-0000-1000-8000-00805f9b34fb"
+MANUFACTURER = "00002a29-0000-1000-8000-00805f9b34fb"
+BATTERY_LEVEL = "00002a19-0000-1000-8000-00805f9b34fb"
+
+
+class ValueClient(FakeClient):
+    """FakeClient that serves fixed values and counts reads."""
+
+    def __init__(self, values):
+        chars = [SimpleNamespace(uuid=uuid, handle=i, properties=["read"]) for i, uuid in enumerate(values)]
+        super().__init__(chars, delay=0)
+        self.values = values
+        self.reads = []
+
+    async def read_gatt_char(self, char):
+        self.reads.append(char.uuid)
+        return self.values[char.uuid]
+
+
+def band(name="Band-7F"):
+    return {DEVICE_NAME: name.encode(), MODEL_NUMBER: b"Band 2", MANUFACTURER: b"Acme", BATTERY_LEVEL: b"\x50"}
+
+
+class TestGattCache(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        self.cache = gattcache.GattCache(self.path, ttl=3600)
+
+    def tearDown(self):
+        self.cache.close()
+        os.remove(self.path)
+
+    def _interrogate(self, address, client, fingerprint="fp1", **options):
+        return asyncio.run(interrogator.interrogate_device(
+            address, client_factory=lambda a, t: client, cache=self.cache, fingerprint=fingerprint, **options))
+
+    def test_fingerprint_ignores_payload_body(self):
+        a = gattcache.fingerprint(76, b"\x10\x05\x01\x18", ("180d",))
+        b = gattcache.fingerprint(76, b"\x10\x05\x07\x99", ("180d",))
+        c = gattcache.fingerprint(76, b"\x12\x05\x01\x18", ("180d",))
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+        # Continuity message lengths and AirPods models tell devices apart
+        self.assertNotEqual(a, gattcache.fingerprint(76, b"\x10\x06\x01\x18\x00\x00\x00", ("180d",)))
+        pods = b"\x07\x19\x01%s\x55\x88\x01" + bytes(20)
+        self.assertNotEqual(gattcache.fingerprint(76, pods % b"\x0e\x20", ()), gattcache.fingerprint(76, pods % b"\x0f\x20", ()))
+        info = decoder.classify({76: b"\x10\x05\x01\x18"}, ["180d"])
+        self.assertEqual(gattcache.fingerprint_of(info), gattcache.fingerprint(76, b"\x10\x05\x01\x18", ("180d",)))
+
+    def test_known_address_skips_connection(self):
+        first = self._interrogate("AA:01", ValueClient(band()))
+        self.assertEqual(first.source, "live")
+
+        def unreachable(address, timeout):
+            raise AssertionError("should not connect")
+        again = asyncio.run(interrogator.interrogate_device(
+            "AA:01", client_factory=unreachable, cache=self.cache))
+        self.assertEqual(again.source, "cache")
+        self.assertEqual(again.services, first.services)
+
+    def test_same_fingerprint_only_shares_the_maker(self):
+        self._interrogate("AA:01", ValueClient(band()))
+        other_model = dict(band("Band-80"), **{MODEL_NUMBER: b"Band 3"})
+        client = ValueClient(other_model)
+        profile = self._interrogate("AA:02", client)
+
+        self.assertEqual(profile.source, "template")
+        self.assertEqual(sorted(client.reads), sorted([DEVICE_NAME, MODEL_NUMBER, BATTERY_LEVEL]))
+        values = {c.uuid: c.value for c in profile.services[0].characteristics}
+        self.assertEqual(values[MODEL_NUMBER], "Band 3")
+        self.assertEqual(values[MANUFACTURER], "Acme")
+        self.assertEqual(values[DEVICE_NAME], "Band-80")
+
+    def test_refresh_reads_everything(self):
+        self._interrogate("AA:01", ValueClient(band()))
+        client = ValueClient(band())
+        self.assertEqual(self._interrogate("AA:01", client, refresh=True).source, "live")
+        self.assertEqual(len(client.reads), 4)
+
+    def test_labels_and_ttl(self):
+        self._interrogate("AA:01", ValueClient(band()))
+        self.assertEqual(self.cache.label("AA:01"), "Acme Band 2")
+        self.assertEqual(self.cache.label("AA:99", "fp1"), "Acme")  # Never another device's model
+        self.assertIsNone(self.cache.label("AA:99", "other"))
+
+        # Reopened: labels come back from disk; expired entries are purged
+        self.cache.close()
+        self.cache = gattcache.GattCache(self.path, ttl=3600)
+        self.assertEqual(self.cache.label("AA:01"), "Acme Band 2")
+        self.assertEqual(self.cache.purge(now=10 ** 10), 2)
+        self.assertIsNone(self.cache.label("AA:01"))
+        self.assertIsNone(self.cache.get("AA:01", "fp1"))
+
+    def test_failed_connection_is_not_cached(self):
+        def factory(address, timeout):
+            raise OSError("Device not found")
+        asyncio.run(interrogator.interrogate_device("AA:01", client_factory=factory, cache=self.cache))
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
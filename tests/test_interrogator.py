@@ -0,0 +1,133 @@
+import asyncio
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import interrogator
+
+DEVICE_NAME = "00002a00-0000-1000-8000-00805f9b34fb"
+BATTERY_LEVEL = "00002a19-0000-1000-8000-00805f9b34fb"
+GENERIC_ACCESS = "00001800-0000-1000-8000-00805f9b34fb"
+
+
+class FakeClient:
+    """Stands in for BleakClient: async context manager with services and reads."""
+
+    def __init__(self, chars, delay=0.01, failures=None, hang=()):
+        self.services = [SimpleNamespace(uuid=GENERIC_ACCESS, characteristics=chars)]
+        self.delay = delay
+        self.failures = dict(failures or {})
+        self.hang = set(hang)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read_gatt_char(self, char):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if char.handle in self.hang:
+                await asyncio.sleep(10)
+            await asyncio.sleep(self.delay)
+            if self.failures.get(char.handle, 0) > 0:
+                self.failures[char.handle] -= 1
+                raise OSError("busy")
+            return f"value-{char.handle}".encode()
+        finally:
+            self.in_flight -= 1
+
+
+def char(handle, uuid=DEVICE_NAME, properties=("read",)):
+    return SimpleNamespace(uuid=uuid, handle=handle, properties=list(properties))
+
+
+class TestInterrogateDevice(unittest.TestCase):
+
+    def _run(self, client, **options):
+        return asyncio.run(interrogator.interrogate_device("AA:BB", client_factory=lambda a, t: client, **options))
+
+    def test_reads_concurrently_within_limit(self):
+        client = FakeClient([char(h) for h in range(12)])
+        profile = self._run(client, concurrency=3)
+
+        self.assertTrue(profile.connected)
+        self.assertIsNone(profile.error)
+        chars = profile.services[0].characteristics
+        self.assertEqual([c.value for c in chars], [f"value-{h}" for h in range(12)])
+        self.assertEqual(chars[0].name, "Device Name")
+        self.assertEqual(client.max_in_flight, 3)
+
+    def test_unreadable_characteristic_is_listed_without_read(self):
+        client = FakeClient([char(1, properties=("notify",))])
+        info = self._run(client).services[0].characteristics[0]
+        self.assertIsNone(info.value)
+        self.assertEqual(info.attempts, 0)
+
+    def test_retries_then_succeeds(self):
+        client = FakeClient([char(1, BATTERY_LEVEL)], failures={1: 2})
+        info = self._run(client, retries=2).services[0].characteristics[0]
+        self.assertEqual(info.raw, b"value-1")
+        self.assertEqual(info.attempts, 3)
+
+    def test_timeout_is_reported_per_characteristic(self):
+        client = FakeClient([char(1), char(2)], hang={2})
+        chars = self._run(client, read_timeout=0.05, retries=1).services[0].characteristics
+        self.assertEqual(chars[0].value, "value-1")
+        self.assertIsNone(chars[1].value)
+        self.assertIn("timed out", chars[1].error)
+        self.assertEqual(chars[1].attempts, 2)
+
+    def test_connection_failure_is_structured(self):
+        def factory(address, timeout):
+            raise OSError("Device not found")
+        profile = asyncio.run(interrogator.interrogate_device("AA:BB", client_factory=factory))
+        self.assertFalse(profile.connected)
+        self.assertEqual(profile.error, "Device not found")
+        self.assertEqual(profile.services, ())
+
+
+class TestInterrogateMany(unittest.TestCase):
+
+    def test_queue_respects_slots_and_order(self):
+        open_now = []
+        peak = []
+
+        class Tracked(FakeClient):
+            async def __aenter__(self):
+                open_now.append(self)
+                peak.append(len(open_now))
+                return self
+
+            async def __aexit__(self, *exc):
+                open_now.remove(self)
+                return False
+
+        addresses = [f"AA:{i:02X}" for i in range(5)]
+        finished = []
+        profiles = asyncio.run(interrogator.interrogate_many(
+            addresses, slots=2, on_result=finished.append,
+            client_factory=lambda a, t: Tracked([char(1)]),
+        ))
+
+        self.assertEqual([p.address for p in profiles], addresses)
+        self.assertEqual(len(finished), 5)
+        self.assertEqual(max(peak), 2)
+
+    def test_profile_to_dict_is_json_ready(self):
+        client = FakeClient([char(1)])
+        profile = asyncio.run(interrogator.interrogate_device("AA:BB", client_factory=lambda a, t: client))
+        data = interrogator.profile_to_dict(profile)
+        self.assertEqual(data["services"][0]["characteristics"][0]["raw"], b"value-1".hex())
+
+
+if __name__ == "__main__":
+    unittest.main()
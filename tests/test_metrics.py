@@ -0,0 +1,100 @@
+import asyncio
+import os
+import sys
+import unittest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_quantiles_use_bucket_bounds(self):
+        h = metrics.Histogram("t_seconds", "test", buckets=(0.001, 0.01, 0.1))
+        for _ in range(90):
+            h.observe(0.0005)
+        for _ in range(10):
+            h.observe(0.05)
+
+        self.assertEqual(h.count, 100)
+        self.assertEqual(h.quantile(0.5), 0.001)
+        self.assertEqual(h.quantile(0.95), 0.05)  # Capped at the largest value seen
+        self.assertAlmostEqual(h.sum, 0.545)
+
+    def test_exposition_is_cumulative(self):
+        h = metrics.Histogram("t_seconds", "test", buckets=(0.001, 0.01))
+        h.observe(0.0005)
+        h.observe(0.005)
+        h.observe(5.0)
+        lines = h.exposition()
+
+        self.assertIn('t_seconds_bucket{le="0.001"} 1', lines)
+        self.assertIn('t_seconds_bucket{le="0.01"} 2', lines)
+        self.assertIn('t_seconds_bucket{le="+Inf"} 3', lines)
+        self.assertIn("t_seconds_count 3", lines)
+
+
+class TestRegistry(unittest.TestCase):
+
+    def test_probe_reads_live_state(self):
+        registry = metrics.Registry()
+        state = {"n": 1}
+        registry.probe("t_total", "test", lambda: state["n"], "counter")
+        state["n"] = 42
+        text = registry.exposition()
+
+        self.assertIn("# TYPE t_total counter", text)
+        self.assertIn("t_total 42", text)
+
+    def test_failing_probe_reports_zero(self):
+        registry = metrics.Registry()
+        registry.probe("t_gauge", "test", lambda: 1 / 0)
+        self.assertIn("t_gauge 0", registry.exposition())
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def tearDown(self):
+        metrics.enabled = False
+
+    def test_timed_observes_every_call(self):
+        h = metrics.Histogram("t_seconds", "test")
+        double = metrics.timed(lambda x: x * 2, h)
+        self.assertEqual(double(21), 42)
+        self.assertEqual(h.count, 1)
+
+    def test_span_is_noop_while_disabled(self):
+        h = metrics.Histogram("t_seconds", "test")
+        with metrics.span(h):
+            pass
+        self.assertEqual(h.count, 0)
+
+        metrics.enable()
+        with metrics.span(h):
+            pass
+        self.assertEqual(h.count, 1)
+
+    def test_http_scrape(self):
+        async def scrape():
+            server = await metrics.serve(0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+                await writer.drain()
+                response = await reader.read()
+                writer.close()
+                return response.decode()
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        response = asyncio.run(scrape())
+        self.assertTrue(response.startswith("HTTP/1.0 200 OK"))
+        self.assertIn("# TYPE bluesentry_decode_seconds histogram", response)
+
+
+if __name__ == "__main__":
+    unittest.main()
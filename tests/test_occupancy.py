@@ -0,0 +1,91 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import occupancy
+
+APPLE = 76
+
+
+class TestOccupancy(unittest.TestCase):
+
+    def test_devices_leave_each_window_in_turn(self):
+        occ = occupancy.Occupancy()
+        occ.observe("AA", 1000.0, APPLE, "RAND", -50)
+        occ.observe("BB", 1030.0, -1, "PUBLIC", -90)
+        self.assertEqual([occ.present(w) for w in occ.windows], [2, 2, 2])
+
+        self.assertEqual(occ.present(60, now=1080.0), 1)  # AA left the 1 minute window
+        self.assertEqual(occ.present(900), 2)
+        self.assertEqual(occ.present(60, now=2000.0), 0)
+        self.assertEqual(occ.present(900), 0)
+        self.assertEqual(occ.present(3600), 2)
+
+    def test_repeat_sightings_count_once(self):
+        occ = occupancy.Occupancy()
+        for i in range(100):
+            occ.observe("AA", 1000.0 + i, APPLE, "RAND", -50)
+        self.assertEqual(occ.present(), 1)
+        self.assertEqual(occ.present(60, now=1150.0), 1)  # Last seen at 1099
+
+    def test_breakdown_follows_the_latest_sighting(self):
+        occ = occupancy.Occupancy()
+        occ.observe("AA", 1000.0, APPLE, "RAND", -50)
+        occ.observe("BB", 1001.0, -1, "PUBLIC", -70)
+        occ.observe("AA", 1002.0, APPLE, "RAND", -95)  # Walked away
+        b = occ.breakdown(60)
+        self.assertEqual(b["total"], 2)
+        self.assertEqual(b["rssi"], {"mid": 1, "far": 1})
+        self.assertEqual(b["privacy"], {"RAND": 1, "PUBLIC": 1})
+        self.assertEqual(b["vendor"], {occupancy.vendor_name(APPLE): 1, "Unknown": 1})
+
+    def test_memory_is_bounded_by_the_longest_window(self):
+        occ = occupancy.Occupancy(windows=(60, 600))
+        for i in range(1000):
+            occ.observe(f"D{i}", 1000.0 + i, APPLE, "RAND", -60)
+        self.assertLessEqual(len(occ), 605)
+        self.assertLessEqual(len(occ._buckets), 122)
+        occ.advance(10**6)
+        self.assertEqual(len(occ), 0)
+        self.assertEqual(occ.snapshot()["10m"]["total"], 0)
+
+    def test_unknown_window_is_rejected(self):
+        with self.assertRaises(ValueError):
+            occupancy.Occupancy().present(30)
+        with self.assertRaises(ValueError):
+            occupancy.parse_windows("0,60")
+        self.assertEqual(occupancy.parse_windows("900, 60,60"), (60, 900))
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_one_snapshot_per_interval(self):
+        path = os.path.join(self.dir, "occupancy.jsonl")
+        occ = occupancy.Occupancy(export=path, interval=60)
+        occ.observe("AA", 1020.0, APPLE, "RAND", -50)
+        occ.observe("BB", 1090.0, APPLE, "RAND", -50)
+        occ.observe("CC", 1250.0, APPLE, "RAND", -50)  # Two intervals later
+        occ.close()
+        with open(path) as f:
+            lines = [json.loads(line) for line in f]
+        # 1080, 1140, 1200, then the unfinished interval at close
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(occ.exported, 4)
+        self.assertEqual([l["windows"]["1m"]["total"] for l in lines], [1, 1, 0, 1])
+        self.assertEqual([l["windows"]["1h"]["total"] for l in lines], [1, 2, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
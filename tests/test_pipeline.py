@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+import sys
+import os
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import capture
+import pipeline
+
+def advert(address, rssi=-60):
+    return (capture.ReplayDevice(address, None, rssi),
+            capture.ReplayAdvertisement("Tag", {}, {}, [], None, rssi))
+
+class TestIngestPipeline(unittest.TestCase):
+
+    def test_drop_oldest(self):
+        """A full queue discards the oldest pending sighting."""
+        seen = []
+        ingest = pipeline.IngestPipeline(lambda raw: seen.append(raw[3]), max_size=3)
+        for rssi in range(-50, -55, -1):
+            ingest.push(*advert("AA", rssi))
+        self.assertEqual(ingest.depth, 3)
+        ingest.drain()
+        self.assertEqual(seen, [-52, -53, -54])
+        self.assertEqual(ingest.stats()["dropped"], 2)
+
+    def test_coalesce_per_address(self):
+        """Pending sightings from one address collapse to the latest."""
+        seen = []
+        ingest = pipeline.IngestPipeline(lambda raw: seen.append((raw[1], raw[3])), max_size=2, policy=pipeline.COALESCE)
+        ingest.push(*advert("AA", -50))
+        ingest.push(*advert("BB", -60))
+        ingest.push(*advert("AA", -40))
+        ingest.push(*advert("CC", -70))
+        ingest.drain()
+        self.assertEqual(seen, [("BB", -60), ("CC", -70)])
+        stats = ingest.stats()
+        self.assertEqual((stats["coalesced"], stats["dropped"]), (1, 1))
+
+    def test_queue_size_must_be_positive(self):
+        for policy in pipeline.POLICIES:
+            with self.assertRaises(ValueError):
+                pipeline.IngestPipeline(print, max_size=0, policy=policy)
+
+    def test_worker_drains_in_batches(self):
+        """The worker task processes everything in batch-sized chunks."""
+        seen = []
+        ingest = pipeline.IngestPipeline(lambda raw: seen.append(raw), batch_size=10)
+
+        async def run():
+            ingest.start()
+            for i in range(95):
+                ingest.push(*advert(f"AA:{i}"))
+            await asyncio.sleep(0.01)
+            await ingest.stop()
+
+        asyncio.run(run())
+        self.assertEqual(len(seen), 95)
+        self.assertEqual(ingest.stats()["batches"], 10)
+
+    def test_handler_errors_are_counted_and_first_reported(self):
+        """A failing sighting is skipped; only the first traceback is reported."""
+        def handler(raw):
+            if raw[3] < -60:
+                raise KeyError(raw[1])
+        reported = []
+        ingest = pipeline.IngestPipeline(handler, on_error=reported.append)
+        for rssi in (-50, -70, -80, -55):
+            ingest.push(*advert("AA", rssi))
+        ingest.drain()
+
+        stats = ingest.stats()
+        self.assertEqual((stats["processed"], stats["errors"]), (4, 2))
+        self.assertEqual(len(reported), 1)
+        self.assertIs(reported[0], ingest.first_error)
+        self.assertIn("KeyError: 'AA'", ingest.first_error)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import sys
+import unittest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import radar
+
+
+class TestRadarRaster(unittest.TestCase):
+
+    def test_background_has_crosshairs(self):
+        r = radar.RadarRaster(21, 7)
+        self.assertEqual(r.rows[3], "-" * 10 + "@" + "-" * 10)
+        self.assertEqual(r.rows[0][10], "|")
+        self.assertEqual(len(r.render().splitlines()), 7)
+
+    def test_position_is_independent_of_rank(self):
+        r = radar.RadarRaster()
+        devices = [("AA:00:00:00:00:01", -50, "green"), ("AA:00:00:00:00:02", -70, "yellow")]
+        r.update(devices)
+        first = dict((v[0], k) for k, v in r.cells.items())
+        r.update(devices[::-1])
+        second = dict((v[0], k) for k, v in r.cells.items())
+        # Same cells, only the ID symbols swap
+        self.assertEqual(first["1"], second["2"])
+        self.assertEqual(first["2"], second["1"])
+
+    def test_only_changed_rows_are_rebuilt(self):
+        r = radar.RadarRaster()
+        r.update([("AA:00:00:00:00:01", -60, "green")])
+        rows = list(r.rows)
+        version = r.version
+
+        self.assertFalse(r.update([("AA:00:00:00:00:01", -60, "green")]))
+        self.assertEqual(r.version, version)
+
+        r.update([("AA:00:00:00:00:01", -60, "green"), ("BB:00:00:00:00:02", -95, "red")])
+        (y, _), = set(r.cells) - {r.position("AA:00:00:00:00:01", -60)}
+        for i, (old, new) in enumerate(zip(rows, r.rows)):
+            if i == y:
+                self.assertNotEqual(old, new)
+            else:
+                self.assertIs(old, new)
+
+    def test_leaving_device_restores_background(self):
+        r = radar.RadarRaster()
+        empty = list(r.rows)
+        r.update([("AA:00:00:00:00:01", -80, "red")])
+        r.update([])
+        self.assertEqual(r.rows, empty)
+        self.assertEqual(r.cells, {})
+
+    def test_top_k_beyond_nine_uses_overflow_marker(self):
+        r = radar.RadarRaster(200, 60)
+        r.update([(f"AA:00:00:00:00:{i:02X}", -90, "red") for i in range(30)])
+        symbols = {mark for mark, _ in r.cells.values()}
+        self.assertIn(radar.OVERFLOW, symbols)
+        self.assertTrue(all(len(line) == 200 for line in r.rows))
+
+
+if __name__ == "__main__":
+    unittest.main()
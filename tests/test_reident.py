@@ -0,0 +1,84 @@
+import os
+import sys
+import unittest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reident import ReidentIndex, identity_key
+
+HR = "0000180d-0000-1000-8000-00805f9b34fb"
+
+# Apple Nearby Info (0x10, length 5) with a rotating tag
+NEARBY_A = bytes([0x10, 0x05, 0x01, 0x18, 0x11, 0x22, 0x33])
+NEARBY_B = bytes([0x10, 0x05, 0x01, 0x18, 0x99, 0x88, 0x77])
+FIND_MY = bytes([0x12, 0x02, 0x00, 0x01])
+
+
+class TestIdentityKey(unittest.TestCase):
+
+    def test_rotating_bytes_are_masked(self):
+        self.assertEqual(identity_key(76, NEARBY_A, [HR]), identity_key(76, NEARBY_B, [HR]))
+        self.assertNotEqual(identity_key(76, NEARBY_A, [HR]), identity_key(76, FIND_MY, [HR]))
+
+    def test_stable_features_separate_devices(self):
+        base = identity_key(89, b"\x01\x02\x03", [HR], "Band", -8)
+        self.assertEqual(base, identity_key(89, b"\x01\x02\xff", [HR], "Band", -8))
+        self.assertNotEqual(base, identity_key(89, b"\x01\x02\x03", [HR], "Watch", -8))
+        self.assertNotEqual(base, identity_key(89, b"\x01\x02\x03", [], "Band", -8))
+        self.assertNotEqual(base, identity_key(89, b"\x01\x02\x03", [HR], "Band", 0))
+        self.assertEqual(identity_key(89, b"", [], "Unknown"), identity_key(89, b"", []))
+
+
+class TestReidentIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ReidentIndex(min_gap=0.5, max_gap=60)
+        self.key = identity_key(76, NEARBY_A, [HR])
+
+    def test_rotation_is_merged(self):
+        first = self.index.link("4A:00:00:00:00:01", 100.0, self.key)
+        self.index.resolve("4A:00:00:00:00:01", 110.0)
+        second = self.index.link("4A:00:00:00:00:02", 111.0, self.key)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.index.resolve("4A:00:00:00:00:02", 112.0), "4A:00:00:00:00:01")
+        self.assertEqual(self.index.aliases("4A:00:00:00:00:01"), 1)
+        self.assertEqual(self.index.stats(), {"addresses": 2, "identities": 1, "merged": 1})
+
+    def test_concurrent_devices_stay_apart(self):
+        self.index.link("4A:00:00:00:00:01", 100.0, self.key)
+        # Still advertising 0.1 s ago: a second device of the same kind
+        other = self.index.link("4A:00:00:00:00:02", 100.1, self.key)
+        self.assertEqual(other.canonical, "4A:00:00:00:00:02")
+        self.assertEqual(self.index.merged, 0)
+
+    def test_crowd_links_the_device_quiet_longest(self):
+        for i in range(100):  # Phones of the same kind, all still advertising
+            self.index.link(f"4A:00:00:00:01:{i:02X}", 100.0, self.key)
+        self.index.link("4A:00:00:00:00:01", 90.0, self.key)
+        self.index.link("4A:00:00:00:00:02", 95.0, self.key)
+        for i in range(100):
+            self.index.resolve(f"4A:00:00:00:01:{i:02X}", 100.0)
+
+        first = self.index.link("4A:00:00:00:00:03", 100.2, self.key)
+        second = self.index.link("4A:00:00:00:00:04", 100.3, self.key)
+        self.assertEqual((first.canonical, second.canonical), ("4A:00:00:00:00:01", "4A:00:00:00:00:02"))
+        # Both quiet devices are taken: the next new address is a new device
+        self.assertEqual(self.index.link("4A:00:00:00:00:05", 100.4, self.key).canonical, "4A:00:00:00:00:05")
+
+    def test_too_long_a_gap_is_a_new_device(self):
+        self.index.link("4A:00:00:00:00:01", 100.0, self.key)
+        other = self.index.link("4A:00:00:00:00:02", 200.0, self.key)
+        self.assertEqual(other.canonical, "4A:00:00:00:00:02")
+
+    def test_prune_forgets_quiet_identities(self):
+        self.index.link("4A:00:00:00:00:01", 100.0, self.key)
+        self.index.link("4A:00:00:00:00:02", 150.0, identity_key(76, FIND_MY, []))
+        self.assertEqual(self.index.prune(200.0), 1)
+        self.assertIsNone(self.index.resolve("4A:00:00:00:00:01", 200.0))
+        self.assertEqual(self.index.resolve("4A:00:00:00:00:02", 200.0), "4A:00:00:00:00:02")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import asyncio
+import shutil
+import tempfile
+import unittest
+import sys
+import os
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rich.console import Console
+
+import capture
+import cli
+import scanner
+import ingest
+import reident
+
+def advert(address, rssi, name="Band", mfr=None, uuids=()):
+    dev = capture.ReplayDevice(address, name, rssi)
+    adv = capture.ReplayAdvertisement(name, mfr or {}, {}, list(uuids), None, rssi)
+    return dev, adv
+
+class TestLiveView(unittest.TestCase):
+
+    def setUp(self):
+        scanner.device_store.clear()
+        devnull = open(os.devnull, "w")
+        self.addCleanup(devnull.close)
+        self.addCleanup(setattr, scanner, "console", scanner.console)
+        scanner.console = Console(width=120, height=30, file=devnull)
+        for i in range(100):
+            ingest.process_device(*advert(f"4A:00:00:00:00:{i:02X}", -40 - (i % 50)))
+
+    def test_only_visible_rows_are_built(self):
+        """The table holds one screen of rows, not every device."""
+        view = scanner.LiveView()
+        view.render()
+        table = view._layout["top"].renderable.renderable
+        self.assertEqual(table.row_count, view.page_size())
+
+    def test_idle_frames_are_skipped(self):
+        """render() is a no-op until the store or scroll position changes."""
+        view = scanner.LiveView()
+        first = view.render()
+        self.assertFalse(view.dirty)
+        self.assertIs(view.render(), first)
+
+        ingest.process_device(*advert("4A:00:00:00:00:00", -90))
+        self.assertTrue(view.dirty)
+        view.render()
+
+        view.handle_keys("n")
+        self.assertEqual(view.offset, view.page_size())
+        self.assertTrue(view.dirty)
+
+class TestCoalescing(unittest.TestCase):
+
+    def setUp(self):
+        scanner.device_store.clear()
+
+    def test_repeats_skip_decoding(self):
+        """An unchanged payload only updates RSSI aggregates."""
+        before = dict(ingest.coalesce_stats)
+        mfr = {76: bytes([0x10, 0x05, 0x01, 0x18, 0, 0, 0])}
+        for rssi in (-50, -60, -70):
+            ingest.process_device(*advert("4A:00:00:00:00:01", rssi, mfr=mfr))
+        ingest.process_device(*advert("4A:00:00:00:00:01", -55, mfr={76: bytes([0x05, 0x12, 0x34])}))
+
+        self.assertEqual(ingest.coalesce_stats["coalesced"] - before["coalesced"], 2)
+        self.assertEqual(ingest.coalesce_stats["decoded"] - before["decoded"], 2)
+        rec = scanner.device_store.get("4A:00:00:00:00:01")
+        self.assertEqual((rec.rssi, rec.rssi_min, rec.rssi_max, rec.count), (-55, -70, -50, 4))
+        self.assertEqual(rec.manufacturer, "Apple AirDrop")
+
+class TestReidentification(unittest.TestCase):
+
+    def setUp(self):
+        scanner.device_store.clear()
+        ingest.reident_index = reident.ReidentIndex(min_gap=0.5, max_gap=60)
+
+    def tearDown(self):
+        ingest.reident_index = None
+
+    def _sighting(self, ts, address, tag):
+        mfr = {76: bytes([0x10, 0x05, 0x01, 0x18, tag, tag, tag])}
+        ingest.process_sighting((ts, address, None, -60, mfr, [], None))
+
+    def test_rotated_address_joins_first_entry(self):
+        self._sighting(100.0, "4A:00:00:00:00:01", 1)
+        self._sighting(101.0, "4A:00:00:00:00:01", 1)
+        self._sighting(102.0, "4A:00:00:00:00:02", 2)  # Rotation
+        self._sighting(103.0, "4A:00:00:00:00:02", 2)
+
+        self.assertEqual(len(scanner.device_store), 1)
+        rec = scanner.device_store.get("4A:00:00:00:00:01")
+        self.assertEqual((rec.count, rec.aliases), (4, 1))
+        self.assertEqual(ingest.reident_index.merged, 1)
+
+    def test_public_addresses_are_never_merged(self):
+        self._sighting(100.0, "00:00:00:00:00:01", 1)
+        self._sighting(102.0, "00:00:00:00:00:02", 1)
+        self.assertEqual(len(scanner.device_store), 2)
+
+class TestRunScan(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        devnull = open(os.devnull, "w")
+        self.addCleanup(devnull.close)
+        self.addCleanup(setattr, scanner, "console", scanner.console)
+        scanner.console = Console(width=120, height=30, file=devnull)
+
+    def test_startup_failure_still_closes_the_log_and_cache(self):
+        """An unwritable --record is reported, not raised past the cleanup."""
+        args = cli.build_parser().parse_args([
+            "--passive", "--replay", os.path.join(self.dir, "missing.bscap"),
+            "--record", os.path.join(self.dir, "missing", "capture.bscap"),
+            "-o", os.path.join(self.dir, "log.csv"), "--gatt-cache", os.path.join(self.dir, "gatt.db"),
+        ])
+        self.assertEqual(asyncio.run(scanner.run_scan(args)), 1)
+        self.assertIsNone(ingest.session_writer)
+        self.assertIsNone(ingest.gatt_cache)
+
+if __name__ == '__main__':
+    unittest.main()
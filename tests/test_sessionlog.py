@@ -0,0 +1,80 @@
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sessionlog
+
+def sighting(i):
+    return (1000.0 + i, f"AA:BB:CC:DD:EE:{i % 256:02X}", "Band", -60, "Fitbit, Inc.", 81, ("Heart Rate",), "RAND", bytes([0x01, i % 256]))
+
+class TestSessionWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_csv_stream(self):
+        """Every queued sighting is on disk after close()."""
+        path = os.path.join(self.dir, "log.csv")
+        writer = sessionlog.SessionWriter(path, batch_size=7).start()
+        for i in range(50):
+            writer.write(sighting(i))
+        writer.close()
+
+        with open(path, newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], sessionlog.CSV_HEADER)
+        self.assertEqual(len(rows), 51)
+        self.assertEqual(rows[1][1:], ["AA:BB:CC:DD:EE:00", "Band", "-60", "Fitbit, Inc.", "81", "Heart Rate", "RAND"])
+        self.assertEqual(writer.stats()["written"], 50)
+
+    def test_jsonl_rotation_by_size(self):
+        """A new numbered file is started once the size limit is hit."""
+        path = os.path.join(self.dir, "log.jsonl")
+        writer = sessionlog.SessionWriter(path, fmt="jsonl", batch_size=10, rotate_bytes=1000).start()
+        for i in range(100):
+            writer.write(sighting(i))
+        writer.close()
+
+        self.assertGreater(len(writer.files), 1)
+        self.assertEqual(writer.files[1], os.path.join(self.dir, "log.1.jsonl"))
+        lines = []
+        for name in writer.files:
+            with open(name) as f:
+                lines += [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 100)
+        self.assertEqual(lines[-1]["services"], ["Heart Rate"])
+
+    def test_missing_company_is_null_in_jsonl(self):
+        path = os.path.join(self.dir, "log.jsonl")
+        sink = sessionlog.JsonlSink(path)
+        sink.write([sighting(0), (1001.0, "AA:00:00:00:00:01", "Unknown", -80, "Unknown", -1, (), "RAND", b"")])
+        sink.close()
+        with open(path) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual([line["company_id"] for line in lines], [81, None])
+
+    def test_rotate_on_request(self):
+        """rotate() (SIGHUP in headless mode) starts a new file at the next flush."""
+        path = os.path.join(self.dir, "log.csv")
+        writer = sessionlog.SessionWriter(path, flush_interval=0.05).start()
+        writer.write(sighting(0))
+        writer.rotate()
+        while len(writer.files) < 2:
+            writer.write(sighting(1))
+            time.sleep(0.01)
+        writer.close()
+        self.assertEqual(writer.files, [path, os.path.join(self.dir, "log.1.csv")])
+
+if __name__ == '__main__':
+    unittest.main()
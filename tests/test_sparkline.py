@@ -0,0 +1,73 @@
+import os
+import sys
+import unittest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sparkline
+from sparkline import BLANK, BrailleChart, RefreshPacer
+
+
+class TestBrailleChart(unittest.TestCase):
+
+    def test_bottom_and_top_dots(self):
+        chart = BrailleChart(2, 1, lo=0, hi=3)
+        chart.push(0)
+        self.assertEqual(chart.rows, [BLANK + chr(sparkline.BRAILLE_BASE + 0x40)])
+        chart.push(0)
+        self.assertEqual(chart.rows, [BLANK + chr(sparkline.BRAILLE_BASE + 0x40 | 0x80)])
+
+    def test_stroke_joins_previous_value(self):
+        chart = BrailleChart(1, 2, lo=0, hi=7)
+        chart.push(0)
+        chart.push(7)  # Right column: full vertical stroke through both rows
+        self.assertEqual(chart.rows[0], chr(sparkline.BRAILLE_BASE + 0xB8))
+        self.assertEqual(chart.rows[1], chr(sparkline.BRAILLE_BASE + 0x40 | 0xB8))
+
+    def test_scrolls_one_character_per_two_pushes(self):
+        chart = BrailleChart(3, 2)
+        chart.extend([-100, -30, -65, -65])
+        first = chart.render()
+        chart.extend([-65, -65])
+        rows = chart.render().split("\n")
+        self.assertEqual([row[:2] for row in rows], [row[1:] for row in first.split("\n")])
+        self.assertEqual(chart.last_value, -65)
+
+    def test_clamps_and_lost_signal(self):
+        chart = BrailleChart(2, 2)
+        chart.extend([None, 10, -200])
+        self.assertEqual(len(chart.rows), 2)
+        self.assertTrue(all(len(row) == 2 for row in chart.rows))
+
+    def test_resize_clears(self):
+        chart = BrailleChart(4, 2)
+        chart.extend([-50] * 8)
+        chart.resize(6, 3)
+        self.assertEqual(chart.rows, [BLANK * 6] * 3)
+        self.assertEqual(chart.columns, 12)
+
+
+class TestRefreshPacer(unittest.TestCase):
+
+    def test_backs_off_while_stable(self):
+        pacer = RefreshPacer(fastest=0.2, slowest=1.6, threshold=2.0)
+        self.assertTrue(pacer.due(0.0, {0: -60}))
+        self.assertFalse(pacer.due(0.1, {0: -61}))
+        self.assertTrue(pacer.due(0.2, {0: -61}))
+        self.assertEqual(pacer.interval, 0.4)
+        self.assertFalse(pacer.due(0.4, {0: -60}))
+        self.assertTrue(pacer.due(0.7, {0: -60}))
+        self.assertEqual(pacer.interval, 0.8)
+
+    def test_movement_redraws_immediately(self):
+        pacer = RefreshPacer(fastest=0.2, slowest=1.6, threshold=2.0)
+        pacer.due(0.0, {0: -60})
+        pacer.due(0.2, {0: -60})
+        self.assertTrue(pacer.due(0.25, {0: -50}))
+        self.assertEqual(pacer.interval, 0.2)
+        self.assertTrue(pacer.due(0.3, {0: None}))
+
+
+if __name__ == "__main__":
+    unittest.main()
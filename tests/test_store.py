@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import store
+
+class TestDeviceStore(unittest.TestCase):
+
+    def _add(self, s, address, rssi=-60, now=0.0):
+        return s.update(address, "Dev", rssi, "Unknown", -1, (), True, now=now)
+
+    def test_update_refreshes_record(self):
+        """Repeated sightings update one record in place."""
+        s = store.DeviceStore()
+        self._add(s, "AA", rssi=-70, now=1.0)
+        rec = self._add(s, "AA", rssi=-50, now=2.0)
+        self.assertEqual(len(s), 1)
+        self.assertEqual(rec.rssi, -50)
+        self.assertEqual(rec.first_seen, 1.0)
+        self.assertEqual(rec.count, 2)
+        self.assertEqual(rec.privacy, "RAND")
+
+    def test_max_size_evicts_least_recently_seen(self):
+        """The oldest sighting goes first when the store is full."""
+        s = store.DeviceStore(max_size=2)
+        self._add(s, "A", now=1.0)
+        self._add(s, "B", now=2.0)
+        self._add(s, "A", now=3.0)
+        self._add(s, "C", now=4.0)
+        self.assertEqual(sorted(s), ["A", "C"])
+        self.assertEqual(s.stats()["evicted"], 1)
+
+    def test_ttl_expiry(self):
+        """Devices not seen within the TTL are dropped."""
+        s = store.DeviceStore(ttl=10)
+        self._add(s, "A", now=0.0)
+        self._add(s, "B", now=8.0)
+        self.assertEqual(s.expire(now=12.0), 1)
+        self.assertEqual(list(s), ["B"])
+        stats = s.stats()
+        self.assertEqual(stats["live"], 1)
+        self.assertGreater(stats["bytes"], 0)
+
+    def test_rssi_ordering(self):
+        """ranked/top/rank follow RSSI changes and evictions."""
+        s = store.DeviceStore(max_size=3)
+        self._add(s, "A", rssi=-80, now=1.0)
+        self._add(s, "B", rssi=-40, now=2.0)
+        self._add(s, "C", rssi=-60, now=3.0)
+        self.assertEqual([r.address for r in s.ranked()], ["B", "C", "A"])
+
+        self._add(s, "A", rssi=-30, now=4.0)
+        self.assertEqual([r.address for r in s.top(2)], ["A", "B"])
+        self.assertEqual(s.rank("C"), 2)
+
+        # B is now the least recently seen and gets evicted
+        self._add(s, "D", rssi=-90, now=5.0)
+        self.assertEqual([r.address for r in s.ranked()], ["A", "C", "D"])
+        self.assertIsNone(s.rank("B"))
+
+    def test_aggregates_and_rate(self):
+        """touch() keeps min/max/EMA RSSI and the advertising interval."""
+        s = store.DeviceStore()
+        rec = self._add(s, "A", rssi=-60, now=0.0)
+        for i, rssi in enumerate([-50, -70, -60, -60], start=1):
+            s.touch(rec, rssi, now=i * 0.5)
+        self.assertEqual((rec.rssi_min, rec.rssi_max, rec.count), (-70, -50, 5))
+        self.assertAlmostEqual(rec.rate, 2.0)
+        self.assertEqual(s.ranked()[0].rssi, -60)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import sys
+import unittest
+
+# Add parent directory to path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import capture
+import tracker
+
+
+class TestMultiTarget(unittest.TestCase):
+
+    def setUp(self):
+        tracker.targets.clear()
+        for address in ("AA:BB:CC:DD:EE:01", "aa:bb:cc:dd:ee:02"):
+            tracker.targets[address.upper()] = tracker.Target(address)
+
+    def tearDown(self):
+        tracker.targets.clear()
+
+    def _advert(self, address, rssi, name="Band"):
+        dev = capture.ReplayDevice(address, name, rssi)
+        adv = capture.ReplayAdvertisement(name, {}, {}, [], None, rssi)
+        tracker.detection_callback(dev, adv)
+
+    def test_callback_updates_matching_target_only(self):
+        self._advert("AA:BB:CC:DD:EE:02", -42)
+        self._advert("11:22:33:44:55:66", -30)
+
+        self.assertEqual(tracker.targets["AA:BB:CC:DD:EE:02"].rssi, -42)
+        self.assertEqual(tracker.targets["AA:BB:CC:DD:EE:02"].name, "Band")
+        self.assertEqual(tracker.targets["AA:BB:CC:DD:EE:01"].rssi, -100)
+        self.assertEqual(len(tracker.targets), 2)
+
+    def test_lowercase_address_matches(self):
+        self._advert("aa:bb:cc:dd:ee:01", -60)
+        self.assertEqual(tracker.targets["AA:BB:CC:DD:EE:01"].rssi, -60)
+
+    def test_layout_has_panel_per_target(self):
+        layout = tracker.build_layout(3)
+        for i in range(3):
+            layout[f"graph-{i}"]
+            layout[f"alert-{i}"]
+
+    def test_history_is_per_target(self):
+        self._advert("AA:BB:CC:DD:EE:01", -55)
+        first, second = tracker.targets.values()
+        # Target.trace is what update_graph plots, without needing plotext
+        self.assertEqual(first.trace()[-1], -55)
+        self.assertEqual(second.trace()[-1], tracker.LOST_RSSI)
+
+    def test_callback_reads_advertisement_rssi(self):
+        dev = capture.ReplayDevice("AA:BB:CC:DD:EE:01", None, None)
+        adv = capture.ReplayAdvertisement("Tag", {}, {}, [], None, -48)
+        tracker.detection_callback(dev, adv)
+        target = tracker.targets["AA:BB:CC:DD:EE:01"]
+        self.assertEqual(target.rssi, -48)
+        self.assertEqual(target.name, "Tag")
+
+
+class TestRssiRing(unittest.TestCase):
+
+    def test_wraps_and_keeps_newest(self):
+        ring = tracker.RssiRing(size=4)
+        for i in range(6):
+            ring.append(float(i), -50 - i, -50.0 - i)
+        self.assertEqual(len(ring), 4)
+        self.assertEqual([raw for _, raw, _ in ring.iter_since(0)], [-55, -54, -53, -52])
+        self.assertEqual([raw for _, raw, _ in ring.iter_since(4.0)], [-55, -54])
+        self.assertEqual(ring.latest(), (5.0, -55, -55.0))
+
+
+class TestSeries(unittest.TestCase):
+
+    def test_every_advert_between_ticks_counts(self):
+        target = tracker.Target("AA", smoothing="none")
+        # Five adverts inside the newest bucket
+        for i, rssi in enumerate((-60, -50, -70, -40, -80)):
+            target.record(99.9 + i * 0.01, rssi)
+        means, maxes, smooth = target.series(now=100.0, buckets=10, width=0.2)
+        self.assertEqual(means[-1], -60)
+        self.assertEqual(maxes[-1], -40)
+        self.assertEqual(smooth[-1], -80)
+
+    def test_gap_carries_forward_until_stale(self):
+        target = tracker.Target("AA", smoothing="none")
+        target.record(90.0, -60)
+        means, _, _ = target.series(now=100.0, buckets=50, width=0.2)
+        # Window starts at 90.0: the first 3 s hold the last value, then it is lost
+        self.assertEqual(means[0], -60)
+        self.assertEqual(means[14], -60)
+        self.assertEqual(means[15], tracker.LOST_RSSI)
+        self.assertEqual(means[-1], tracker.LOST_RSSI)
+
+    def test_smoothers_damp_a_spike(self):
+        for mode in ("ema", "kalman"):
+            smoother = tracker.Smoother(mode)
+            for i in range(20):
+                smoother.update(i * 0.1, -70)
+            value = smoother.update(2.0, -40)
+            self.assertTrue(-70 < value < -50, (mode, value))
+        with self.assertRaises(ValueError):
+            tracker.Smoother("median")
+
+
+if __name__ == "__main__":
+    unittest.main()
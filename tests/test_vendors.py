@@ -20,6 +20,23 @@ class TestVendorLogic(unittest.TestCase):
         uuid = "0000180d-0000-1000-8000-00805f9b34fb"
         self.assertEqual(vendors.SERVICE_UUIDS.get(uuid), "Heart Rate")
 
+    def test_sig_tables(self):
+        """Entries outside the curated names come from the SIG tables."""
+        self.assertEqual(vendors.COMPANY_IDS.get(0x0370), "Wazombi Labs OÜ")
+        self.assertGreater(len(vendors.COMPANY_IDS), 3000)
+        self.assertEqual(vendors.SERVICE_UUIDS.get(0x1816), "Cycling Speed and Cadence")
+        self.assertEqual(vendors.CHARACTERISTIC_UUIDS.get("00002a19-0000-1000-8000-00805f9b34fb"), "Battery Level")
+        self.assertIsNone(vendors.SERVICE_UUIDS.get("6e400001-b5a3-f393-e0a9-e50e24dcca9e"))
+        self.assertEqual(vendors.gatt_name("2a29"), "Manufacturer Name String")
+
+    def test_tables_load_lazily(self):
+        """Curated names resolve without parsing the SIG data."""
+        table = vendors.AssignedNumbers("COMPANIES", {76: "Apple Inc."})
+        self.assertEqual(table[76], "Apple Inc.")
+        self.assertFalse(table.loaded)
+        self.assertEqual(table[6], "Microsoft")
+        self.assertTrue(table.loaded)
+
     def test_apple_identification(self):
         """Test the logic for identifying Apple device types."""
         # Type 0x05 = AirDrop
@@ -34,5 +51,23 @@ class TestVendorLogic(unittest.TestCase):
         data = bytes([0xFF, 0x00])
         self.assertIn("Type: 0xff", vendors.identify_apple_device(data))
 
+    def test_continuity_tlvs(self):
+        """Every TLV in the payload is parsed, without copying values."""
+        data = bytes([0x10, 0x05, 0x1B, 0x18, 0xAA, 0xBB, 0xCC, 0x0C, 0x02, 0x00, 0x07])
+        messages = vendors.parse_continuity(data)
+        self.assertEqual([m.type for m in messages], [0x10, 0x0C])
+        self.assertIs(messages[0].value.obj, data)
+        self.assertEqual(messages[0].detail, vendors.NearbyInfo(action=0x0B, status_flags=0x01, data_flags=0x18))
+        self.assertEqual(bytes(messages[1].value), bytes([0x00, 0x07]))
+        self.assertEqual(vendors.identify_apple_device(data), "Apple Nearby + Handoff")
+
+    def test_airpods_status(self):
+        """Proximity Pairing exposes model and battery levels."""
+        data = bytes([0x07, 0x19, 0x01, 0x0E, 0x20, 0x2B, 0x97, 0x25, 0x01])
+        detail = vendors.parse_continuity(data)[0].detail
+        self.assertEqual(detail.model_name, "AirPods Pro")
+        self.assertEqual((detail.left, detail.right, detail.case), (70, 90, 50))
+        self.assertEqual(vendors.identify_apple_device(data), "Apple AirPods Pro")
+
 if __name__ == '__main__':
     unittest.main()
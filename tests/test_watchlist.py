@@ -0,0 +1,159 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add parent and benchmarks directories to path so we can import our modules
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "benchmarks"))
+
+import decoder
+import watchlist
+
+FIND_MY = decoder.classify({76: bytes([0x12, 0x02, 0x00, 0x01])}, [])
+NEARBY = decoder.classify({76: bytes([0x10, 0x02, 0x01, 0x1C])}, [])
+TILE = decoder.classify({}, ["0000feed-0000-1000-8000-00805f9b34fb"])
+MICROSOFT = decoder.classify({6: b"\x01\x09\x20"}, ["180d"])
+
+
+class TestMatching(unittest.TestCase):
+
+    def _names(self, rules, address, info, rssi=-50):
+        return [r.name for r in watchlist.Watchlist(rules).match(address, info, rssi)]
+
+    def test_addresses_and_prefixes(self):
+        rules = [{"name": "exact", "address": "aa:bb:cc:dd:ee:01"}, {"name": "oui", "address": ["00:1A:7D:*"]}]
+        self.assertEqual(self._names(rules, "AA:BB:CC:DD:EE:01", NEARBY), ["exact"])
+        self.assertEqual(self._names(rules, "00:1a:7d:00:00:02", NEARBY), ["oui"])
+        self.assertEqual(self._names(rules, "AA:BB:CC:DD:EE:02", NEARBY), [])
+
+    def test_continuity_service_and_company(self):
+        rules = [
+            {"name": "find my", "continuity": "0x12"},
+            {"name": "tile", "service": "0000feed"},
+            {"name": "microsoft", "company": 6},
+            {"name": "hr", "service": "180d", "company": "0x0006"},
+        ]
+        self.assertEqual(self._names(rules, "4A:00:00:00:00:01", FIND_MY), ["find my"])
+        self.assertEqual(self._names(rules, "4A:00:00:00:00:01", NEARBY), [])
+        self.assertEqual(self._names(rules, "4A:00:00:00:00:01", TILE), ["tile"])
+        self.assertEqual(self._names(rules, "4A:00:00:00:00:01", MICROSOFT), ["microsoft", "hr"])
+
+    def test_all_fields_of_a_rule_must_match(self):
+        rules = [{"name": "close tag", "address": "4A:*", "continuity": 0x12, "rssi_min": -60}]
+        self.assertEqual(self._names(rules, "4A:00:00:00:00:01", FIND_MY, -55), ["close tag"])
+        self.assertEqual(self._names(rules, "4A:00:00:00:00:01", FIND_MY, -75), [])
+        self.assertEqual(self._names(rules, "4A:00:00:00:00:01", NEARBY, -55), [])
+        self.assertEqual(self._names(rules, "5C:00:00:00:00:01", FIND_MY, -55), [])
+
+    def test_compiled_lookup_matches_every_rule_checked_in_turn(self):
+        import suite
+        specs = suite.watchlist_rules(2000) + [{"address": "4A:*"}, {"continuity": 0x10}, {"company": 76, "rssi_min": -50}]
+        compiled = watchlist.Watchlist(specs)
+        for device, adv in suite.synthetic_adverts(3000, 300):
+            info = decoder.classify(adv.manufacturer_data, adv.service_uuids)
+            features = watchlist.features_of(info)
+            expected = {r.index for r in compiled.rules
+                        if r.address_ok(device.address) and r.content_ok(features) and device.rssi >= r.rssi_min}
+            self.assertEqual({r.index for r in compiled.match(device.address, info, device.rssi)}, expected)
+
+
+class TestAlerts(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.lines = []
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _watchlist(self, rules, actions=None):
+        w = watchlist.Watchlist(rules, actions)
+        w.emit = self.lines.append
+        return w
+
+    def test_cooldown_is_per_device(self):
+        w = self._watchlist([{"name": "tag", "continuity": 0x12, "cooldown": 60}])
+        fired = [bool(w.check("4A:00:00:00:00:01", FIND_MY, -50, t)) for t in (0, 10, 59, 60, 200)]
+        self.assertEqual(fired, [True, False, False, True, True])
+        self.assertTrue(w.check("4A:00:00:00:00:02", FIND_MY, -50, 10))
+        self.assertEqual(w.fired, 4)
+        self.assertEqual(len(self.lines), 4)
+        self.assertIn("tag 4A:00:00:00:00:01 -50 dBm", self.lines[0])
+
+    def test_hits_must_come_within_the_window(self):
+        w = self._watchlist([{"name": "tile", "service": "feed", "hits": 3, "within": 30}])
+        fired = [bool(w.check("D0:00:00:00:00:01", TILE, -50, t)) for t in (0, 10, 100, 110, 120)]
+        self.assertEqual(fired, [False, False, False, False, True])
+
+    def test_hits_do_not_depend_on_a_short_cooldown(self):
+        w = self._watchlist([{"name": "tag", "continuity": 0x12, "hits": 3, "cooldown": 0}])
+        fired = [bool(w.check("4A:00:00:00:00:01", FIND_MY, -50, t)) for t in range(10)]
+        self.assertEqual(fired, [False, False, True] * 3 + [False])  # Counting restarts after an alert
+
+        w = self._watchlist([{"name": "tag", "continuity": 0x12, "hits": 3, "cooldown": 5}])
+        fired = [bool(w.check("4A:00:00:00:00:01", FIND_MY, -50, t)) for t in range(0, 100, 10)]
+        self.assertEqual(fired, [False, False, True] * 3 + [False])
+
+    def test_rotated_addresses_share_the_device_key(self):
+        w = self._watchlist([{"name": "tag", "continuity": 0x12}])
+        self.assertTrue(w.check("4A:00:00:00:00:01", FIND_MY, -50, 0, key="4A:00:00:00:00:01"))
+        self.assertFalse(w.check("4A:00:00:00:00:09", FIND_MY, -50, 5, key="4A:00:00:00:00:01"))
+
+    def test_log_file_and_command_actions(self):
+        log = os.path.join(self.dir, "alerts.log")
+        out = os.path.join(self.dir, "command.txt")
+        actions = {
+            "file": {"type": "log", "path": log},
+            "run": {"type": "command", "command": [sys.executable, "-c",
+                    f"open({out!r}, 'a').write('{{rule}} {{address}} {{rssi}}\\n')"]},
+        }
+        w = self._watchlist([{"name": "ms", "company": 6, "actions": ["file", "run"]}], actions)
+        w.check("00:11:22:33:44:55", MICROSOFT, -61, 0)
+        w.close()
+        with open(log) as f:
+            self.assertIn("ms 00:11:22:33:44:55 -61 dBm (Microsoft)", f.read())
+        with open(out) as f:
+            self.assertEqual(f.read(), "ms 00:11:22:33:44:55 -61\n")
+        self.assertEqual(self.lines, [])  # No "log" action on this rule
+
+    def test_failed_action_is_counted(self):
+        actions = {"run": {"type": "command", "command": [os.path.join(self.dir, "missing")]}}
+        w = self._watchlist([{"company": 6, "actions": ["run"]}], actions)
+        w.check("00:11:22:33:44:55", MICROSOFT, -61, 0)
+        w.close()
+        self.assertEqual(w.stats()["failed"], 1)
+
+
+class TestLoad(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _load(self, spec):
+        path = os.path.join(self.dir, "rules.json")
+        with open(path, "w") as f:
+            f.write(spec if isinstance(spec, str) else json.dumps(spec))
+        return watchlist.load(path)
+
+    def test_rule_list_or_object(self):
+        self.assertEqual(len(self._load([{"company": 6}]).rules), 1)
+        self.assertEqual(len(self._load({"rules": [{"company": 6}, {"service": "feed"}]}).rules), 2)
+
+    def test_mistakes_are_reported(self):
+        for spec in ("{not json", {"rules": [{"rssi_min": -60}]}, {"rules": [{"company": 6, "rsi_min": -60}]},
+                     {"rules": [{"company": 6, "actions": ["pager"]}]}, {"rules": [{"company": "apple"}]},
+                     {"actions": {"x": {"type": "email"}}, "rules": []},
+                     {"actions": {"x": {"type": "webhook", "url": "ftp://host"}}, "rules": []}):
+            with self.assertRaises(ValueError, msg=spec):
+                self._load(spec)
+
+
+if __name__ == "__main__":
+    unittest.main()
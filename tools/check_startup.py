@@ -0,0 +1,83 @@
+"""
+Startup-time regression check for the `bluesentry` entry point.
+
+Runs each command in a fresh interpreter under `python -X importtime` and
+fails if it loads a module it should not (rich, bleak, plotext, asyncio,
+or for `--help` the modules behind the scan options) or if its imports
+take longer than the budget.
+
+Usage:
+    python3 tools/check_startup.py            # Check all commands
+    python3 tools/check_startup.py --top 10   # Also list the slowest imports
+    python3 tools/check_startup.py --scale 2  # Double every budget (slow machines)
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+UI = ("rich", "bleak", "plotext")
+# Behind the scan options; cli.py repeats their defaults instead of importing them
+OPTIONS = ("decoder", "gattcache", "occupancy", "reident", "sessionlog", "watchlist", "sqlite3", "threading")
+
+# (name, code run in a fresh interpreter, modules it must not load, import budget in ms)
+CHECKS = (
+    ("bluesentry --help", "import cli; cli.main_entry(['--help'])", UI + ("asyncio",) + OPTIONS, 60),
+    ("bluesentry query", "import cli; cli.main_entry(['query', '--help'])", UI + ("asyncio",) + OPTIONS, 60),
+    ("bluesentry --headless", "import cli, daemon", UI, 160),
+)
+
+
+def import_profile(code):
+    """
+    Runs `code` under -X importtime. Returns ({module: cumulative us} of the
+    top-level imports made by `code`, {module: self us} of every module it loaded).
+    """
+    def run(source):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"{source}\n"],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        return proc.stderr.splitlines()
+
+    startup = {line.rsplit("|", 1)[1].strip() for line in run("pass") if line.startswith("import time:")}
+    top = {}
+    loaded = {}
+    for line in run(code):
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line.split("|")
+        module = name.strip()
+        if module in startup:
+            continue
+        loaded[module] = int(own.split(":")[1])
+        if not name[1:].startswith(" "):  # Nested imports are indented
+            top[module] = int(cumulative)
+    return top, loaded
+
+
+def check(name, code, forbidden, budget_ms, top=0):
+    """Prints the result of one check. Returns True if it passed."""
+    imports, loaded = import_profile(code)
+    total_ms = sum(imports.values()) / 1000
+    bad = sorted({m.split(".")[0] for m in loaded} & set(forbidden))
+    ok = not bad and total_ms <= budget_ms
+    print(f"[{'+' if ok else '-'}] {name}: {total_ms:.1f} ms of imports (budget {budget_ms:g} ms)"
+          + (f", loads {', '.join(bad)}" if bad else ""))
+    for module, us in sorted(loaded.items(), key=lambda item: -item[1])[:top]:
+        print(f"      {us / 1000:7.1f} ms  {module}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check `bluesentry` startup imports against budgets")
+    parser.add_argument("--top", type=int, default=0, help="List the N slowest modules (own import time) of each command")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (default: 1)")
+    args = parser.parse_args()
+
+    failed = 0
+    for name, code, forbidden, budget_ms in CHECKS:
+        failed += not check(name, code, forbidden, budget_ms * args.scale, args.top)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,54 @@
+"""
+Regenerates assigned_numbers.py (the Bluetooth SIG tables used by vendors.py).
+
+Sources (both pip-installable, MIT licensed):
+  - bluetooth-numbers : company identifiers, 16-bit services, characteristics
+  - bleak             : 16-bit member service UUIDs (0xFC00-0xFEFF)
+
+Usage:
+    pip install bluetooth-numbers bleak
+    python3 tools/gen_assigned_numbers.py > assigned_numbers.py
+"""
+import sys
+
+from bleak.uuids import uuid16_dict
+from bluetooth_numbers import characteristic, company, service
+
+MEMBER_RANGE = range(0xFC00, 0xFF00)
+
+
+def clean(name):
+    # Undo UTF-8 read as Latin-1/CP1252 in the upstream data ("GerÃ¤te" -> "Geräte")
+    for codec in ("latin-1", "cp1252"):
+        try:
+            name = name.encode(codec).decode("utf-8")
+            break
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+    # Single line, and safe inside a triple-quoted string literal
+    name = " ".join(name.split())
+    return name.replace("\\", "/").replace('"""', "'''")
+
+
+def blob(table):
+    """One 'XXXX<TAB>Name' line per 16-bit key, sorted by key."""
+    entries = sorted((k, v) for k, v in table.items() if isinstance(k, int) and 0 <= k <= 0xFFFF)
+    lines = [f"{k:04X}\t{clean(v)}" for k, v in entries]
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    services = {k: v for k, v in service.items() if isinstance(k, int)}
+    for k, v in uuid16_dict.items():
+        if k in MEMBER_RANGE and k not in services:
+            services[k] = v
+
+    out = sys.stdout
+    out.write("# Bluetooth SIG assigned numbers, generated by tools/gen_assigned_numbers.py.\n")
+    out.write("# Do not edit by hand. Parsed lazily by vendors.py on first lookup.\n\n")
+    for name, table in (("COMPANIES", company), ("SERVICES", services), ("CHARACTERISTICS", characteristic)):
+        out.write(f'{name} = """\\\n{blob(table)}"""\n\n')
+
+
+if __name__ == "__main__":
+    main()
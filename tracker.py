@@ -1,67 +1,235 @@
+import argparse
 import asyncio
+import importlib.util
 import sys
 import time
-import plotext as plt
-from bleak import BleakScanner
+from array import array
 from rich.console import Console
 from rich.layout import Layout
 from rich.live import Live
 from rich.panel import Panel
+from rich.text import Text
+
+import capture
+from sparkline import BrailleChart, RefreshPacer
 
 console = Console()
 
 # Configuration
-HISTORY_SIZE = 50
-rssi_history = []
-timestamps = []
+HISTORY_SIZE = 50        # Buckets on screen
+BUCKET_SECONDS = 0.2     # One bucket per render tick -> 10 s window
+STALE_SECONDS = 3.0      # Signal counts as lost after this long without adverts
+RING_SIZE = 4096         # Raw samples kept per target
+LOST_RSSI = -100
+
+# Rendering
+BACKENDS = ("braille", "plotext")  # plotext is optional (pip install plotext)
+REFRESH_MAX_SECONDS = 2.0  # Slowest redraw while the signal is stable
+REFRESH_CHANGE_DB = 2.0    # A move this big redraws on the next tick
+
+SMOOTHERS = ("none", "ema", "kalman")
+EMA_ALPHA = 0.3
+KALMAN_Q = 4.0           # Process noise (dBm^2 per second): how fast the true signal drifts
+KALMAN_R = 16.0          # Measurement noise (dBm^2): multipath jitter per advert
+
+class RssiRing:
+    """
+    Fixed-size ring buffer of (monotonic time, raw RSSI, smoothed RSSI).
+    Backed by preallocated arrays, so recording an advert is two index
+    stores and nothing is ever shifted or reallocated.
+    """
+
+    def __init__(self, size=RING_SIZE):
+        self.size = size
+        self.times = array("d", bytes(8 * size))
+        self.raw = array("h", bytes(2 * size))
+        self.smooth = array("d", bytes(8 * size))
+        self.head = 0   # Next slot to write
+        self.count = 0
+
+    def append(self, t, rssi, smoothed):
+        i = self.head
+        self.times[i] = t
+        self.raw[i] = rssi
+        self.smooth[i] = smoothed
+        self.head = (i + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def latest(self):
+        """(time, raw, smoothed) of the newest sample, or None."""
+        if not self.count:
+            return None
+        i = self.head - 1
+        return self.times[i], self.raw[i], self.smooth[i]
+
+    def iter_since(self, start):
+        """Yields (time, raw, smoothed) newest-first until `start` is passed."""
+        times, raw, smooth = self.times, self.raw, self.smooth
+        i = self.head
+        for _ in range(self.count):
+            i -= 1
+            t = times[i]
+            if t < start:
+                return
+            yield t, raw[i], smooth[i]
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+class Smoother:
+    """Per-advert RSSI filter: passthrough, EMA or a scalar Kalman filter."""
+
+    def __init__(self, mode="kalman"):
+        if mode not in SMOOTHERS:
+            raise ValueError(f"Unknown smoother: {mode}")
+        self.mode = mode
+        self.value = None
+        self.variance = KALMAN_R
+        self.last_time = None
+
+    def update(self, t, rssi):
+        if self.value is None or self.mode == "none":
+            self.value = float(rssi)
+        elif self.mode == "ema":
+            self.value += EMA_ALPHA * (rssi - self.value)
+        else:
+            # Predict (uncertainty grows with time since the last advert), then correct
+            self.variance += KALMAN_Q * (t - self.last_time)
+            gain = self.variance / (self.variance + KALMAN_R)
+            self.value += gain * (rssi - self.value)
+            self.variance *= 1 - gain
+        self.last_time = t
+        return self.value
+
+class Target:
+    """Live state of one tracked device."""
+
+    def __init__(self, address, smoothing="kalman"):
+        self.address = address
+        self.name = "Unknown"
+        self.samples = RssiRing()
+        self.smoother = Smoother(smoothing)
+
+    def record(self, t, rssi):
+        self.samples.append(t, rssi, self.smoother.update(t, rssi))
+
+    @property
+    def rssi(self):
+        latest = self.samples.latest()
+        return latest[1] if latest else LOST_RSSI
+
+    @property
+    def last_seen(self):
+        latest = self.samples.latest()
+        return latest[0] if latest else 0
+
+    def series(self, now=None, buckets=HISTORY_SIZE, width=BUCKET_SECONDS):
+        """
+        Time-bucketed display series, oldest first: (mean, max, smoothed) lists.
+        An empty bucket repeats the previous one while the signal is fresh
+        (adverts are usually slower than the bucket width) and reads as
+        LOST_RSSI once nothing was heard for STALE_SECONDS.
+        """
+        if now is None:
+            now = time.monotonic()
+        start = now - buckets * width
+        sums = [0.0] * buckets
+        counts = [0] * buckets
+        maxes = [LOST_RSSI] * buckets
+        smooth = [LOST_RSSI] * buckets
+        heard = [None] * buckets
+        before = None
+
+        # Newest first, so the first sample seen in a bucket is its latest
+        for t, raw, smoothed in self.samples.iter_since(start - STALE_SECONDS):
+            if t >= now:
+                continue  # Belongs to a bucket that is still filling
+            if t < start:
+                before = (t, raw, raw, smoothed)  # Last sample before the window
+                break
+            b = min(int((t - start) / width), buckets - 1)
+            if not counts[b]:
+                heard[b] = t
+                smooth[b] = smoothed
+            sums[b] += raw
+            counts[b] += 1
+            if raw > maxes[b]:
+                maxes[b] = raw
+
+        means = [LOST_RSSI] * buckets
+        prev = before
+        for b in range(buckets):
+            if counts[b]:
+                means[b] = sums[b] / counts[b]
+                prev = (heard[b], means[b], maxes[b], smooth[b])
+            elif prev and start + (b + 1) * width - prev[0] <= STALE_SECONDS:
+                _, means[b], maxes[b], smooth[b] = prev
+        return means, maxes, smooth
+
+    def trace(self, now=None, buckets=HISTORY_SIZE):
+        """The series charts and the proximity alert follow: smoothed if enabled, else bucket means."""
+        means, _, smooth = self.series(now, buckets)
+        return means if self.smoother.mode == "none" else smooth
 
-target_device = {
-    "rssi": -100,
-    "last_seen": 0,
-    "name": "Unknown"
-}
+# Tracked devices: {ADDRESS (upper case): Target}
+targets = {}
 
 def detection_callback(device, advertisement_data):
-    """Callback for when the specific target is found."""
-    # Note: We filter in the main loop, but we need to update global state here
-    if device.address.upper() == TARGET_MAC.upper():
-        target_device["rssi"] = device.rssi
-        target_device["last_seen"] = time.time()
-        target_device["name"] = device.name or advertisement_data.local_name or "Unknown"
-
-def update_graph():
-    """Draws the plotext graph and returns it as a string."""
+    """Callback for every advertisement; each sighting of a target is recorded."""
+    target = targets.get(device.address.upper())
+    if target is None:
+        return
+    target.record(time.monotonic(), advertisement_data.rssi)
+    target.name = device.name or advertisement_data.local_name or target.name
+
+def update_graph(target, width=None, height=None, now=None):
+    """
+    Draws the full plotext graph for one target and returns
+    (graph string, RSSI for the proximity alert).
+    """
+    import plotext as plt
+
     plt.clf()
-    
-    # Data management
-    current_rssi = target_device["rssi"]
-    
-    # If device hasn't been seen in 3 seconds, drop signal to -100
-    if time.time() - target_device["last_seen"] > 3.0:
-        current_rssi = -100
-
-    rssi_history.append(current_rssi)
-    timestamps.append(time.strftime("%H:%M:%S"))
-    
-    # Keep history fixed size
-    if len(rssi_history) > HISTORY_SIZE:
-        rssi_history.pop(0)
-        timestamps.pop(0)
+    if width and height:
+        plt.plotsize(width, height)
+
+    means, maxes, smooth = target.series(now)
 
     # Plotting
-    plt.plot(rssi_history, marker="dot", color="green")
+    plt.plot(maxes, marker="dot", color="red", label="max")
+    plt.plot(means, marker="dot", color="green", label="mean")
+    if target.smoother.mode != "none":
+        plt.plot(smooth, marker="dot", color="yellow", label=target.smoother.mode)
     plt.ylim(-100, -30)
-    plt.title(f"Signal Strength: {target_device['name']} ({TARGET_MAC})")
-    plt.xlabel("Time")
+    plt.title(f"Signal Strength: {target.name} ({target.address})")
+    plt.xlabel(f"Time ({BUCKET_SECONDS:g} s buckets)")
     plt.ylabel("RSSI (dBm)")
     plt.theme("dark")  # clear, dark, matrix
     plt.frame(True)
     plt.grid(True, True)
-    
-    return plt.build()
+
+    current = smooth[-1] if target.smoother.mode != "none" else means[-1]
+    return plt.build(), current
+
+def braille_panel(target, chart):
+    """Panel around a target's incrementally drawn braille chart."""
+    rssi = chart.last_value
+    reading = f"{rssi:.0f} dBm" if rssi is not None else "no signal"
+    return Panel(
+        Text(chart.render(), style="green"),
+        title=f"Signal Strength: {target.name} ({target.address})",
+        subtitle=f"{reading} | {chart.columns * BUCKET_SECONDS:g} s",
+    )
 
 def get_proximity_alert(rssi):
     """Returns a rich panel with hot/cold text."""
+    if rssi is None:
+        rssi = LOST_RSSI
     if rssi > -50:
         return Panel("[bold white on red] !!! VERY CLOSE !!! [/bold white on red]", title="Proximity", border_style="red")
     elif rssi > -70:
@@ -71,46 +239,106 @@ def get_proximity_alert(rssi):
     else:
         return Panel("[dim] WEAK / LOST SIGNAL [/dim]", title="Proximity", border_style="dim")
 
-async def start_tracker(address):
+def build_layout(count):
     """
-    Starts the tracker for a specific MAC address.
-    Can be called from other scripts.
+    One graph + proximity panel per target.
+    A single target keeps the classic graph-over-alert arrangement;
+    several targets get one row each with the alert beside the graph.
     """
-    global TARGET_MAC
-    TARGET_MAC = address
-    
-    # Clear internal history for a fresh start
-    rssi_history.clear()
-    timestamps.clear()
-    target_device["rssi"] = -100
-    target_device["last_seen"] = 0
-    target_device["name"] = "Unknown"
-
-    # Setup Rich Layout
     layout = Layout()
-    layout.split_column(
-        Layout(name="graph", ratio=3),
-        Layout(name="alert", ratio=1)
-    )
+    if count == 1:
+        layout.split_column(
+            Layout(name="graph-0", ratio=3),
+            Layout(name="alert-0", ratio=1)
+        )
+        return layout
+
+    rows = []
+    for i in range(count):
+        row = Layout(name=f"target-{i}")
+        row.split_row(
+            Layout(name=f"graph-{i}", ratio=3),
+            Layout(name=f"alert-{i}", ratio=1)
+        )
+        rows.append(row)
+    layout.split_column(*rows)
+    return layout
+
+def graph_size(count):
+    """Plot size (chars) that fits one target's graph panel."""
+    width, height = console.size
+    if count == 1:
+        return width - 4, (height * 3) // 4 - 2
+    return (width * 3) // 4 - 4, height // count - 2
+
+async def start_tracker(addresses, replay=None, speed=1.0, smoothing="kalman", backend="braille"):
+    """
+    Starts the tracker for one MAC address or a list of them.
+    All targets share a single scanner. Can be called from other scripts.
+    Pass a capture file as `replay` to track from a recording instead of the adapter.
+    `smoothing` is one of SMOOTHERS and adds a filtered trace to each graph.
+    `backend` is "braille" (incremental, built in) or "plotext" (full redraw).
+    """
+    if isinstance(addresses, str):
+        addresses = [addresses]
+    if backend == "plotext":
+        if importlib.util.find_spec("plotext") is None:
+            console.print("[yellow]plotext is not installed, using the braille renderer.[/yellow]")
+            backend = "braille"
+
+    # Fresh state for every target
+    targets.clear()
+    for address in addresses:
+        targets[address.upper()] = Target(address, smoothing)
+    tracked = list(targets.values())
 
-    console.print(f"[bold yellow]Tracking Device:[/bold yellow] {address}")
+    layout = build_layout(len(tracked))
+    charts = [BrailleChart(1, 1) for _ in tracked] if backend == "braille" else None
+    pacer = RefreshPacer(BUCKET_SECONDS, REFRESH_MAX_SECONDS, REFRESH_CHANGE_DB)
+
+    console.print(f"[bold yellow]Tracking {'Device' if len(tracked) == 1 else 'Devices'}:[/bold yellow] {', '.join(addresses)}")
     console.print("Move around to locate the signal source. Press Ctrl+C to stop.")
 
-    scanner = BleakScanner(detection_callback=detection_callback)
+    scanner = capture.open_scanner(detection_callback, replay=replay, speed=speed)
     await scanner.start()
 
     try:
-        with Live(layout, refresh_per_second=4) as live:
+        with Live(layout, auto_refresh=False) as live:
+            edge = None
             while True:
-                # Update Graph
-                graph_str = update_graph()
-                layout["graph"].update(Panel(graph_str, title="Live Signal Tracker"))
-                
-                # Update Proximity Alert
-                rssi = rssi_history[-1] if rssi_history else -100
-                layout["alert"].update(get_proximity_alert(rssi))
-                
-                await asyncio.sleep(0.2)
+                # 1. Close finished buckets (aligned to BUCKET_SECONDS)
+                now = time.monotonic()
+                new_edge = now - now % BUCKET_SECONDS
+                width, height = graph_size(len(tracked))
+                current = {}
+                for i, target in enumerate(tracked):
+                    if charts is None:
+                        current[i] = target.trace(new_edge, 1)[-1]
+                        continue
+                    chart = charts[i]
+                    if edge is None or (chart.width, chart.height) != (width, height):
+                        chart.resize(width, height)
+                        chart.extend(target.trace(new_edge, chart.columns))
+                    else:
+                        # Only the new columns are drawn
+                        steps = round((new_edge - edge) / BUCKET_SECONDS)
+                        if steps:
+                            chart.extend(target.trace(new_edge, min(steps, chart.columns)))
+                    current[i] = chart.last_value
+                edge = new_edge
+
+                # 2. Redraw fast while the signal moves, slower while it is stable
+                if pacer.due(now, current):
+                    for i, target in enumerate(tracked):
+                        if charts is None:
+                            graph_str, _ = update_graph(target, width, height, edge)
+                            layout[f"graph-{i}"].update(Panel(graph_str, title="Live Signal Tracker"))
+                        else:
+                            layout[f"graph-{i}"].update(braille_panel(target, charts[i]))
+                        layout[f"alert-{i}"].update(get_proximity_alert(current[i]))
+                    live.refresh()
+
+                await asyncio.sleep(max(0.0, edge + BUCKET_SECONDS - time.monotonic()))
     except KeyboardInterrupt:
         pass
     except asyncio.CancelledError:
@@ -119,13 +347,25 @@ async def start_tracker(address):
         await scanner.stop()
         console.print("[bold red]Tracker Stopped.[/bold red]")
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python3 tracker.py <MAC_ADDRESS>")
-        sys.exit(1)
-    
-    target_mac = sys.argv[1]
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="bluesentry track",
+        description="BlueSentry Bloodhound: follow the signal of one or more devices",
+    )
+    parser.add_argument("addresses", nargs="+", metavar="MAC_ADDRESS", help="Device(s) to track")
+    parser.add_argument("--replay", type=str, help="Track from a capture file instead of the Bluetooth adapter")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay speed multiplier, 0 = as fast as possible")
+    parser.add_argument("--smooth", choices=SMOOTHERS, default="kalman", help="Smoothed RSSI trace (default: kalman)")
+    parser.add_argument("--plot", choices=BACKENDS, default="braille", help="Graph renderer (default: braille; plotext is optional)")
+    args = parser.parse_args(argv)
+
     try:
-        asyncio.run(start_tracker(target_mac))
+        asyncio.run(start_tracker(args.addresses, replay=args.replay, speed=args.replay_speed,
+                                  smoothing=args.smooth, backend=args.plot))
     except KeyboardInterrupt:
         pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,14 @@
+import array
+from bisect import bisect_left
+from collections import namedtuple
+from collections.abc import Mapping
+
 # Bluetooth Company Identifiers
 # Source: https://www.bluetooth.com/specifications/assigned-numbers/company-identifiers/
+# The full SIG tables live in assigned_numbers.py (generated, see tools/).
+# The short names below are curated display names and take precedence.
 
-COMPANY_IDS = {
+_COMPANY_NAMES = {
     0: "Ericsson",
     1: "Nokia Mobile Phones",
     2: "Intel Corp.",
@@ -37,55 +44,285 @@ COMPANY_IDS = {
     841: "Tile, Inc.",
     1122: "Anker Innovations",
     2055: "Wyze Labs",
-    # Add more as needed...
 }
 
-# Common Service UUIDs (Expanded)
-SERVICE_UUIDS = {
-    "00001800-0000-1000-8000-00805f9b34fb": "Generic Access",
-    "00001801-0000-1000-8000-00805f9b34fb": "Generic Attribute",
-    "0000180a-0000-1000-8000-00805f9b34fb": "Device Information",
-    "0000180f-0000-1000-8000-00805f9b34fb": "Battery Service",
-    "0000180d-0000-1000-8000-00805f9b34fb": "Heart Rate",
-    "00001805-0000-1000-8000-00805f9b34fb": "Current Time",
-    "00001821-0000-1000-8000-00805f9b34fb": "Indoor Positioning",
-    "00001819-0000-1000-8000-00805f9b34fb": "Location and Navigation",
-    "00001827-0000-1000-8000-00805f9b34fb": "Mesh Provisioning",
-    "00001828-0000-1000-8000-00805f9b34fb": "Mesh Proxy",
-    "00001812-0000-1000-8000-00805f9b34fb": "Human Interface Device (HID)",
-    "00001810-0000-1000-8000-00805f9b34fb": "Blood Pressure",
-    "0000181a-0000-1000-8000-00805f9b34fb": "Environmental Sensing",
-    "0000fe9f-0000-1000-8000-00805f9b34fb": "Google (Chromecast/Smart Home)",
-    "0000feed-0000-1000-8000-00805f9b34fb": "Tile, Inc.",
-    "0000fd6f-0000-1000-8000-00805f9b34fb": "COVID-19 Exposure Notification",
+# Common Service UUIDs (16-bit), curated display names
+_SERVICE_NAMES = {
+    0x1800: "Generic Access",
+    0x1801: "Generic Attribute",
+    0x180A: "Device Information",
+    0x180F: "Battery Service",
+    0x180D: "Heart Rate",
+    0x1805: "Current Time",
+    0x1821: "Indoor Positioning",
+    0x1819: "Location and Navigation",
+    0x1827: "Mesh Provisioning",
+    0x1828: "Mesh Proxy",
+    0x1812: "Human Interface Device (HID)",
+    0x1810: "Blood Pressure",
+    0x181A: "Environmental Sensing",
+    0xFE9F: "Google (Chromecast/Smart Home)",
+    0xFEED: "Tile, Inc.",
+    0xFD6F: "COVID-19 Exposure Notification",
 }
 
+BASE_UUID_SUFFIX = "-0000-1000-8000-00805f9b34fb"
+
+def uuid16(uuid):
+    """
+    Returns the 16-bit number of a SIG UUID ("0000180d-0000-1000-8000-00805f9b34fb",
+    "180d" or 0x180D), or None for vendor-specific 128-bit UUIDs.
+    """
+    if isinstance(uuid, int):
+        return uuid
+    s = str(uuid).lower()
+    if len(s) == 36:
+        if s.startswith("0000") and s.endswith(BASE_UUID_SUFFIX):
+            return int(s[4:8], 16)
+        return None
+    if len(s) <= 4:
+        try:
+            return int(s, 16)
+        except ValueError:
+            return None
+    return None
+
+class AssignedNumbers(Mapping):
+    """
+    Read-only {16-bit number: name} table backed by assigned_numbers.py.
+
+    Nothing is parsed until the first lookup that misses the curated
+    overrides. The table is then held as two integer arrays (keys and
+    line offsets) over the original string, not as thousands of dict
+    entries. Keys can be ints or SIG UUID strings.
+    """
+
+    def __init__(self, table, overrides=None):
+        self._table = table
+        self.overrides = overrides or {}
+        self._keys = None
+        self._starts = None
+        self._text = ""
+
+    @property
+    def loaded(self):
+        return self._keys is not None
+
+    def _load(self):
+        import assigned_numbers
+        text = getattr(assigned_numbers, self._table)
+        keys = array.array("H")
+        starts = array.array("I")
+        pos = 0
+        end = len(text)
+        while pos < end:
+            keys.append(int(text[pos:pos + 4], 16))
+            starts.append(pos)
+            pos = text.index("\n", pos) + 1
+        starts.append(end)
+        self._text = text
+        self._starts = starts
+        self._keys = keys
+
+    def _lookup(self, key):
+        if self._keys is None:
+            self._load()
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            # Line is "XXXX<TAB>Name\n"
+            return self._text[self._starts[i] + 5:self._starts[i + 1] - 1]
+        raise KeyError(key)
+
+    def __getitem__(self, key):
+        if not isinstance(key, int):
+            number = uuid16(key)
+            if number is None:
+                raise KeyError(key)
+            key = number
+        name = self.overrides.get(key)
+        if name is not None:
+            return name
+        if not 0 <= key <= 0xFFFF:
+            raise KeyError(key)
+        return self._lookup(key)
+
+    def __iter__(self):
+        if self._keys is None:
+            self._load()
+        return iter(sorted(set(self._keys).union(self.overrides)))
+
+    def __len__(self):
+        if self._keys is None:
+            self._load()
+        return len(set(self._keys).union(self.overrides))
+
+COMPANY_IDS = AssignedNumbers("COMPANIES", _COMPANY_NAMES)
+SERVICE_UUIDS = AssignedNumbers("SERVICES", _SERVICE_NAMES)
+CHARACTERISTIC_UUIDS = AssignedNumbers("CHARACTERISTICS")
+
+def gatt_name(uuid, default="Unknown"):
+    """Name of a GATT service or characteristic UUID."""
+    return SERVICE_UUIDS.get(uuid) or CHARACTERISTIC_UUIDS.get(uuid) or default
+
+# Apple Continuity message types (manufacturer ID 0x004C)
+# Based on reverse-engineered specs of the 'Continuity' protocol.
+APPLE_IBEACON = 0x02
+APPLE_AIRDROP = 0x05
+APPLE_PROXIMITY_PAIRING = 0x07
+APPLE_AIRPLAY_TARGET = 0x09
+APPLE_HANDOFF = 0x0C
+APPLE_NEARBY_ACTION = 0x0F
+APPLE_NEARBY_INFO = 0x10
+APPLE_FIND_MY = 0x12
+
+APPLE_TYPES = {
+    APPLE_IBEACON: "iBeacon",
+    0x03: "AirPrint",
+    APPLE_AIRDROP: "AirDrop",
+    0x06: "HomeKit",
+    APPLE_PROXIMITY_PAIRING: "AirPods",
+    0x08: "Hey Siri",
+    APPLE_AIRPLAY_TARGET: "AirPlay Target",
+    0x0A: "AirPlay Source",
+    0x0B: "Magic Switch",
+    APPLE_HANDOFF: "Handoff",
+    0x0D: "Tethering Target",
+    0x0E: "Tethering Source",
+    APPLE_NEARBY_ACTION: "Nearby Action",
+    APPLE_NEARBY_INFO: "Nearby",
+    APPLE_FIND_MY: "Find My (AirTag?)",
+}
+
+# Proximity Pairing device models
+AIRPODS_MODELS = {
+    0x0220: "AirPods",
+    0x0F20: "AirPods 2",
+    0x1320: "AirPods 3",
+    0x0E20: "AirPods Pro",
+    0x1420: "AirPods Pro 2",
+    0x0A20: "AirPods Max",
+    0x0320: "Powerbeats3",
+    0x0520: "BeatsX",
+    0x0620: "Beats Solo3",
+    0x0920: "Beats Studio3",
+    0x0B20: "Powerbeats Pro",
+    0x0C20: "Beats Solo Pro",
+    0x1020: "Beats Flex",
+    0x1120: "Beats Studio Buds",
+}
+
+# One TLV from a Continuity payload. `value` is a memoryview into the
+# original payload (no copy); `flags` is its first byte (0 if empty) and
+# `detail` a decoded record for the types below, else None.
+# len(value) < length means the message was truncated.
+ContinuityMessage = namedtuple("ContinuityMessage", "type length flags value detail")
+
+# Battery levels are percentages, None when unknown
+AirPodsStatus = namedtuple("AirPodsStatus", "model model_name left right case charging lid_open")
+NearbyInfo = namedtuple("NearbyInfo", "action status_flags data_flags")
+NearbyAction = namedtuple("NearbyAction", "action_type flags")
+FindMyStatus = namedtuple("FindMyStatus", "battery maintained")
+IBeacon = namedtuple("IBeacon", "uuid major minor tx_power")
+
+def _battery(nibble):
+    return nibble * 10 if nibble <= 10 else None
+
+def _airpods(v):
+    if len(v) < 6:
+        return None
+    model = (v[1] << 8) | v[2]
+    status = v[3]
+    # Which nibble holds which pod depends on the primary pod
+    flipped = ((status >> 4) & 0x02) == 0
+    high, low = v[4] >> 4, v[4] & 0x0F
+    left, right = (high, low) if flipped else (low, high)
+    return AirPodsStatus(
+        model,
+        AIRPODS_MODELS.get(model),
+        _battery(left),
+        _battery(right),
+        _battery(v[5] & 0x0F),
+        v[5] >> 4,
+        v[6] if len(v) > 6 else None,
+    )
+
+def _nearby_info(v):
+    if len(v) < 2:
+        return None
+    return NearbyInfo(v[0] & 0x0F, v[0] >> 4, v[1])
+
+def _nearby_action(v):
+    if len(v) < 2:
+        return None
+    return NearbyAction(v[1], v[0])
+
+def _find_my(v):
+    if not v:
+        return None
+    return FindMyStatus((v[0] >> 6) & 0x03, bool(v[0] & 0x04))
+
+def _ibeacon(v):
+    if len(v) < 21:
+        return None
+    return IBeacon(bytes(v[0:16]).hex(), (v[16] << 8) | v[17], (v[18] << 8) | v[19], v[20] - 256 if v[20] > 127 else v[20])
+
+_DETAIL_DECODERS = {
+    APPLE_PROXIMITY_PAIRING: _airpods,
+    APPLE_NEARBY_INFO: _nearby_info,
+    APPLE_NEARBY_ACTION: _nearby_action,
+    APPLE_FIND_MY: _find_my,
+    APPLE_IBEACON: _ibeacon,
+}
+
+def parse_continuity(data_bytes):
+    """
+    Walks every Continuity TLV (type, length, value) in an Apple payload.
+    Returns a list of ContinuityMessage. Values are memoryview slices of
+    the payload, so nothing is copied; a short final TLV is kept truncated.
+    """
+    view = memoryview(data_bytes)
+    end = len(view)
+    messages = []
+    pos = 0
+    decoders = _DETAIL_DECODERS
+    while pos + 1 < end:
+        msg_type = view[pos]
+        length = view[pos + 1]
+        value = view[pos + 2:pos + 2 + length]
+        decode = decoders.get(msg_type)
+        messages.append(ContinuityMessage(
+            msg_type,
+            length,
+            value[0] if value else 0,
+            value,
+            decode(value) if decode else None,
+        ))
+        pos += 2 + length
+    return messages
+
+def apple_label(message):
+    """Display name of a single Continuity message."""
+    if message.type == APPLE_PROXIMITY_PAIRING and message.detail and message.detail.model_name:
+        return f"Apple {message.detail.model_name}"
+    name = APPLE_TYPES.get(message.type)
+    return f"Apple {name}" if name else f"Apple Device (Type: {hex(message.type)})"
+
 def identify_apple_device(data_bytes):
     """
     Analyzes the payload for Apple Manufacturer ID 0x004C (76).
     Returns a string describing the probable device/packet type.
-    Based on reverse-engineered specs of the 'Continuity' protocol.
+    Every Continuity message in the payload is named, e.g. "Apple Nearby + Handoff".
     """
     if not data_bytes or len(data_bytes) < 2:
         return "Apple Device"
-        
-    # The first byte usually indicates the type of message
-    type_byte = data_bytes[0]
-    
-    # Common Apple Continuity Types
-    if type_byte == 0x02:
-        return "Apple iBeacon"
-    elif type_byte == 0x05:
-        return "Apple AirDrop"
-    elif type_byte == 0x07:
-        return "Apple AirPods"
-    elif type_byte == 0x09:
-        return "Apple AirPlay Target"
-    elif type_byte == 0x0C:
-        return "Apple Handoff"
-    elif type_byte == 0x10:
-        return "Apple Nearby"
-    elif type_byte == 0x12:
-        return "Apple Find My (AirTag?)"
-    
-    return f"Apple Device (Type: {hex(type_byte)})"
+
+    labels = []
+    for message in parse_continuity(data_bytes):
+        label = apple_label(message)
+        if label not in labels:
+            labels.append(label)
+
+    if len(labels) > 1:
+        # "Apple Nearby + Handoff" rather than repeating the brand
+        return labels[0] + "".join(" + " + label[len("Apple "):] for label in labels[1:])
+    return labels[0]
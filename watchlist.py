@@ -0,0 +1,412 @@
+"""
+Watchlist: alert rules checked against every advertisement.
+
+A rule file (JSON) lists what to look for:
+
+    {
+      "actions": {
+        "ops": {"type": "webhook", "url": "http://127.0.0.1:8080/alerts"},
+        "beep": {"type": "command", "command": "notify-send BlueSentry '{rule}: {address}'"},
+        "file": {"type": "log", "path": "alerts.log"}
+      },
+      "rules": [
+        {"name": "Find My tag", "continuity": "0x12", "rssi_min": -70, "cooldown": 300, "actions": ["log", "ops"]},
+        {"name": "Tile", "service": "feed", "hits": 3, "within": 30},
+        {"name": "Lab badges", "address": ["AA:BB:CC:DD:EE:01", "00:1A:7D:*"]},
+        {"name": "Microsoft nearby", "company": 6, "rssi_min": -60}
+      ]
+    }
+
+Values of one field are alternatives; different fields must all match.
+An address ending in "*" is a prefix. `hits` matching sightings within
+`within` seconds are needed before a rule fires, then it stays quiet for
+`cooldown` seconds per device. Rules without actions use "log" (the front end's output).
+
+Rules are compiled into hashed sets: exact addresses in a dict, prefixes
+in one dict per prefix length, and company IDs, Continuity types and
+service UUIDs in dicts whose result is memoized per decoded
+advertisement. A sighting costs a few dict lookups however many rules
+there are.
+"""
+import json
+import queue
+import threading
+from collections import deque, namedtuple
+from datetime import datetime
+
+import vendors
+
+DEFAULT_COOLDOWN = 60.0
+DEFAULT_WITHIN = 60.0  # Seconds in which `hits` sightings must fall
+MAX_STATE = 10000     # (rule, device) debounce entries kept before pruning
+MEMO_SIZE = 4096      # Decoded advertisements whose matching rules are remembered
+RULE_FIELDS = ("name", "address", "company", "continuity", "service", "rssi_min", "hits", "within", "cooldown", "actions")
+
+Alert = namedtuple("Alert", "time rule address rssi manufacturer")
+
+
+def alert_line(alert):
+    """ "2026-10-17T14:05:00 Find My tag 4A:..:01 -62 dBm (Apple Find My)" """
+    when = datetime.fromtimestamp(alert.time).isoformat(timespec="seconds")
+    return f"{when} {alert.rule} {alert.address} {alert.rssi} dBm ({alert.manufacturer})"
+
+
+def alert_fields(alert):
+    """Placeholders for command and webhook actions."""
+    return {
+        "time": datetime.fromtimestamp(alert.time).isoformat(timespec="seconds"),
+        "rule": alert.rule,
+        "address": alert.address,
+        "rssi": alert.rssi,
+        "manufacturer": alert.manufacturer,
+    }
+
+
+def parse_number(value):
+    """6, "6", "0x12" -> int."""
+    return value if isinstance(value, int) else int(str(value), 0)
+
+
+def service_key(uuid):
+    """16-bit number of a SIG service ("feed", "0000feed", full UUID), else the lowercase UUID."""
+    s = str(uuid).strip().lower()
+    if len(s) == 8 and s.startswith("0000"):
+        s = s[4:]
+    number = vendors.uuid16(s)
+    return number if number is not None else s
+
+
+def _list(value):
+    return value if isinstance(value, list) else [value]
+
+
+# --- Actions ---
+
+class LogAction:
+    """Appends the alert line to `path`, or hands it to the front end (no path)."""
+    blocking = False
+
+    def __init__(self, path=None, emit=None):
+        self.path = path
+        self.emit = emit
+        self._file = open(path, "a") if path else None
+
+    def __call__(self, alert):
+        if self._file is not None:
+            self._file.write(alert_line(alert) + "\n")
+            self._file.flush()
+        elif self.emit is not None:
+            self.emit(alert_line(alert))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class WebhookAction:
+    """POSTs the alert as JSON to `url` (from the action thread)."""
+    blocking = True
+
+    def __init__(self, url, timeout=5.0):
+        if not str(url).startswith(("http://", "https://")):
+            raise ValueError(f"Webhook URL must be http(s): {url}")
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, alert):
+        import urllib.request  # Only loaded when a webhook is configured
+        request = urllib.request.Request(
+            self.url, data=json.dumps(alert_fields(alert)).encode(),
+            headers={"Content-Type": "application/json"}, method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+    def close(self):
+        pass
+
+
+class CommandAction:
+    """
+    Runs a local command (from the action thread). Placeholders such as
+    {rule}, {address} and {rssi} are filled in per argument, never
+    through a shell.
+    """
+    blocking = True
+
+    def __init__(self, command, timeout=10.0):
+        import shlex
+        self.args = shlex.split(command) if isinstance(command, str) else [str(a) for a in command]
+        if not self.args:
+            raise ValueError("Empty command action")
+        self.timeout = timeout
+
+    def __call__(self, alert):
+        import subprocess
+        fields = alert_fields(alert)
+        subprocess.run([arg.format(**fields) for arg in self.args], timeout=self.timeout,
+                       stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def close(self):
+        pass
+
+
+# Action type -> class; extra keys of an action entry are its arguments
+ACTIONS = {
+    "log": LogAction,
+    "webhook": WebhookAction,
+    "command": CommandAction,
+}
+
+
+# --- Rules ---
+
+class Rule:
+    __slots__ = ("index", "name", "addresses", "prefixes", "companies", "continuity", "services",
+                 "rssi_min", "hits", "within", "cooldown", "actions")
+
+    def __init__(self, index, spec, actions):
+        unknown = set(spec) - set(RULE_FIELDS)
+        if unknown:
+            raise ValueError(f"Rule {index + 1}: unknown field(s) {', '.join(sorted(unknown))}")
+        self.index = index
+        self.name = str(spec.get("name") or f"rule {index + 1}")
+
+        addresses = [str(a).upper() for a in _list(spec.get("address", []))]
+        self.addresses = frozenset(a for a in addresses if not a.endswith("*"))
+        self.prefixes = frozenset(a[:-1] for a in addresses if a.endswith("*"))
+        try:
+            self.companies = frozenset(parse_number(c) for c in _list(spec.get("company", [])))
+            self.continuity = frozenset(parse_number(t) for t in _list(spec.get("continuity", [])))
+            self.rssi_min = int(spec.get("rssi_min", -1000))
+            self.hits = max(1, int(spec.get("hits", 1)))
+            self.within = float(spec.get("within", DEFAULT_WITHIN))
+            self.cooldown = float(spec.get("cooldown", DEFAULT_COOLDOWN))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Rule {self.name!r}: {e}") from None
+        self.services = frozenset(service_key(s) for s in _list(spec.get("service", [])))
+        if not (self.addresses or self.prefixes or self.companies or self.continuity or self.services):
+            raise ValueError(f"Rule {self.name!r} needs an address, company, continuity or service")
+
+        names = _list(spec.get("actions", ["log"]))
+        missing = [name for name in names if name not in actions]
+        if missing:
+            raise ValueError(f"Rule {self.name!r}: unknown action(s) {', '.join(missing)}")
+        self.actions = tuple(actions[name] for name in names)
+
+    def content_ok(self, features):
+        """Company, Continuity and service conditions (everything but the address)."""
+        company_id, types, services = features
+        return ((not self.companies or company_id in self.companies)
+                and (not self.continuity or not self.continuity.isdisjoint(types))
+                and (not self.services or not self.services.isdisjoint(services)))
+
+    def address_ok(self, address):
+        if not (self.addresses or self.prefixes):
+            return True
+        return address in self.addresses or any(address.startswith(p) for p in self.prefixes)
+
+
+def features_of(info):
+    """(company ID, Continuity message types, service keys) of a decoder.Classification."""
+    types = frozenset(m.type for m in vendors.parse_continuity(info.payload)) if info.company_id == 76 else frozenset()
+    return info.company_id, types, frozenset(service_key(s) for s in info.services)
+
+
+class Watchlist:
+    """Compiled rules plus their debounce state and action thread."""
+
+    def __init__(self, rules, actions=None):
+        self.emit = None  # Front end output for the "log" action
+        self.actions = {"log": LogAction(emit=self._emit)}
+        for name, spec in (actions or {}).items():
+            spec = dict(spec)
+            kind = spec.pop("type", None)
+            if kind not in ACTIONS:
+                raise ValueError(f"Action {name!r}: type must be one of {', '.join(ACTIONS)}")
+            try:
+                self.actions[name] = ACTIONS[kind](**spec)
+            except TypeError as e:
+                raise ValueError(f"Action {name!r}: {e}") from None
+        self.rules = [Rule(i, spec, self.actions) for i, spec in enumerate(rules)]
+
+        # Each rule is indexed once, under its most selective field
+        self._by_address = {}
+        self._by_prefix = {}   # prefix length -> {prefix: [rules]}
+        by_content = {"company": {}, "continuity": {}, "service": {}}
+        for rule in self.rules:
+            if rule.addresses or rule.prefixes:
+                for address in rule.addresses:
+                    self._by_address.setdefault(address, []).append(rule)
+                for prefix in rule.prefixes:
+                    self._by_prefix.setdefault(len(prefix), {}).setdefault(prefix, []).append(rule)
+            elif rule.services:
+                for key in rule.services:
+                    by_content["service"].setdefault(key, []).append(rule)
+            elif rule.continuity:
+                for key in rule.continuity:
+                    by_content["continuity"].setdefault(key, []).append(rule)
+            else:
+                for key in rule.companies:
+                    by_content["company"].setdefault(key, []).append(rule)
+        self._by_company = by_content["company"]
+        self._by_continuity = by_content["continuity"]
+        self._by_service = by_content["service"]
+        self._prefix_tables = sorted(self._by_prefix.items())
+        self._content_rules = bool(self._by_company or self._by_continuity or self._by_service)
+        self._needs_features = any(r.companies or r.continuity or r.services for r in self.rules)
+
+        self._memo = {}    # Classification -> (features, content rules)
+        self._state = {}   # (rule index, device) -> [hits, last match, last alert]
+        self._prune_at = MAX_STATE
+
+        self.checked = 0
+        self.fired = 0
+        self.dropped = 0
+        self.failed = 0
+        self.recent = deque(maxlen=20)
+        self._queue = None
+        self._thread = None
+
+    def _emit(self, line):
+        if self.emit is not None:
+            self.emit(line)
+
+    # --- Matching ---
+
+    def _lookup(self, info):
+        """(features, rules matched by content alone) for a decoded advertisement, memoized."""
+        if not self._needs_features:
+            return None, ()
+        try:
+            return self._memo[info]
+        except KeyError:
+            pass
+        features = features_of(info)
+        matched = ()
+        if self._content_rules:
+            company_id, types, services = features
+            candidates = list(self._by_company.get(company_id, ()))
+            for t in types:
+                candidates.extend(self._by_continuity.get(t, ()))
+            for key in services:
+                candidates.extend(self._by_service.get(key, ()))
+            matched = tuple(sorted({r.index: r for r in candidates if r.content_ok(features)}.values(),
+                                   key=lambda r: r.index))
+        if len(self._memo) >= MEMO_SIZE:
+            self._memo.clear()
+        entry = self._memo[info] = (features, matched)
+        return entry
+
+    def match(self, address, info, rssi):
+        """Rules matched by one sighting (ignoring hits and cooldown)."""
+        address = address.upper()
+        features, matched = self._lookup(info)
+        rules = [r for r in matched if rssi >= r.rssi_min]
+        by_address = self._by_address.get(address, ())
+        for length, table in self._prefix_tables:
+            found = table.get(address[:length])
+            if found:
+                by_address = [*by_address, *found]
+        for rule in by_address:
+            if rssi >= rule.rssi_min and (features is None or rule.content_ok(features)) and rule not in rules:
+                rules.append(rule)
+        return rules
+
+    def check(self, address, info, rssi, now, key=None):
+        """
+        Checks one sighting and fires the rules whose hits and cooldown allow it.
+        `key` is the device (e.g. the re-identified address) that debouncing follows.
+        Returns the alerts fired.
+        """
+        self.checked += 1
+        rules = self.match(address, info, rssi)
+        if not rules:
+            return ()
+        fired = []
+        state = self._state
+        device = key or address
+        for rule in rules:
+            # [hits, first counted hit, last match, last alert]
+            entry = state.get((rule.index, device))
+            if entry is None:
+                entry = state[(rule.index, device)] = [0, now, now, None]
+            elif now - entry[1] > rule.within:
+                entry[0], entry[1] = 0, now  # Too slow: start counting again
+            entry[0] += 1
+            entry[2] = now
+            if entry[0] >= rule.hits and (entry[3] is None or now - entry[3] >= rule.cooldown):
+                entry[0], entry[1], entry[3] = 0, now, now
+                fired.append(self._fire(rule, Alert(now, rule.name, address, rssi, info.manufacturer)))
+        if len(state) > self._prune_at:
+            self._prune(now)
+        return fired
+
+    def _prune(self, now):
+        """Forgets devices whose hit window and cooldown have both run out."""
+        rules = self.rules
+        self._state = {k: v for k, v in self._state.items()
+                       if now - v[2] <= max(rules[k[0]].within, rules[k[0]].cooldown)}
+        self._prune_at = max(MAX_STATE, 2 * len(self._state))
+
+    # --- Actions ---
+
+    def _fire(self, rule, alert):
+        self.fired += 1
+        self.recent.append(alert)
+        for action in rule.actions:
+            if action.blocking:
+                self._submit(action, alert)
+            else:
+                action(alert)
+        return alert
+
+    def _submit(self, action, alert):
+        if self._thread is None:
+            self._queue = queue.Queue(1000)
+            self._thread = threading.Thread(target=self._run, name="bluesentry-alerts", daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait((action, alert))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            action, alert = item
+            try:
+                action(alert)
+            except Exception as e:
+                self.failed += 1
+                self._emit(f"Alert action failed ({type(action).__name__}): {e}")
+
+    def close(self):
+        """Waits for queued actions, then closes log files."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        for action in self.actions.values():
+            action.close()
+
+    def stats(self):
+        return {"rules": len(self.rules), "checked": self.checked, "fired": self.fired,
+                "dropped": self.dropped, "failed": self.failed}
+
+
+def load(path):
+    """Compiles a rule file. Raises ValueError (or OSError) with a readable message."""
+    with open(path) as f:
+        try:
+            spec = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: {e}") from None
+    if isinstance(spec, list):
+        spec = {"rules": spec}
+    if not isinstance(spec, dict) or not isinstance(spec.get("rules"), list):
+        raise ValueError(f"{path}: expected {{\"rules\": [...]}}")
+    return Watchlist(spec["rules"], spec.get("actions"))